@@ -1,50 +1,27 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import plotly.graph_objects as go
-import base64
-import requests
+import hashlib
+import io
+import json
 import tempfile
 import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from jinja2 import Template
-from weasyprint import HTML
-
-# --- Baremes URSSAF 2026 ---
-BAREME_IK_VOITURE_2026 = {
-    3: {"jusqua_5000": 0.529, "de_5001_a_20000": 0.316, "au_dela_20000": 0.370},
-    4: {"jusqua_5000": 0.606, "de_5001_a_20000": 0.340, "au_dela_20000": 0.407},
-    5: {"jusqua_5000": 0.636, "de_5001_a_20000": 0.357, "au_dela_20000": 0.427},
-    6: {"jusqua_5000": 0.665, "de_5001_a_20000": 0.374, "au_dela_20000": 0.447},
-    7: {"jusqua_5000": 0.697, "de_5001_a_20000": 0.394, "au_dela_20000": 0.470},
-}
-
-BAREME_IK_MOTO_2026 = {
-    1: {"jusqua_3000": 0.395, "de_3001_a_6000": 0.099, "au_dela_6000": 0.248},
-    2: {"jusqua_3000": 0.468, "de_3001_a_6000": 0.082, "au_dela_6000": 0.275},
-    3: {"jusqua_3000": 0.606, "de_3001_a_6000": 0.071, "au_dela_6000": 0.308},
-    4: {"jusqua_3000": 0.695, "de_3001_a_6000": 0.044, "au_dela_6000": 0.352},
-    5: {"jusqua_3000": 0.792, "de_3001_a_6000": 0.078, "au_dela_6000": 0.455},
-}
-
-# Baremes IGD URSSAF 2026 - Complet avec duree de mission
-IGD_BAREME_2026 = {
-    "moins_3_mois":  {"repas": 21.40, "nuitee_paris": 76.60, "nuitee_province": 56.80},
-    "3_a_24_mois":   {"repas": 18.20, "nuitee_paris": 65.10, "nuitee_province": 48.30},
-    "24_a_72_mois":  {"repas": 15.00, "nuitee_paris": 53.60, "nuitee_province": 39.80},
-}
-
-# Jours ouvres par mois (2026 - jours feries France metropolitaine)
-JOURS_OUVRES_2026 = {
-    1: 21, 2: 20, 3: 22, 4: 21, 5: 18, 6: 22,
-    7: 22, 8: 21, 9: 22, 10: 22, 11: 20, 12: 22,
-}
-MOIS_LABELS = {
-    1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril",
-    5: "Mai", 6: "Juin", 7: "Juillet", 8: "Août",
-    9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre",
-}
+
+import diagnostics
+from moteur import (
+    BAREME_IK_VOITURE_2026, BAREME_IK_MOTO_2026, IGD_BAREME_2026,
+    JOURS_OUVRES_2026, MOIS_LABELS, TR_VALEUR_FACIALE, TR_PART_PATRONALE_MAX,
+    BAREME_2026, COTISATIONS_2026, COTISATIONS_LABELS, PARAMETRES_DEFAUT, ParametresCalcul,
+    calculate_salary_memo, parametres_periode, stats_simulations,
+)
+from projection import ProjectionAnnuelle
+from solveur_inverse import resoudre_objectif
+from grille import CHAMPS_GRILLE, axe, calculer_grille, grille_en_table
+from comparaison import OPTIONS_COMPARAISON, comparer_scenarios
+from geolocalisation import COLONNES_DISTANCES, DELAI_DEBOUNCE, distances_portefeuille, service_geo
+from portefeuille import simuler_portefeuille
+from rendu_pdf import create_pdf, create_pdf_combine, generer_pdfs, taches_portefeuille
 
 # Membres BU Portage Salarial
 MEMBRES_BU = [
@@ -53,799 +30,67 @@ MEMBRES_BU = [
     "Membre BU 3",
 ]
 
-# Valeur faciale TR standard
-TR_VALEUR_FACIALE = 14.36
-TR_PART_PATRONALE_MAX = 7.18
-
-# --- Constantes Forfait Teletravail ---
-TELETRAVAIL_TAUX_JOUR = 2.70  # EUR par jour
-TELETRAVAIL_MAX_JOURS = 22    # Maximum 22 jours
-
-# --- Parametres RGDU 2026 ---
-RGDU_TMIN = 0.02  # Seuil minimal d'exoneration
-RGDU_TDELTA_FNAL_50 = 0.3821  # FNAL 0.50% (>=50 salaries)
-RGDU_TDELTA_FNAL_10 = 0.3781  # FNAL 0.10% (<50 salaries)
-RGDU_EXPOSANT = 1.75
-RGDU_SEUIL_SMIC = 3.0  # Jusqu'a 3 SMIC
-
-# --- Taux FNAL selon effectif ---
-FNAL_TAUX_SUP_50 = 0.0050  # 0.50% pour >= 50 salaries
-FNAL_TAUX_INF_50 = 0.0010  # 0.10% pour < 50 salaries
-
-# --- COTISATIONS 2026 (ligne par ligne comme Silae) ---
-COTISATIONS_2026 = {
-    # PATRONALES SUR TOTALITE
-    "maladie":       {"pat": 0.0700, "sal": 0.0,    "base": "TOTALITE"},
-    "maladie_compl": {"pat": 0.0600, "sal": 0.0,    "base": "TOTALITE"},
-    "csa":           {"pat": 0.0030, "sal": 0.0,    "base": "TOTALITE"},
-    "vieillesse_dep":{"pat": 0.0211, "sal": 0.0040, "base": "TOTALITE"},
-    "af":            {"pat": 0.0345, "sal": 0.0,    "base": "TOTALITE"},
-    "af_compl":      {"pat": 0.0180, "sal": 0.0,    "base": "TOTALITE"},
-    "atmp":          {"pat": 0.0064, "sal": 0.0,    "base": "TOTALITE"},
-    "chomage":       {"pat": 0.0400, "sal": 0.0,    "base": "TOTALITE"},
-    "ags":           {"pat": 0.0025, "sal": 0.0,    "base": "TOTALITE"},
-    "formation":     {"pat": 0.0100, "sal": 0.0,    "base": "TOTALITE"},
-    "taxe_appr":     {"pat": 0.0059, "sal": 0.0,    "base": "TOTALITE"},
-    "taxe_appr_lib": {"pat": 0.0009, "sal": 0.0,    "base": "TOTALITE"},
-    "dialogue_soc":  {"pat": 0.0001, "sal": 0.0,    "base": "TOTALITE"},
-
-    # SUR TRANCHE A (PMSS)
-    "vieillesse_pl": {"pat": 0.0855, "sal": 0.0690, "base": "TRANCHE_A"},
-    "fnal":          {"pat": 0.0010, "sal": 0.0,    "base": "TRANCHE_A"},
-    "retraite_t1":   {"pat": 0.0472, "sal": 0.0315, "base": "TRANCHE_A"},
-    "ceg_t1":        {"pat": 0.0129, "sal": 0.0086, "base": "TRANCHE_A"},
-    "cet_t1":        {"pat": 0.0021, "sal": 0.0014, "base": "TRANCHE_A"},
-    "apec_t1":       {"pat": 0.00036,"sal": 0.00024,"base": "TRANCHE_A"},
-    "prevoyance_deces":{"pat": 0.0159, "sal": 0.0, "base": "TRANCHE_A"},
-
-    # SUR TRANCHE B (Brut - PMSS, si brut > PMSS)
-    "retraite_t2":   {"pat": 0.1295, "sal": 0.0864, "base": "TRANCHE_B"},
-    "ceg_t2":        {"pat": 0.0162, "sal": 0.0108, "base": "TRANCHE_B"},
-    "cet_t2":        {"pat": 0.0021, "sal": 0.0014, "base": "TRANCHE_B"},
-    "apec_t2":       {"pat": 0.00036,"sal": 0.00024,"base": "TRANCHE_B"},
-    "prevoyance_supp":{"pat": 0.0073, "sal": 0.0073,"base": "TRANCHE_B"},
-
-    # CSG / CRDS (base = 98.25% du brut + contributions pat prevoyance)
-    "csg_deductible":{"pat": 0.0, "sal": 0.0680, "base": "CSG"},
-    "csg_crds":      {"pat": 0.0, "sal": 0.0290, "base": "CSG"},
-}
-
-COTISATIONS_LABELS = {
-    "maladie": "Maladie",
-    "maladie_compl": "Maladie complementaire",
-    "csa": "Contrib. Solidarite Autonomie",
-    "vieillesse_dep": "Vieillesse deplafonnee",
-    "af": "Allocations Familiales",
-    "af_compl": "Alloc. Familiales compl.",
-    "atmp": "AT/MP",
-    "chomage": "Chomage",
-    "ags": "AGS",
-    "formation": "Formation professionnelle",
-    "taxe_appr": "Taxe d'apprentissage",
-    "taxe_appr_lib": "Taxe appr. (liberatoire)",
-    "dialogue_soc": "Dialogue social",
-    "vieillesse_pl": "Vieillesse plafonnee",
-    "fnal": "FNAL",
-    "retraite_t1": "Retraite AGIRC-ARRCO T1",
-    "ceg_t1": "CEG T1",
-    "cet_t1": "CET T1",
-    "apec_t1": "APEC T1",
-    "prevoyance_deces": "Prevoyance deces cadre",
-    "retraite_t2": "Retraite AGIRC-ARRCO T2",
-    "ceg_t2": "CEG T2",
-    "cet_t2": "CET T2",
-    "apec_t2": "APEC T2",
-    "prevoyance_supp": "Prevoyance supp. cadre T2",
-    "csg_deductible": "CSG deductible",
-    "csg_crds": "CSG/CRDS non deductible",
-}
-
 # --- Initialisation des Variables (Session State) ---
-if 'cfg_base_salary' not in st.session_state:
-    st.session_state.cfg_base_salary = 2374.0
-if 'cfg_frais_gestion' not in st.session_state:
-    st.session_state.cfg_frais_gestion = 5.0
+for _cle, _valeur in PARAMETRES_DEFAUT.en_session().items():
+    if _cle not in st.session_state:
+        st.session_state[_cle] = _valeur
 if 'cfg_frais_intermediation' not in st.session_state:
     st.session_state.cfg_frais_intermediation = 0.0
-if 'cfg_taux_prime' not in st.session_state:
-    st.session_state.cfg_taux_prime = 5.0
-if 'cfg_taux_reserve' not in st.session_state:
-    st.session_state.cfg_taux_reserve = 10.0
-if 'cfg_taux_cp' not in st.session_state:
-    st.session_state.cfg_taux_cp = 10.0
 if 'cfg_ik_rate' not in st.session_state:
     st.session_state.cfg_ik_rate = 0.636
-if 'cfg_pmss' not in st.session_state:
-    st.session_state.cfg_pmss = 4005.0
-if 'cfg_mutuelle_taux' not in st.session_state:
-    st.session_state.cfg_mutuelle_taux = 1.5
-if 'cfg_mutuelle_part_pat' not in st.session_state:
-    st.session_state.cfg_mutuelle_part_pat = 50.0
-if 'cfg_smic_mensuel' not in st.session_state:
-    st.session_state.cfg_smic_mensuel = 1823.03
-if 'cfg_taux_atmp' not in st.session_state:
-    st.session_state.cfg_taux_atmp = 0.64
-if 'cfg_taux_charges_override' not in st.session_state:
-    st.session_state.cfg_taux_charges_override = 0.0  # 0 = auto-calcul
 if 'cfg_pct_tel_internet' not in st.session_state:
     st.session_state.cfg_pct_tel_internet = 50.0
 if 'cfg_pct_transport' not in st.session_state:
     st.session_state.cfg_pct_transport = 50.0
 
 
-# --- Fonction RGDU ---
-def calculer_rgdu(brut_mensuel, smic_mensuel, use_fnal_50=True):
+# --- API Adresse & Calcul Km ---
+# Client asynchrone partage + cache SQLite persistant (geolocalisation.py)
+def suggerer_adresse(adresse, champ):
     """
-    Calcule la Reduction Generale Degressive Unique (RGDU) 2026
-    Retourne le montant de la reduction des charges patronales
+    Suggestions api-adresse.data.gouv.fr (gratuit, pas de cle API) sans
+    bloquer le script : (suggestions, en_cours). Debounce propre a la
+    session Streamlit et au champ.
     """
-    smic_annuel = smic_mensuel * 12
-    brut_annuel = brut_mensuel * 12
-
-    # Pas de reduction au-dela de 3 SMIC
-    if brut_annuel >= RGDU_SEUIL_SMIC * smic_annuel:
-        return 0.0
-
-    # Choix du Tdelta selon FNAL
-    tdelta = RGDU_TDELTA_FNAL_50 if use_fnal_50 else RGDU_TDELTA_FNAL_10
-
-    # Formule RGDU 2026
-    ratio = (RGDU_SEUIL_SMIC * smic_annuel / brut_annuel) - 1
-    if ratio <= 0:
-        return 0.0
+    ctx = get_script_run_ctx()
+    return service_geo().suggerer(adresse, champ, session=ctx.session_id if ctx else None)
 
-    base = 0.5 * ratio
-    coefficient = RGDU_TMIN + (tdelta * (base ** RGDU_EXPOSANT))
 
-    # Plafonner le coefficient a Tmin + Tdelta
-    coefficient = min(coefficient, RGDU_TMIN + tdelta)
-
-    # Arrondir a 4 decimales
-    coefficient = round(coefficient, 4)
-
-    # Reduction mensuelle
-    reduction = brut_mensuel * coefficient
-
-    return reduction
-
-
-# --- Calcul cotisations ligne par ligne ---
-def calculer_cotisations(brut, pmss, atmp_rate, fnal_rate, prev_pat_contributions):
-    """
-    Calcule chaque cotisation individuellement (comme Silae).
-    Retourne un dict avec le detail ligne par ligne + totaux.
-    """
-    tranche_a = min(brut, pmss)
-    tranche_b = max(0, brut - pmss)
-
-    # Base CSG = 98.25% du brut + contributions pat prevoyance/mutuelle
-    base_csg = brut * 0.9825 + prev_pat_contributions
-
-    details = []
-    total_pat = 0
-    total_sal = 0
-
-    for nom, cotis in COTISATIONS_2026.items():
-        # Determiner la base
-        if cotis["base"] == "TOTALITE":
-            base = brut
-        elif cotis["base"] == "TRANCHE_A":
-            base = tranche_a
-        elif cotis["base"] == "TRANCHE_B":
-            base = tranche_b
-            if tranche_b == 0:
-                continue  # pas de T2 si brut <= PMSS
-        elif cotis["base"] == "CSG":
-            base = base_csg
-        else:
-            continue
-
-        # Appliquer taux AT/MP et FNAL configurables
-        taux_pat = cotis["pat"]
-        taux_sal = cotis["sal"]
-        if nom == "atmp":
-            taux_pat = atmp_rate
-        if nom == "fnal":
-            taux_pat = fnal_rate
-
-        montant_pat = round(base * taux_pat, 2)
-        montant_sal = round(base * taux_sal, 2)
-
-        total_pat += montant_pat
-        total_sal += montant_sal
-
-        details.append({
-            "nom": nom, "base": round(base, 2),
-            "taux_pat": taux_pat, "montant_pat": montant_pat,
-            "taux_sal": taux_sal, "montant_sal": montant_sal
-        })
-
-    return {
-        "details": details,
-        "total_pat": total_pat,
-        "total_sal": total_sal,
-        "tranche_a": tranche_a,
-        "tranche_b": tranche_b,
-        "base_csg": round(base_csg, 2),
-    }
+def _relancer_apres_recherche(saisies):
+    """Fragment periodique : relance l'app quand les recherches d'adresse en cours sont terminees."""
+    if not any(suggerer_adresse(saisie, champ)[1] for champ, saisie in saisies):
+        st.rerun()
 
 
-# --- API Adresse & Calcul Km ---
-@st.cache_data(ttl=3600)
-def geocoder_adresse(adresse):
-    """Geocode une adresse via api-adresse.data.gouv.fr (gratuit, pas de cle API)"""
-    if not adresse or len(adresse.strip()) < 5:
-        return None
-    try:
-        resp = requests.get(
-            "https://api-adresse.data.gouv.fr/search/",
-            params={"q": adresse, "limit": 5},
-            timeout=5
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            if data.get("features"):
-                results = []
-                for f in data["features"]:
-                    props = f["properties"]
-                    coords = f["geometry"]["coordinates"]  # [lon, lat]
-                    results.append({
-                        "label": props.get("label", ""),
-                        "lon": coords[0],
-                        "lat": coords[1],
-                        "score": props.get("score", 0),
-                    })
-                return results
-    except Exception:
-        pass
-    return None
-
-
-@st.cache_data(ttl=3600)
 def calculer_distance_osrm(lat1, lon1, lat2, lon2):
     """Calcule la distance route via OSRM (gratuit, trajet le plus court)"""
-    try:
-        url = f"https://router.project-osrm.org/route/v1/driving/{lon1},{lat1};{lon2},{lat2}"
-        resp = requests.get(url, params={"overview": "false"}, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            if data.get("routes"):
-                distance_m = data["routes"][0]["distance"]
-                duree_s = data["routes"][0]["duration"]
-                return {
-                    "distance_km": round(distance_m / 1000, 1),
-                    "duree_min": round(duree_s / 60, 0),
-                }
-    except Exception:
-        pass
-    return None
-
-
-# --- Moteur de Calcul ---
-def calculate_salary(tjm, days_worked_month, days_worked_week,
-                     ik_amount, igd_amount, other_expenses, use_reserve, use_mutuelle,
-                     nb_titres_restaurant=0, frais_intermediation_pct=0.0,
-                     jours_teletravail=0, effectif_sup_50=False,
-                     frais_partages_pct=0.0, commission_apporteur=0.0,
-                     type_contrat="CDI", provision_cp=False,
-                     nb_journees=0, nb_jours_ouvres=22):
-
-    cfg_base = st.session_state.cfg_base_salary
-    rate_gestion = st.session_state.cfg_frais_gestion / 100.0
-    rate_prime = st.session_state.cfg_taux_prime / 100.0
-    rate_cp = st.session_state.cfg_taux_cp / 100.0
-
-    pmss = st.session_state.cfg_pmss
-    smic = st.session_state.cfg_smic_mensuel
-    atmp_rate = st.session_state.cfg_taux_atmp / 100.0
-    fnal_rate = FNAL_TAUX_SUP_50 if effectif_sup_50 else FNAL_TAUX_INF_50
-
-    # Mutuelle
-    mutuelle_total_cost = 0.0
-    mutuelle_part_pat = 0.0
-    mutuelle_part_sal = 0.0
-    if use_mutuelle:
-        mutuelle_rate = st.session_state.cfg_mutuelle_taux / 100.0
-        split_pat = st.session_state.cfg_mutuelle_part_pat / 100.0
-        mutuelle_total_cost = pmss * mutuelle_rate
-        mutuelle_part_pat = round(mutuelle_total_cost * split_pat, 2)
-        mutuelle_part_sal = round(mutuelle_total_cost * (1 - split_pat), 2)
-
-    # Titres Restaurant
-    tr_part_sal = nb_titres_restaurant * TR_PART_PATRONALE_MAX
-    tr_part_pat = nb_titres_restaurant * TR_PART_PATRONALE_MAX
-
-    # Forfait teletravail
-    jours_teletravail_effectifs = min(jours_teletravail, TELETRAVAIL_MAX_JOURS)
-    forfait_teletravail = jours_teletravail_effectifs * TELETRAVAIL_TAUX_JOUR
-
-    # CA et deductions
-    turnover = tjm * days_worked_month
-    management_fees = turnover * rate_gestion
-    frais_intermediation = turnover * (frais_intermediation_pct / 100.0)
-    frais_partages = turnover * (frais_partages_pct / 100.0)
-
-    # Montant disponible = CA - Gestion - Intermediation - Partages - Commission
-    montant_disponible = turnover - management_fees - frais_intermediation - frais_partages - commission_apporteur
-
-    # Total des frais rembourses
-    total_frais_rembourses = ik_amount + igd_amount + forfait_teletravail + other_expenses
-
-    # Salaire de base proratise selon jours ouvres du mois
-    if nb_journees > 0 and nb_jours_ouvres > 0:
-        base_salary = cfg_base * (nb_journees / nb_jours_ouvres)
-    else:
-        base_salary = cfg_base * (days_worked_week / 5.0)
-    prime_apport = base_salary * rate_prime
-
-    # Reserve financiere (CDI) / Indemnite de precarite (CDD)
-    rate_reserve = st.session_state.cfg_taux_reserve / 100.0
-    if type_contrat == "CDD":
-        # CDD : Precarite = (Base + Prime + Complement) x 10% — calculee dans la convergence
-        reserve_brute = 0  # sera recalcule dans la convergence
-    else:
-        # CDI : Reserve financiere = Base x 10%
-        reserve_brute = base_salary * rate_reserve
+    return service_geo().trajet(lat1, lon1, lat2, lon2)
 
-    budget_salaire = montant_disponible - total_frais_rembourses
-    taux_charges_override = st.session_state.cfg_taux_charges_override / 100.0
-    reserve_reintegree = not use_reserve
 
-    is_cdd = (type_contrat == "CDD")
+# --- Cache PDF (generation a la demande) ---
+PDF_CACHE_MAX = 16
 
-    if taux_charges_override > 0:
-        taux_charges = taux_charges_override
-    else:
-        taux_charges = 0.55
-        for _ in range(50):
-            pool = budget_salaire / (1 + taux_charges)
-
-            if is_cdd:
-                # CDD : facteur 1.2705 = 1 + 5% + (1.05×10%) + (1.155×10%)
-                # precarite_fixe = (base + prime) × 10%
-                # cp_fixe = (base + prime + precarite_fixe) × 10%
-                # complement_rem = (pool - base - prime - precarite_fixe - cp_fixe) / 1.2705
-                facteur_cdd = 1 + rate_prime + (1 + rate_prime) * rate_reserve + (1 + rate_prime) * (1 + rate_reserve) * rate_cp
-                preca_fixe = (base_salary + prime_apport) * rate_reserve
-                cp_fixe = (base_salary + prime_apport + preca_fixe) * rate_cp
-                comp_rem_est = max(0, (pool - base_salary - prime_apport - preca_fixe - cp_fixe) / facteur_cdd)
-                comp_apport_est = comp_rem_est * rate_prime
-                ct_est = comp_rem_est + comp_apport_est
-                res_est = (base_salary + prime_apport + ct_est) * rate_reserve
-            else:
-                # CDI : reserve = base x 10% (fixe)
-                ct_est = max(0, pool - base_salary - prime_apport - reserve_brute)
-                res_est = reserve_brute
-
-            if reserve_reintegree:
-                brut_components = base_salary + prime_apport + res_est + ct_est
-                if is_cdd:
-                    # CDD : ICP = (base + prime + complement + apport + precarite) x 10%
-                    icp_ = brut_components * rate_cp
-                else:
-                    # CDI : ICP = (base + prime + reserve + complement) x 10%
-                    icp_ = brut_components * rate_cp
-                brut_est = brut_components + icp_
-
-                ta = min(brut_est, pmss)
-                tb = max(0, brut_est - pmss)
-                pd_ = round(ta * 0.0159, 2)
-                ps_ = round(tb * 0.0073, 2) if tb > 0 else 0.0
-                pt_ = pd_ + mutuelle_part_pat + ps_
-                c_ = calculer_cotisations(brut_est, pmss, atmp_rate, fnal_rate, pt_)
-                fs_ = round(pt_ * 0.08, 2)
-                cpf_cdd_est = round(brut_est * 0.01, 2) if is_cdd else 0.0
-                ch = c_["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est
-                tn = ch / pool if pool > 0 else 0
-            else:
-                # Reserve/precarite HORS brut : charges marginales
-                brut_components = base_salary + prime_apport + ct_est
-                brut_est = brut_components * (1 + rate_cp)
-                ta = min(brut_est, pmss)
-                tb = max(0, brut_est - pmss)
-                pd_ = round(ta * 0.0159, 2)
-                ps_ = round(tb * 0.0073, 2) if tb > 0 else 0.0
-                pt_ = pd_ + mutuelle_part_pat + ps_
-                c_ = calculer_cotisations(brut_est, pmss, atmp_rate, fnal_rate, pt_)
-                fs_ = round(pt_ * 0.08, 2)
-                icp_ = brut_components * rate_cp
-                cpf_cdd_est = round(brut_est * 0.01, 2) if is_cdd else 0.0
-                ch_brut = c_["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est
-                reserve_brut_cp = res_est * (1 + rate_cp)
-                brut_avec_reserve = brut_est + reserve_brut_cp
-                ta2 = min(brut_avec_reserve, pmss)
-                tb2 = max(0, brut_avec_reserve - pmss)
-                pd2 = round(ta2 * 0.0159, 2)
-                ps2 = round(tb2 * 0.0073, 2) if tb2 > 0 else 0.0
-                pt2 = pd2 + mutuelle_part_pat + ps2
-                c2_ = calculer_cotisations(brut_avec_reserve, pmss, atmp_rate, fnal_rate, pt2)
-                fs2 = round(pt2 * 0.08, 2)
-                ch_reserve = (c2_["total_pat"] + fs2) - (c_["total_pat"] + fs_) + res_est * rate_cp + mutuelle_part_pat * (res_est / pool if pool > 0 else 0)
-                tn = (ch_brut + ch_reserve) / pool if pool > 0 else 0
-
-            if abs(tn - taux_charges) < 0.00001:
-                taux_charges = tn
-                break
-            taux_charges = tn
-
-    # --- Resultats depuis le taux converge ---
-    pool = budget_salaire / (1 + taux_charges)
-
-    if is_cdd:
-        # CDD : facteur cascade 1.2705
-        facteur_cdd = 1 + rate_prime + (1 + rate_prime) * rate_reserve + (1 + rate_prime) * (1 + rate_reserve) * rate_cp
-        preca_fixe = (base_salary + prime_apport) * rate_reserve
-        cp_fixe = (base_salary + prime_apport + preca_fixe) * rate_cp
-        complement_remuneration = max(0, (pool - base_salary - prime_apport - preca_fixe - cp_fixe) / facteur_cdd)
-        complement_apport_affaires = complement_remuneration * rate_prime
-        complement_total = complement_remuneration + complement_apport_affaires
-        reserve_brute = (base_salary + prime_apport + complement_total) * rate_reserve
-    else:
-        complement_total = max(0, pool - base_salary - prime_apport - reserve_brute)
-        complement_remuneration = complement_total / (1 + rate_prime)
-        complement_apport_affaires = complement_total - complement_remuneration
-
-    if reserve_reintegree:
-        brut_base = base_salary + prime_apport + reserve_brute + complement_total
-        # ICP sur tout (CDI et CDD)
-        indemnite_cp = brut_base * rate_cp
-        gross_salary = brut_base + indemnite_cp
-    else:
-        # Reserve/precarite hors brut (provisionnee)
-        brut_base = base_salary + prime_apport + complement_total
-        indemnite_cp = brut_base * rate_cp
-        gross_salary = brut_base + indemnite_cp
-
-    # Cotisations reelles sur le brut
-    tranche_a = min(gross_salary, pmss)
-    tranche_b = max(0, gross_salary - pmss)
-    prev_deces_pat = round(tranche_a * 0.0159, 2)
-    prev_supp_pat = round(tranche_b * 0.0073, 2) if tranche_b > 0 else 0.0
-    prev_pat_total = prev_deces_pat + mutuelle_part_pat + prev_supp_pat
-    cotis = calculer_cotisations(gross_salary, pmss, atmp_rate, fnal_rate, prev_pat_total)
-    forfait_social = round(prev_pat_total * 0.08, 2)
-
-    # Contribution CPF-CDD (1% patronal sur brut, CDD uniquement)
-    cpf_cdd = round(gross_salary * 0.01, 2) if is_cdd else 0.0
-
-    # RGDU (toujours appliquee)
-    reduction_rgdu = calculer_rgdu(gross_salary, smic, use_fnal_50=effectif_sup_50)
-
-    # Charges patronales totales
-    employer_charges_avant_rgdu = cotis["total_pat"] + mutuelle_part_pat + tr_part_pat + forfait_social + cpf_cdd
-    employer_charges = employer_charges_avant_rgdu - reduction_rgdu
-
-    # Charges salariales totales
-    employee_charges = cotis["total_sal"] + mutuelle_part_sal + tr_part_sal
-
-    # Provision reserve / indemnite precarite
-    if reserve_reintegree:
-        provision_reserve_financiere = 0
-    else:
-        provision_reserve_financiere = max(0, budget_salaire - gross_salary - employer_charges)
-
-    reserve_amount = reserve_brute
-
-    # Cout global = Brut + Charges Pat + Frais
-    cout_global = gross_salary + employer_charges + total_frais_rembourses
-
-    # Net
-    net_before_tax = gross_salary - employee_charges
-    net_payable = net_before_tax + total_frais_rembourses
-
-    # --- Provision Conges Payes ---
-    provision_cp_amount = 0
-    brut_hors_cp = gross_salary
-    employee_charges_hors_cp = employee_charges
-    net_hors_cp = net_before_tax
-
-    if provision_cp and indemnite_cp > 0:
-        brut_hors_cp = gross_salary - indemnite_cp
-        ta_hcp = min(brut_hors_cp, pmss)
-        tb_hcp = max(0, brut_hors_cp - pmss)
-        pd_hcp = round(ta_hcp * 0.0159, 2)
-        ps_hcp = round(tb_hcp * 0.0073, 2) if tb_hcp > 0 else 0.0
-        pt_hcp = pd_hcp + mutuelle_part_pat + ps_hcp
-        cotis_hcp = calculer_cotisations(brut_hors_cp, pmss, atmp_rate, fnal_rate, pt_hcp)
-        fs_hcp = round(pt_hcp * 0.08, 2)
-        rgdu_hcp = calculer_rgdu(brut_hors_cp, smic, use_fnal_50=effectif_sup_50)
-        employer_charges_hcp = cotis_hcp["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_hcp - rgdu_hcp
-        employee_charges_hors_cp = cotis_hcp["total_sal"] + mutuelle_part_sal + tr_part_sal
-        cout_global_hcp = brut_hors_cp + employer_charges_hcp + total_frais_rembourses
-        provision_cp_amount = cout_global - cout_global_hcp
-        net_hors_cp = brut_hors_cp - employee_charges_hors_cp
-
-    # Label selon type de contrat
-    label_reserve = "Indemnite de precarite" if type_contrat == "CDD" else "Reserve financiere"
-
-    return {
-        "tjm": tjm,
-        "days_worked_month": days_worked_month,
-        "turnover": turnover,
-        "management_fees": management_fees,
-        "frais_intermediation": frais_intermediation,
-        "frais_partages": frais_partages,
-        "commission_apporteur": commission_apporteur,
-        "montant_disponible": montant_disponible,
-        "ik_amount": ik_amount,
-        "igd_amount": igd_amount,
-        "forfait_teletravail": forfait_teletravail,
-        "jours_teletravail": jours_teletravail_effectifs,
-        "other_expenses": other_expenses,
-        "total_frais_rembourses": total_frais_rembourses,
-        "base_salary": base_salary,
-        "prime_apport": prime_apport,
-        "complement_remuneration": complement_remuneration,
-        "complement_apport_affaires": complement_apport_affaires,
-        "indemnite_cp": indemnite_cp,
-        "gross_salary": gross_salary,
-        "reserve_brute": reserve_brute,
-        "reserve_amount": reserve_amount,
-        "reserve_reintegree": reserve_reintegree,
-        "employer_charges": employer_charges,
-        "employer_charges_avant_rgdu": employer_charges_avant_rgdu,
-        "cotis_total_pat": cotis["total_pat"],
-        "cotis_total_sal": cotis["total_sal"],
-        "cotis_details": cotis["details"],
-        "forfait_social": forfait_social,
-        "cpf_cdd": cpf_cdd,
-        "prev_pat_total": prev_pat_total,
-        "tranche_a": cotis["tranche_a"],
-        "tranche_b": cotis["tranche_b"],
-        "base_csg": cotis["base_csg"],
-        "reduction_rgdu": reduction_rgdu,
-        "employee_charges": employee_charges,
-        "mutuelle_part_pat": mutuelle_part_pat,
-        "mutuelle_part_sal": mutuelle_part_sal,
-        "tr_part_sal": tr_part_sal,
-        "tr_part_pat": tr_part_pat,
-        "nb_titres_restaurant": nb_titres_restaurant,
-        "cout_global": cout_global,
-        "net_before_tax": net_before_tax,
-        "net_payable": net_payable,
-        "effectif_sup_50": effectif_sup_50,
-        "taux_charges": taux_charges,
-        "pool_silae": pool,
-        "provision_reserve_financiere": provision_reserve_financiere,
-        "budget_salaire": budget_salaire,
-        "type_contrat": type_contrat,
-        "label_reserve": label_reserve,
-        "provision_cp": provision_cp,
-        "provision_cp_amount": provision_cp_amount,
-        "brut_hors_cp": brut_hors_cp,
-        "employee_charges_hors_cp": employee_charges_hors_cp,
-        "net_hors_cp": net_hors_cp,
-    }
 
-# --- Chemin logo ---
-LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo_signe_plus.png")
-LOGO_BLEU_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo_signe_plus_bleu.png")
-
-
-def _generer_camembert_pdf(data):
-    """Génère le camembert style modèle Signe+ : bleu/rose avec légende horizontale."""
-    frais_gestion_total = (data['management_fees'] + data['frais_intermediation']
-                           + data.get('frais_partages', 0) + data.get('commission_apporteur', 0))
-    cotis_sociales = (data['cotis_total_pat'] + data['cotis_total_sal']
-                      + data['forfait_social'] - data['reduction_rgdu']
-                      + data['mutuelle_part_pat'] + data['mutuelle_part_sal']
-                      + data['tr_part_pat'] + data['tr_part_sal'])
-    provision_viz = data['provision_reserve_financiere'] if not data.get('reserve_reintegree', False) else 0
-
-    labels = ['Net à payer', 'Frais de gestion', 'Cotisations Sociales\net Patronales', 'Provision Réserve']
-    values = [data['net_payable'], frais_gestion_total, cotis_sociales, provision_viz]
-    colors = ['#4A90D9', '#A0A0A0', '#E91E63', '#F48FB1']
-
-    filtered = [(l, v, c) for l, v, c in zip(labels, values, colors) if v > 0]
-    if not filtered:
-        return None
-    labels_f, values_f, colors_f = zip(*filtered)
-
-    fig = plt.figure(figsize=(3.4, 4.0))
-    gs = fig.add_gridspec(2, 1, height_ratios=[5, 1], hspace=0.05)
-
-    ax = fig.add_subplot(gs[0])
-    ax.set_title("Ventilation chiffre d'affaires", fontsize=8.5, fontweight='bold',
-                 pad=8, color='#333333', fontfamily='sans-serif')
-
-    wedges, texts, autotexts = ax.pie(
-        values_f, colors=colors_f, autopct='%1.1f%%',
-        textprops={'fontsize': 7.5, 'fontweight': 'bold'}, pctdistance=0.75,
-        startangle=90, wedgeprops={'linewidth': 0.5, 'edgecolor': 'white'}
-    )
-    for t in texts:
-        t.set_text('')
-    for t in autotexts:
-        t.set_color('white')
-        t.set_fontsize(7)
-    ax.add_artist(plt.Circle((0, 0), 0.38, fc='white'))
-
-    # Légende horizontale en bas (style modèle)
-    ax_leg = fig.add_subplot(gs[1])
-    ax_leg.axis('off')
-    from matplotlib.patches import FancyBboxPatch
-    legend_items = list(zip(labels_f, colors_f))
-    n = len(legend_items)
-    for i, (lbl, col) in enumerate(legend_items):
-        x = 0.02 + (i / n) * 0.96
-        ax_leg.add_patch(plt.Rectangle((x, 0.55), 0.025, 0.35, fc=col, transform=ax_leg.transAxes))
-        ax_leg.text(x + 0.035, 0.72, lbl.replace('\n', ' '), transform=ax_leg.transAxes,
-                    fontsize=5.5, va='center', color='#444444', fontfamily='sans-serif')
-
-    plt.subplots_adjust(left=0.02, right=0.98, top=0.92, bottom=0.02)
-
-    tmp = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    plt.savefig(tmp.name, dpi=180, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    return tmp.name
-
-
-# --- Couleurs S+ ---
-ROSE_R, ROSE_G, ROSE_B = 233, 30, 99
-ROSE_CLAIR_R, ROSE_CLAIR_G, ROSE_CLAIR_B = 252, 228, 236
-ROSE_FOND_R, ROSE_FOND_G, ROSE_FOND_B = 252, 228, 236  # FCE4EC
-GRIS_R, GRIS_G, GRIS_B = 245, 245, 245
-CHARCOAL_R, CHARCOAL_G, CHARCOAL_B = 50, 50, 50
-
-
-# --- Chemin police Unicode (bundlées dans le projet) ---
-_BASE_DIR = os.path.dirname(os.path.abspath(__file__)) if '__file__' in dir() else os.getcwd()
-FONT_PATH = os.path.join(_BASE_DIR, "fonts", "DejaVuSans.ttf")
-FONT_BOLD_PATH = os.path.join(_BASE_DIR, "fonts", "DejaVuSans-Bold.ttf")
-FONT_ITALIC_PATH = os.path.join(_BASE_DIR, "fonts", "DejaVuSans-Oblique.ttf")
-# Fallback système si les polices bundlées n'existent pas
-if not os.path.exists(FONT_PATH):
-    FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
-    FONT_BOLD_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    FONT_ITALIC_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Oblique.ttf"
-
-
-def _dotted_line(pdf, x, y, w, h, label, value_str, font_name="D", font_size=8.5,
-                 label_color=(60, 60, 60), value_color=(60, 60, 60), bold_value=False):
-    """Dessine une ligne avec pointillés entre le label et la valeur (style modèle)."""
-    pdf.set_xy(x, y)
-    pdf.set_font(font_name, "", font_size)
-    pdf.set_text_color(*label_color)
-    label_w = pdf.get_string_width(label)
-    value_w = pdf.get_string_width(value_str) + 2
-
-    # Label
-    pdf.cell(label_w + 1, h, txt=label, ln=0)
-
-    # Pointillés
-    dot_x = x + label_w + 2
-    dot_end = x + w - value_w - 1
-    pdf.set_text_color(180, 180, 180)
-    pdf.set_font(font_name, "", font_size - 1)
-    dot_w = pdf.get_string_width('.')
-    cx = dot_x
-    while cx < dot_end:
-        pdf.set_xy(cx, y)
-        pdf.cell(dot_w, h, txt='.', ln=0)
-        cx += dot_w + 0.3
-
-    # Valeur
-    pdf.set_text_color(*value_color)
-    pdf.set_font(font_name, "B" if bold_value else "", font_size)
-    pdf.set_xy(x + w - value_w, y)
-    pdf.cell(value_w, h, txt=value_str, align='R', ln=0)
-
-
-# --- PDF Generation (V8 — HTML/CSS via WeasyPrint) ---
-_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)) if '__file__' in dir() else os.getcwd(), "template_pdf.html")
-
-
-def _generer_chart_png(data):
-    """Génère le donut chart en PNG pour le PDF."""
-    frais_g = (data['management_fees'] + data['frais_intermediation']
-               + data.get('frais_partages', 0) + data.get('commission_apporteur', 0))
-    cotis = (data['cotis_total_pat'] + data['cotis_total_sal'] + data['forfait_social']
-             - data['reduction_rgdu'] + data['mutuelle_part_pat'] + data['mutuelle_part_sal']
-             + data['tr_part_pat'] + data['tr_part_sal'])
-    prov = data['provision_reserve_financiere'] if not data.get('reserve_reintegree', False) else 0
-
-    labels = ['Net à payer', 'Frais de gestion', 'Cotisations', 'Provision']
-    values = [data['net_payable'], frais_g, cotis, prov]
-    colors = ['#4A90D9', '#9E9E9E', '#E91E63', '#F48FB1']
-    filt = [(l, v, c) for l, v, c in zip(labels, values, colors) if v > 0]
-    if not filt:
-        return None
-    lf, vf, cf = zip(*filt)
-
-    fig = plt.figure(figsize=(2.5, 2.5))
-    ax = fig.add_axes([0.1, 0.1, 0.8, 0.8])  # centré dans la figure
-    wedges, _, autotexts = ax.pie(vf, colors=cf, autopct='%1.1f%%', startangle=90,
-                                   textprops={'fontsize': 8, 'weight': 'bold'},
-                                   pctdistance=0.72, wedgeprops={'linewidth': 1.5, 'edgecolor': 'white'})
-    for t in autotexts:
-        t.set_color('white')
-    ax.add_artist(plt.Circle((0, 0), 0.38, fc='white'))
-    tmp = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    fig.savefig(tmp.name, dpi=200, transparent=True)
-    plt.close()
-    return tmp.name
-
-
-def create_pdf(data, name, membre_bu=""):
-    """Génère le PDF via HTML + WeasyPrint."""
-    t_gest = st.session_state.cfg_frais_gestion
-    nb_tr = data.get('nb_titres_restaurant', 0)
-    label_res = data.get('label_reserve', 'Réserve financière')
-
-    # Lignes salaire
-    salary_lines = [
-        {"label": "Salaire de base", "value": f"{data['base_salary']:,.2f}€"},
-        {"label": "Prime d'apports d'affaires", "value": f"{data['prime_apport']:,.2f}€"},
-        {"label": "Complément de rémunération", "value": f"{data['complement_remuneration']:,.2f}€"},
-        {"label": "Complément apport d'affaires", "value": f"{data['complement_apport_affaires']:,.2f}€"},
-    ]
-    if data.get('reserve_reintegree', False):
-        salary_lines.append({"label": label_res.capitalize(), "value": f"{data['reserve_brute']:,.2f}€"})
-    salary_lines.append({"label": "Indemnités Congés Payés", "value": f"{data['indemnite_cp']:,.2f}€"})
-
-    # Lignes frais
-    frais_lines = []
-    if data.get('ik_amount', 0) > 0:
-        frais_lines.append({"label": "Indemnités Kilométriques", "value": f"{data['ik_amount']:,.2f}€"})
-    if data.get('igd_amount', 0) > 0:
-        frais_lines.append({"label": "Indemnités Grands Déplacements", "value": f"{data['igd_amount']:,.2f}€"})
-    if data.get('forfait_teletravail', 0) > 0:
-        frais_lines.append({"label": f"Forfait Télétravail ({data['jours_teletravail']}j × 2.70)", "value": f"{data['forfait_teletravail']:,.2f}€"})
-    if data.get('other_expenses', 0) > 0:
-        frais_lines.append({"label": "Autres Frais", "value": f"{data['other_expenses']:,.2f}€"})
-
-    # Reserve note
-    reserve_note = ""
-    if data.get('reserve_brute', 0) > 0 and not data.get('reserve_reintegree', False):
-        reserve_note = f"*La {label_res} : {data['reserve_brute']:,.2f}€ brut provisionnée tous les mois."
-
-    # Chart
-    chart_path = _generer_chart_png(data)
-
-    # Template
-    with open(_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-        tpl = Template(f.read())
-
-    html_str = tpl.render(
-        logo_path=LOGO_BLEU_PATH if os.path.exists(LOGO_BLEU_PATH) else (LOGO_PATH if os.path.exists(LOGO_PATH) else ""),
-        tjm=f"{data.get('tjm', 0):.0f}",
-        days=f"{data.get('days_worked_month', 0):g}",
-        frais_gestion=f"{t_gest}",
-        tr_label="Oui" if nb_tr > 0 else "Non",
-        name=name,
-        salary_lines=salary_lines,
-        gross_salary=f"{data['gross_salary']:,.2f}€",
-        employee_charges=f"{data['employee_charges']:,.2f}€",
-        employer_charges=f"{data['employer_charges']:,.2f}€",
-        frais_lines=frais_lines,
-        chart_path=chart_path or "",
-        has_provision=data.get('provision_reserve_financiere', 0) > 0,
-        show_brut_reserve=True,
-        brut_avec_reserve=f"{data['gross_salary']:,.2f}€",
-        net_avant_impot=f"{data['net_before_tax']:,.2f}€",
-        net_payable=f"{data['net_payable']:,.2f}€",
-        total_frais=f"{data['total_frais_rembourses']:,.2f}€" if data.get('total_frais_rembourses', 0) > 0 else "",
-        provision_reserve=f"{data['provision_reserve_financiere']:,.2f}€" if data.get('provision_reserve_financiere', 0) > 0 else "",
-        reserve_note=reserve_note,
-        has_mutuelle=data.get('mutuelle_part_pat', 0) > 0,
-        membre_bu=membre_bu or "Gwenaëlle CHARPENTIER",
-    )
+def cle_pdf(data, name, membre_bu, frais_gestion):
+    """Empreinte du contenu d'un PDF : resultats, consultant, membre BU et frais de gestion."""
+    contenu = json.dumps([data, name, membre_bu, frais_gestion], sort_keys=True, default=str)
+    return hashlib.sha256(contenu.encode()).hexdigest()
 
-    pdf_bytes = HTML(string=html_str).write_pdf()
 
-    # Cleanup chart
-    if chart_path:
-        try:
-            os.unlink(chart_path)
-        except Exception:
-            pass
+@st.cache_data(max_entries=PDF_CACHE_MAX, show_spinner=False)
+def pdf_en_cache(cle, _data, name, membre_bu, frais_gestion):
+    """PDF memorise par empreinte (les resultats ne sont pas re-hashes), eviction au-dela de PDF_CACHE_MAX."""
+    return create_pdf(_data, name, membre_bu, frais_gestion=frais_gestion)
 
-    return pdf_bytes
 
 # --- UI Streamlit ---
 
 st.set_page_config(page_title="Simulateur Portage Salarial 2026", layout="wide")
 
+# Panneau de diagnostics masque : ?diagnostics=1 dans l'URL (ou SIMULATEUR_DIAGNOSTICS)
+if st.query_params.get("diagnostics") == "1":
+    diagnostics.activer()
+
 # Sidebar
 with st.sidebar:
     st.title("Consultant")
@@ -937,9 +182,13 @@ with st.sidebar:
         # Adresse domicile avec autocomplétion
         saisie_dom = st.text_input("Rechercher adresse domicile", "",
                                     key="saisie_dom", placeholder="Tapez une adresse...")
+        en_cours = []
         if saisie_dom and len(saisie_dom) >= 5:
-            suggestions_dom = geocoder_adresse(saisie_dom)
-            if suggestions_dom:
+            suggestions_dom, recherche_dom = suggerer_adresse(saisie_dom, "domicile")
+            if recherche_dom:
+                en_cours.append(("domicile", saisie_dom))
+                st.caption("Recherche en cours...")
+            elif suggestions_dom:
                 options_dom = [s['label'] for s in suggestions_dom]
                 choix_dom = st.selectbox("Sélectionner", options_dom, key="sel_dom")
                 idx_dom = options_dom.index(choix_dom)
@@ -951,14 +200,20 @@ with st.sidebar:
         saisie_mis = st.text_input("Rechercher adresse mission", "",
                                     key="saisie_mis", placeholder="Tapez une adresse...")
         if saisie_mis and len(saisie_mis) >= 5:
-            suggestions_mis = geocoder_adresse(saisie_mis)
-            if suggestions_mis:
+            suggestions_mis, recherche_mis = suggerer_adresse(saisie_mis, "mission")
+            if recherche_mis:
+                en_cours.append(("mission", saisie_mis))
+                st.caption("Recherche en cours...")
+            elif suggestions_mis:
                 options_mis = [s['label'] for s in suggestions_mis]
                 choix_mis = st.selectbox("Sélectionner", options_mis, key="sel_mis")
                 idx_mis = options_mis.index(choix_mis)
                 st.session_state['geo_mis'] = suggestions_mis[idx_mis]
             else:
                 st.caption("Aucune adresse trouvée")
+        if en_cours:
+            # Le script n'attend pas le geocodeur : un fragment verifie periodiquement la fin des recherches
+            st.fragment(_relancer_apres_recherche, run_every=DELAI_DEBOUNCE)(en_cours)
 
         # Bouton calcul
         dom_ok = 'geo_dom' in st.session_state and st.session_state['geo_dom']
@@ -1102,14 +357,27 @@ with st.sidebar:
     membre_bu = st.selectbox("Membre BU", MEMBRES_BU)
 
 # --- CALCUL AVANT AFFICHAGE ---
-results = calculate_salary(tjm, days_worked_month, days_worked_week,
-                           ik_total, igd_total, expenses_other, use_reserve, use_mutuelle,
-                           nb_titres_restaurant, frais_intermediation_pct, jours_teletravail,
-                           effectif_sup_50, frais_partages_pct, commission_apporteur,
-                           type_contrat, provision_cp, nb_journees, nb_jours_ouvres)
+# Memoise : un rerun sans changement d'entree ne coute qu'une recherche en cache
+arguments_simulation = dict(
+    tjm=tjm, days_worked_month=days_worked_month, days_worked_week=days_worked_week,
+    ik_amount=ik_total, igd_amount=igd_total, other_expenses=expenses_other,
+    use_reserve=use_reserve, use_mutuelle=use_mutuelle,
+    nb_titres_restaurant=nb_titres_restaurant, frais_intermediation_pct=frais_intermediation_pct,
+    jours_teletravail=jours_teletravail, effectif_sup_50=effectif_sup_50,
+    frais_partages_pct=frais_partages_pct, commission_apporteur=commission_apporteur,
+    type_contrat=type_contrat, provision_cp=provision_cp, nb_journees=nb_journees,
+    nb_jours_ouvres=nb_jours_ouvres, params=ParametresCalcul.depuis_session(st.session_state),
+    periode=(2026, mois_num),
+)
+with diagnostics.chrono("app.simulation"):  # cache compris
+    results = calculate_salary_memo(**arguments_simulation)
+# PMSS / SMIC effectivement retenus (saisie ou bareme de la periode)
+params_effectifs = parametres_periode(arguments_simulation["params"], BAREME_2026)
 
 # Main : Onglets
-tab_simu, tab_config, tab_comm = st.tabs(["Resultats Simulation", "Configuration Globale", "Email & Explications"])
+tab_simu, tab_config, tab_comm, tab_projection, tab_portefeuille = st.tabs(
+    ["Resultats Simulation", "Configuration Globale", "Email & Explications", "Projection Annuelle",
+     "Portefeuille"])
 
 with tab_simu:
     st.title("Simulateur de Portage Salarial 2026")
@@ -1142,6 +410,97 @@ with tab_simu:
         if results['nb_titres_restaurant'] > 0:
             st.caption(f"Titres Restaurant : **{results['nb_titres_restaurant']}**")
 
+    # --- Calcul inverse : net cible -> TJM ou jours ---
+    with st.expander("Objectif de net : TJM ou jours necessaires"):
+        # Un expander ferme execute quand meme son contenu : les panneaux ne
+        # calculent que sur demande, un rerun sans changement reste une lecture de cache
+        if st.checkbox("Calculer le TJM ou les jours necessaires", key="inv_actif"):
+            inv1, inv2, inv3 = st.columns(3)
+            with inv1:
+                net_cible = st.number_input("Net cible (EUR)", value=4000.0, step=100.0, min_value=0.0,
+                                            key="inv_net_cible")
+            with inv2:
+                champ_cible = st.radio("Net vise", ["net_payable", "net_before_tax"], key="inv_champ",
+                                       format_func={"net_payable": "Net a payer",
+                                                    "net_before_tax": "Net avant impot"}.get)
+            with inv3:
+                variable_cible = st.radio("Inconnue", ["tjm", "days_worked_month"], key="inv_variable",
+                                          format_func={"tjm": "TJM", "days_worked_month": "Jours"}.get)
+            try:
+                # La valeur courante de l'inconnue sert de point de depart
+                objectif = resoudre_objectif(net_cible, variable_cible, champ_cible, **arguments_simulation)
+            except ValueError as e:
+                st.warning(str(e))
+            else:
+                unite = "EUR" if variable_cible == "tjm" else "jours"
+                st.success(f"{'TJM' if variable_cible == 'tjm' else 'Jours factures'} necessaire : "
+                           f"**{objectif['valeur']:,.2f} {unite}** "
+                           f"(net obtenu {objectif['resultat'][champ_cible]:,.2f} EUR, "
+                           f"CA {objectif['resultat']['turnover']:,.2f} EUR)")
+                st.caption(f"Resolu en {objectif['evaluations']} simulations, autres entrees inchangees.")
+
+    # --- Grille de sensibilite TJM x jours ---
+    with st.expander("Grille de sensibilite TJM x jours"):
+        if st.checkbox("Afficher la grille", key="grille_actif"):
+            gr1, gr2, gr3, gr4 = st.columns(4)
+            with gr1:
+                grille_tjm_min, grille_tjm_max = st.slider("Plage TJM (EUR)", 100, 2000, (300, 1200), step=10,
+                                                           key="grille_tjm")
+            with gr2:
+                grille_tjm_pas = st.number_input("Pas TJM", value=25, min_value=5, step=5, key="grille_tjm_pas")
+            with gr3:
+                grille_jours_min, grille_jours_max = st.slider("Plage jours", 1, 23, (1, 22), key="grille_jours")
+            with gr4:
+                champ_grille = st.selectbox("Indicateur", CHAMPS_GRILLE, key="grille_champ",
+                                            format_func={"net_payable": "Net a payer",
+                                                         "cout_global": "Cout global",
+                                                         "taux_charges": "Taux de charges"}.get)
+            # Les axes remplacent TJM et jours ; les autres entrees restent celles de la barre laterale
+            arguments_grille = {k: v for k, v in arguments_simulation.items()
+                                if k not in ("tjm", "days_worked_month", "nb_journees")}
+            grille = calculer_grille(axe(grille_tjm_min, grille_tjm_max, grille_tjm_pas),
+                                     axe(grille_jours_min, grille_jours_max, 1), **arguments_grille)
+            valeurs_grille = grille[champ_grille] * (100 if champ_grille == "taux_charges" else 1)
+            with diagnostics.chrono("app.graphique.grille"):
+                fig_grille = go.Figure(go.Heatmap(
+                    z=valeurs_grille, x=grille["jours"], y=grille["tjm"], colorscale="Viridis",
+                    hovertemplate="TJM %{y:.0f} EUR<br>%{x:.0f} jours<br>%{z:,.2f}<extra></extra>"))
+                fig_grille.update_layout(xaxis_title="Jours travailles", yaxis_title="TJM (EUR)",
+                                         height=480, margin=dict(l=10, r=10, t=10, b=10))
+                st.plotly_chart(fig_grille, use_container_width=True)
+            df_grille = pd.DataFrame(grille_en_table(grille))
+            st.caption(f"{df_grille.shape[0]} scenarios ; {grille['lignes_calculees']} ligne(s) de TJM "
+                       f"simulee(s), les autres reprises du cache.")
+            st.download_button("Telecharger la grille (CSV)", df_grille.to_csv(index=False, sep=";", decimal=","),
+                               file_name="grille_tjm_jours.csv", mime="text/csv", key="btn_grille_csv")
+
+    # --- Comparaison de scenarios (toutes les combinaisons des options, en un calcul) ---
+    with st.expander("Comparaison de scenarios"):
+        if st.checkbox("Comparer les scenarios", key="comparaison_actif"):
+            options_comparees = st.multiselect(
+                "Options a comparer", list(OPTIONS_COMPARAISON), default=["reserve", "mutuelle"],
+                format_func=lambda o: OPTIONS_COMPARAISON[o][1], key="comparaison_options")
+            scenarios = comparer_scenarios(options_comparees, **arguments_simulation)
+            df_scenarios = pd.DataFrame([
+                {"Scenario": sc["libelle"], "Net a payer": sc["resultat"]["net_payable"],
+                 "Ecart net": sc["ecarts"]["net_payable"], "Brut": sc["resultat"]["gross_salary"],
+                 "Ecart brut": sc["ecarts"]["gross_salary"], "Provision reserve": sc["resultat"]["provision_reserve_financiere"],
+                 "Cout global": sc["resultat"]["cout_global"], "Ecart cout": sc["ecarts"]["cout_global"]}
+                for sc in scenarios])
+            st.dataframe(df_scenarios.style.format("{:,.2f}", subset=df_scenarios.columns[1:]),
+                         hide_index=True, use_container_width=True)
+            with diagnostics.chrono("app.graphique.scenarios"):
+                fig_scenarios = go.Figure(go.Bar(
+                    x=df_scenarios["Ecart net"], y=df_scenarios["Scenario"], orientation="h",
+                    marker_color=["#4A90D9" if e >= 0 else "#E91E63" for e in df_scenarios["Ecart net"]],
+                    hovertemplate="%{y}<br>Ecart net %{x:+,.2f} EUR<extra></extra>"))
+                fig_scenarios.update_layout(xaxis_title="Ecart de net a payer vs simulation actuelle (EUR)",
+                                            yaxis=dict(autorange="reversed"), height=120 + 28 * len(scenarios),
+                                            margin=dict(l=10, r=10, t=10, b=10))
+                st.plotly_chart(fig_scenarios, use_container_width=True)
+            st.caption(f"{len(scenarios)} scenarios calcules en un seul appel du moteur vectorise ; "
+                       "le premier est la simulation actuelle.")
+
     st.divider()
 
     col_main, col_viz = st.columns([2, 1])
@@ -1274,7 +633,7 @@ with tab_simu:
         with st.expander("Formules de Calcul"):
             st.markdown(f"""
 **Tranches :**
-- Tranche A (PMSS) = min(Brut, {st.session_state.cfg_pmss:,.2f}) = **{results['tranche_a']:,.2f} EUR**
+- Tranche A (PMSS) = min(Brut, {params_effectifs.pmss:,.2f}) = **{results['tranche_a']:,.2f} EUR**
 - Tranche B = max(0, Brut - PMSS) = **{results['tranche_b']:,.2f} EUR**
 - Base CSG = 98.25% x Brut + Contrib. prevoyance pat = **{results['base_csg']:,.2f} EUR**
 
@@ -1330,30 +689,37 @@ with tab_simu:
         values = [results['net_payable'], frais_gestion_total, cotis_sociales, provision_viz]
         colors = ['#4A90D9', '#9E9E9E', '#E91E63', '#F48FB1']
 
-        fig = go.Figure(data=[go.Pie(
-            labels=labels, values=values, hole=.4,
-            marker=dict(colors=colors, line=dict(color='white', width=2)),
-            textinfo='percent',
-            textposition='inside',
-            textfont=dict(size=13, color='white'),
-            hoverinfo='label+value+percent',
-        )])
-        fig.update_layout(
-            margin=dict(t=10, b=10, l=10, r=10),
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="top", y=-0.05, xanchor="center", x=0.5, font=dict(size=11)),
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with diagnostics.chrono("app.graphique.repartition"):
+            fig = go.Figure(data=[go.Pie(
+                labels=labels, values=values, hole=.4,
+                marker=dict(colors=colors, line=dict(color='white', width=2)),
+                textinfo='percent',
+                textposition='inside',
+                textfont=dict(size=13, color='white'),
+                hoverinfo='label+value+percent',
+            )])
+            fig.update_layout(
+                margin=dict(t=10, b=10, l=10, r=10),
+                showlegend=True,
+                legend=dict(orientation="h", yanchor="top", y=-0.05, xanchor="center", x=0.5, font=dict(size=11)),
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("### Export")
-        pdf_bytes = create_pdf(results, consultant_name, membre_bu)
-        b64 = base64.b64encode(pdf_bytes).decode()
-        href = (
-            f'<a href="data:application/octet-stream;base64,{b64}" download="{consultant_nom}_{consultant_prenom}_SimulationPortageSigne+.pdf" style="text-decoration:none;">'
-            f'<button style="width:100%; padding: 10px; background-color: #E91E63; color: white; border: none; border-radius: 5px; cursor: pointer;">'
-            f'Telecharger le PDF</button></a>'
-        )
-        st.markdown(href, unsafe_allow_html=True)
+        # PDF genere uniquement sur demande puis servi depuis le cache tant que
+        # le contenu ne change pas : les reruns interactifs n'en paient pas le rendu
+        frais_gestion_pdf = st.session_state.cfg_frais_gestion
+        cle = cle_pdf(results, consultant_name, membre_bu, frais_gestion_pdf)
+        if st.button("Generer le PDF", key="btn_pdf", use_container_width=True):
+            st.session_state.pdf_cle = cle
+        if st.session_state.get('pdf_cle') == cle:
+            with st.spinner("Generation du PDF..."):
+                pdf_bytes = pdf_en_cache(cle, results, consultant_name, membre_bu, frais_gestion_pdf)
+            st.download_button(
+                "Telecharger le PDF", data=pdf_bytes,
+                file_name=f"{consultant_nom}_{consultant_prenom}_SimulationPortageSigne+.pdf",
+                mime="application/pdf", type="primary", use_container_width=True,
+            )
 
 with tab_config:
     st.header("Parametres Globaux de Calcul")
@@ -1399,11 +765,13 @@ with tab_config:
         st.divider()
         st.session_state.cfg_pmss = st.number_input(
             "Plafond Secu (PMSS) (EUR)",
-            value=st.session_state.cfg_pmss, step=100.0
+            value=st.session_state.cfg_pmss, step=100.0, placeholder=f"{BAREME_2026.pmss:.2f}",
+            help="Vide : PMSS du bareme de la periode simulee."
         )
         st.session_state.cfg_smic_mensuel = st.number_input(
             "SMIC Mensuel Brut (EUR)",
-            value=st.session_state.cfg_smic_mensuel, step=10.0
+            value=st.session_state.cfg_smic_mensuel, step=10.0, placeholder=f"{BAREME_2026.smic_mensuel:.2f}",
+            help="Vide : SMIC du bareme de la periode simulee."
         )
 
         st.divider()
@@ -1529,7 +897,7 @@ with tab_comm:
         if results.get('reduction_rgdu', 0) > 0:
             st.markdown(f"""
 **Reduction RGDU 2026 (obligatoire)** - Allegement charges patronales
-- Seuil : Brut < 3 SMIC ({3 * st.session_state.cfg_smic_mensuel:,.2f} EUR)
+- Seuil : Brut < 3 SMIC ({3 * params_effectifs.smic_mensuel:,.2f} EUR)
 - Votre brut : {results['gross_salary']:,.2f} EUR (eligible)
 - Reduction calculee : **-{results['reduction_rgdu']:,.2f} EUR**
             """)
@@ -1723,3 +1091,166 @@ Bien cordialement,
 {membre_bu}"""
 
         st.text_area("Sujet & Corps du message", email_content, height=600)
+
+with tab_projection:
+    st.header("Projection annuelle 2026")
+    st.caption("Les 12 mois avec les hypotheses de la barre laterale et les jours ouvres de chaque mois. "
+               "Seuls les mois dont les entrees changent sont recalcules.")
+
+    # Hypotheses communes : tout sauf le calendrier du mois (la commission est reprise telle quelle chaque mois)
+    hypotheses_projection = dict(
+        tjm=tjm, days_worked_week=days_worked_week, ik_amount=ik_total, igd_amount=igd_total,
+        other_expenses=expenses_other, use_reserve=use_reserve, use_mutuelle=use_mutuelle,
+        nb_titres_restaurant=nb_titres_restaurant, frais_intermediation_pct=frais_intermediation_pct,
+        jours_teletravail=jours_teletravail, effectif_sup_50=effectif_sup_50,
+        frais_partages_pct=frais_partages_pct, commission_apporteur=commission_apporteur,
+        type_contrat=type_contrat, provision_cp=provision_cp,
+    )
+    params_projection = ParametresCalcul.depuis_session(st.session_state)
+    if "projection" not in st.session_state:
+        st.session_state.projection = ProjectionAnnuelle(annee=2026, params=params_projection,
+                                                         **hypotheses_projection)
+    else:
+        st.session_state.projection.modifier_hypotheses(params=params_projection, **hypotheses_projection)
+    projection = st.session_state.projection
+
+    with st.expander("Jours travailles par mois"):
+        colonnes_mois = st.columns(6)
+        for mois in range(1, 13):
+            with colonnes_mois[(mois - 1) % 6]:
+                jours_ouvres_mois = projection.jours_ouvres(mois)
+                nb_jours_mois = st.number_input(MOIS_LABELS[mois], value=jours_ouvres_mois, step=1,
+                                                min_value=0, max_value=jours_ouvres_mois,
+                                                key=f"projection_jours_{mois}")
+                if nb_jours_mois == jours_ouvres_mois:
+                    if projection.surcharges[mois]:
+                        projection.reinitialiser_mois(mois)
+                else:
+                    projection.modifier_mois(mois, nb_journees=nb_jours_mois)
+
+    totaux = projection.totaux()
+    kpi_a1, kpi_a2, kpi_a3, kpi_a4 = st.columns(4)
+    kpi_a1.metric("CA annuel", f"{totaux['turnover']:,.2f} EUR")
+    kpi_a2.metric("Brut annuel", f"{totaux['gross_salary']:,.2f} EUR")
+    kpi_a3.metric("Net annuel avant impot", f"{totaux['net_payable']:,.2f} EUR")
+    kpi_a4.metric("Charges annuelles", f"{totaux['employer_charges'] + totaux['employee_charges']:,.2f} EUR")
+
+    df_projection = pd.DataFrame(projection.lignes())
+    colonnes_projection = {
+        "libelle": "Mois", "jours_travailles": "Jours", "turnover": "CA", "gross_salary": "Brut",
+        "net_payable": "Net", "employer_charges": "Charges pat.", "employee_charges": "Charges sal.",
+        "provision_reserve_financiere": "Reserve", "cumul_turnover": "CA cumule",
+        "cumul_gross_salary": "Brut cumule", "cumul_net_payable": "Net cumule",
+        "cumul_provision_reserve_financiere": "Reserve cumulee",
+    }
+    df_projection = df_projection[list(colonnes_projection)].rename(columns=colonnes_projection)
+    st.dataframe(
+        df_projection.style.format({col: "{:,.2f}" for col in list(colonnes_projection.values())[2:]}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+with tab_portefeuille:
+    st.header("Simulation d'un portefeuille")
+    st.caption("Un fichier CSV ou XLSX, une ligne par consultant. Colonnes : tjm, jours (obligatoires) ; "
+               "nom, contrat, annee, mois, jours_semaine, ik_km, vehicule, cv, tranche_ik, igd_repas, "
+               "igd_nuitees, igd_duree, igd_paris, titres_restaurant, teletravail, autres_frais, "
+               "frais_intermediation_pct, frais_partages_pct, commission, reserve_reintegree, mutuelle, "
+               "provision_cp, effectif_sup_50. Les parametres de l'onglet Configuration s'appliquent. "
+               "Pour le budget IK : adresse_domicile et adresse_mission.")
+    fichier_portefeuille = st.file_uploader("Fichier consultants", type=["csv", "xlsx"], key="pf_fichier")
+    format_portefeuille = st.radio("Format des resultats", ["csv", "xlsx", "parquet"], horizontal=True,
+                                   key="pf_format")
+    if fichier_portefeuille is not None and st.button("Simuler le portefeuille", key="btn_portefeuille"):
+        sortie_portefeuille = io.BytesIO()
+        try:
+            compteurs = simuler_portefeuille(fichier_portefeuille, sortie_portefeuille,
+                                             format_sortie=format_portefeuille,
+                                             params=ParametresCalcul.depuis_session(st.session_state))
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.session_state.pf_resultat = (fichier_portefeuille.name, format_portefeuille,
+                                            sortie_portefeuille.getvalue(), compteurs)
+    if "pf_resultat" in st.session_state:
+        nom_entree, format_resultat, contenu, compteurs = st.session_state.pf_resultat
+        message = f"{nom_entree} : {compteurs['lignes']} lignes simulees"
+        if compteurs["erreurs"]:
+            st.warning(f"{message}, {compteurs['erreurs']} en erreur (colonne 'erreur' du fichier).")
+        else:
+            st.success(message)
+        st.download_button(f"Telecharger les resultats ({format_resultat})", contenu,
+                           file_name=f"resultats_{os.path.splitext(nom_entree)[0]}.{format_resultat}",
+                           mime="application/octet-stream", key="btn_pf_resultats")
+
+    # PDF de fin de mois : un par consultant, rendus en parallele, livres en ZIP
+    if fichier_portefeuille is not None and st.button("Generer les PDF (ZIP)", key="btn_pf_pdf"):
+        barre_pdf = st.progress(0.0, text="Preparation des simulations...")
+        fichier_portefeuille.seek(0)
+        taches_pdf = list(taches_portefeuille(fichier_portefeuille, membre_bu,
+                                              params=ParametresCalcul.depuis_session(st.session_state)))
+        with tempfile.TemporaryDirectory() as dossier_pdf:
+            chemin_zip = os.path.join(dossier_pdf, "propositions.zip")
+            stats_pdf = generer_pdfs(
+                taches_pdf, chemin_zip,
+                progression=lambda fait, total: barre_pdf.progress(fait / total, text=f"{fait}/{total} PDF"))
+            with open(chemin_zip, "rb") as f:
+                st.session_state.pf_pdf = (fichier_portefeuille.name, f.read(), stats_pdf)
+    if "pf_pdf" in st.session_state:
+        nom_entree, contenu_zip, stats_pdf = st.session_state.pf_pdf
+        phases_pdf = ", ".join(f"{phase} {duree:.1f} s" for phase, duree in stats_pdf["phases"].items())
+        st.caption(f"{stats_pdf['pdf']} PDF en {stats_pdf['duree']:.1f} s (rendu par phase : {phases_pdf})")
+        st.download_button("Telecharger les PDF (ZIP)", contenu_zip,
+                           file_name=f"propositions_{os.path.splitext(nom_entree)[0]}.zip",
+                           mime="application/zip", key="btn_pf_zip")
+
+    # Un seul PDF pour le client : une page par consultant, mise en page en une passe
+    if fichier_portefeuille is not None and st.button("Generer un PDF combine", key="btn_pf_pdf_combine"):
+        fichier_portefeuille.seek(0)
+        taches_pdf = list(taches_portefeuille(fichier_portefeuille, membre_bu,
+                                              params=ParametresCalcul.depuis_session(st.session_state)))
+        try:
+            with st.spinner(f"Rendu de {len(taches_pdf)} pages..."):
+                st.session_state.pf_pdf_combine = (fichier_portefeuille.name, create_pdf_combine(taches_pdf))
+        except ValueError as e:
+            st.error(str(e))
+    if "pf_pdf_combine" in st.session_state:
+        nom_entree, contenu_pdf = st.session_state.pf_pdf_combine
+        st.download_button("Telecharger le PDF combine", contenu_pdf,
+                           file_name=f"propositions_{os.path.splitext(nom_entree)[0]}.pdf",
+                           mime="application/pdf", key="btn_pf_pdf_combine_dl")
+
+    # Budget IK : distances domicile-mission de tout le portefeuille (geocodage et matrice OSRM en lot)
+    if fichier_portefeuille is not None and st.button("Calculer les distances domicile-mission",
+                                                      key="btn_pf_distances"):
+        fichier_portefeuille.seek(0)
+        with st.spinner("Geocodage et calcul des trajets..."):
+            st.session_state.pf_distances = pd.DataFrame(distances_portefeuille(fichier_portefeuille),
+                                                         columns=COLONNES_DISTANCES)
+    if "pf_distances" in st.session_state:
+        df_distances = st.session_state.pf_distances
+        estimes = int((df_distances["source"] == "haversine").sum())
+        st.caption(f"{len(df_distances)} trajets, {df_distances['km_mois'].sum():,.0f} km sur le mois"
+                   + (f" ; {estimes} estime(s) a vol d'oiseau (routage indisponible)" if estimes else ""))
+        st.dataframe(df_distances, hide_index=True, use_container_width=True)
+        st.download_button("Telecharger les distances (CSV)",
+                           df_distances.to_csv(index=False, sep=";", decimal=","),
+                           file_name="distances_domicile_mission.csv", mime="text/csv", key="btn_pf_distances_csv")
+
+# --- Diagnostics (masque) : mesures par phase cumulees depuis l'activation ---
+if diagnostics.est_actif():
+    with st.expander("Diagnostics"):
+        mesures = diagnostics.resume()
+        if mesures["durees"]:
+            st.dataframe(pd.DataFrame.from_dict(mesures["durees"], orient="index"), use_container_width=True)
+        if mesures["compteurs"]:
+            st.dataframe(pd.DataFrame.from_dict(mesures["compteurs"], orient="index"), use_container_width=True)
+        st.caption("Cache des simulations : " + ", ".join(f"{k} {v}" for k, v in stats_simulations().items()))
+        col_diag1, col_diag2 = st.columns(2)
+        with col_diag1:
+            st.download_button("Telecharger les mesures (JSON)", json.dumps(mesures, indent=2),
+                               file_name="diagnostics.json", mime="application/json", key="btn_diagnostics_json")
+        with col_diag2:
+            if st.button("Reinitialiser les mesures", key="btn_diagnostics_raz"):
+                diagnostics.reinitialiser()
+                st.rerun()
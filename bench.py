@@ -0,0 +1,266 @@
+"""
+Benchmarks du simulateur : moteur scalaire (cas representatifs), moteur
+vectorise, dans les deux arithmetiques (flottant, centimes), iterations de
+convergence, cotisations, rendu PDF par phase et geocodage contre un
+serveur local.
+
+Les resultats sont un dict plat {mesure: valeur} ecrit en JSON et compare a
+une reference enregistree (bench_reference.json) : une mesure qui se degrade
+au-dela de la tolerance est signalee comme regression.
+
+Usage : python bench.py [--json resultats.json] [--reference bench_reference.json]
+                        [--tolerance 0.25] [--rapide] [--enregistrer-reference]
+Code retour 1 en cas de regression.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from moteur import ARITHMETIQUES, BAREME_2026, PARAMETRES_DEFAUT, calculate_salary, calculer_cotisations
+from moteur_batch import calculate_salary_batch
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_PATH = os.path.join(_BASE_DIR, "bench_reference.json")
+TOLERANCE_DEFAUT = 0.25  # degradation relative toleree sur les durees et debits
+
+ARGUMENTS_BASE = dict(days_worked_month=19, days_worked_week=5.0, ik_amount=0, igd_amount=0,
+                      other_expenses=0, use_reserve=True, use_mutuelle=True)
+# Cas representatifs : contrat, reserve, provision CP, brut sous le PMSS, entre PMSS et 3 SMIC, au-dela
+CAS_SCALAIRES = {
+    "cdi_bas_salaire": dict(tjm=200),
+    "cdi_sous_pmss": dict(tjm=300),
+    "cdi_pmss_3smic": dict(tjm=450),
+    "cdi_au_dela_3smic": dict(tjm=900),
+    "cdi_reserve_reintegree": dict(tjm=550, use_reserve=False),
+    "cdi_provision_cp": dict(tjm=550, provision_cp=True),
+    "cdd_pmss_3smic": dict(tjm=450, type_contrat="CDD", use_reserve=False),
+    "cdd_au_dela_3smic": dict(tjm=900, type_contrat="CDD", use_reserve=False),
+}
+
+
+def _chrono(fonction, appels, series=5):
+    """
+    Duree (s) d'un appel de `fonction` : `series` series de `appels` appels,
+    la plus rapide est retenue (le bruit de la machine ne fait que ralentir).
+    """
+    meilleure = None
+    for _ in range(series):
+        debut = time.perf_counter()
+        for _ in range(appels):
+            fonction()
+        duree = (time.perf_counter() - debut) / appels
+        meilleure = duree if meilleure is None else min(meilleure, duree)
+    return meilleure
+
+
+def bench_scalaire(appels=100, arithmetique="flottant"):
+    """
+    Latence de calculate_salary (us) par cas, et iterations de convergence
+    en flottant ; en centimes, mesures prefixees "centimes.".
+    """
+    prefixe = "scalaire" if arithmetique == "flottant" else arithmetique
+    mesures = {}
+    for nom, cas in CAS_SCALAIRES.items():
+        arguments = dict(ARGUMENTS_BASE, arithmetique=arithmetique, **cas)
+        resultat = calculate_salary(**arguments)
+        mesures[f"{prefixe}.{nom}.us"] = _chrono(lambda: calculate_salary(**arguments), appels) * 1e6
+        if arithmetique == "flottant":
+            mesures[f"iterations.{nom}"] = resultat["iterations"]
+    return mesures
+
+
+def bench_batch(lignes=20000, arithmetique="flottant"):
+    """Debit du moteur vectorise (simulations par seconde), TJM et jours aleatoires (graine fixe)."""
+    alea = np.random.default_rng(2026)
+    tjm = alea.uniform(200, 1200, lignes).round(2)
+    jours = alea.integers(1, 23, lignes).astype(float)
+    duree = _chrono(lambda: calculate_salary_batch(tjm, jours, nb_journees=jours, arithmetique=arithmetique), 1)
+    nom = "batch" if arithmetique == "flottant" else f"batch_{arithmetique}"
+    return {f"{nom}.simulations_par_s": lignes / duree}
+
+
+def bench_cotisations(appels=1000):
+    """Cout d'un appel de calculer_cotisations (us), sous et au-dela du PMSS."""
+    p = PARAMETRES_DEFAUT
+    mesures = {}
+    for nom, brut in (("sous_pmss", 3000.0), ("au_dela_pmss", 9000.0)):
+        mesures[f"cotisations.{nom}.us"] = _chrono(
+            lambda: calculer_cotisations(brut, BAREME_2026.pmss, p.taux_atmp / 100, BAREME_2026.fnal_taux_inf_50, 0.0),
+            appels) * 1e6
+    return mesures
+
+
+def bench_pdf(documents=5):
+    """
+    Rendu d'un PDF par phase (ms, mediane des rendus apres le premier) et
+    premier rendu du processus ; {} si WeasyPrint n'est pas utilisable ici.
+    """
+    try:
+        from rendu_pdf import create_pdf
+        resultat = calculate_salary(**dict(ARGUMENTS_BASE, tjm=550))
+        debut = time.perf_counter()
+        create_pdf(resultat, "Jean DUPONT")
+    except (ImportError, OSError):
+        return {}
+    mesures = {"pdf.premier_rendu.ms": (time.perf_counter() - debut) * 1000}
+    chronos = []
+    for i in range(documents):
+        chronos.append({})
+        create_pdf(resultat, f"Jean DUPONT{i}", chronos=chronos[-1])
+    for phase in chronos[0]:
+        mesures[f"pdf.{phase}.ms"] = statistics.median(c[phase] for c in chronos) * 1000
+    return mesures
+
+
+class _ServeurGeo(BaseHTTPRequestHandler):
+    """Geocodeur et OSRM factices (reponses fixes) pour mesurer le client sans reseau."""
+
+    protocol_version = "HTTP/1.1"  # connexions gardees ouvertes, comme les vrais services
+    wbufsize = -1  # en-tetes et corps envoyes ensemble
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/table/"):
+            n = len(url.path.rsplit("/", 1)[1].split(";"))
+            ligne = [1000.0] * n
+            corps = {"code": "Ok", "distances": [ligne] * n, "durations": [ligne] * n}
+        else:
+            q = parse_qs(url.query)["q"][0]
+            corps = {"features": [{"properties": {"label": q, "score": 1},
+                                   "geometry": {"coordinates": [2.35 + len(q) / 1000, 48.85]}}]}
+        donnees = json.dumps(corps).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench_geocodage(adresses=50, series=3):
+    """
+    Geocodage (ms par adresse, sans puis avec cache) et distances en lot
+    (ms, adresses nouvelles) contre un serveur local ; meilleure serie.
+    """
+    from geolocalisation import ServiceGeo
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ServeurGeo)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    with tempfile.TemporaryDirectory() as dossier:
+        service = ServiceGeo(url_geocodage=f"{url}/search/", url_routage=url,
+                             chemin_cache=os.path.join(dossier, "geo.sqlite"))
+        try:
+            service.geocoder("adresse de prechauffage")  # import de httpx et ouverture du client
+            mesures = {"geocodage.sans_cache.ms": None, "geocodage.avec_cache.ms": None, "distances_lot.ms": None}
+
+            def garder(mesure, debut, nombre=1):
+                duree = (time.perf_counter() - debut) * 1000 / nombre
+                mesures[mesure] = duree if mesures[mesure] is None else min(mesures[mesure], duree)
+
+            for serie in range(series):
+                liste = [f"{i} rue du Banc d'Essai {serie} Paris" for i in range(adresses)]
+                for mesure in ("geocodage.sans_cache.ms", "geocodage.avec_cache.ms"):
+                    debut = time.perf_counter()
+                    for adresse in liste:
+                        service.geocoder(adresse)
+                    garder(mesure, debut, adresses)
+                paires = [(f"{a} (domicile)", f"{a} (mission)") for a in liste]
+                debut = time.perf_counter()
+                service.distances(paires)
+                garder("distances_lot.ms", debut)
+        finally:
+            service.fermer()
+            httpd.shutdown()
+    return mesures
+
+
+def mesurer(rapide=False):
+    """Toutes les mesures (dict plat). `rapide` : moins de repetitions (controle, moins stable)."""
+    facteur = 10 if rapide else 1
+    mesures = {}
+    for arithmetique in ARITHMETIQUES:
+        mesures.update(bench_scalaire(appels=100 // facteur, arithmetique=arithmetique))
+        mesures.update(bench_batch(lignes=20000 // facteur, arithmetique=arithmetique))
+    mesures.update(bench_cotisations(appels=1000 // facteur))
+    mesures.update(bench_pdf(documents=5 if not rapide else 2))
+    mesures.update(bench_geocodage(adresses=50 // facteur))
+    return mesures
+
+
+def sens(mesure):
+    """+1 si plus grand est meilleur (debits), -1 sinon (durees, iterations)."""
+    return 1 if mesure.endswith("_par_s") else -1
+
+
+def comparer(mesures, reference, tolerance=TOLERANCE_DEFAUT):
+    """
+    Regressions par rapport a `reference` : liste de (mesure, reference,
+    valeur, ecart relatif). Les iterations de convergence sont comparees
+    exactement ; les mesures absentes d'un cote sont ignorees.
+    """
+    regressions = []
+    for mesure, valeur in mesures.items():
+        ref = reference.get(mesure)
+        if ref is None or valeur is None:
+            continue
+        ecart = (valeur - ref) / ref if ref else 0.0
+        seuil = 0.0 if mesure.startswith("iterations.") else tolerance
+        if -sens(mesure) * ecart > seuil:
+            regressions.append((mesure, ref, valeur, ecart))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du moteur, du rendu PDF et du geocodage.")
+    parser.add_argument("--json", help="ecrit les resultats dans ce fichier JSON")
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="resultats de reference (JSON)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_DEFAUT,
+                        help="degradation relative toleree (0.25 = 25 %%)")
+    parser.add_argument("--rapide", action="store_true", help="moins de repetitions")
+    parser.add_argument("--enregistrer-reference", action="store_true",
+                        help="remplace la reference par ces resultats")
+    args = parser.parse_args(argv)
+
+    mesures = mesurer(args.rapide)
+    resultats = {"machine": {"python": platform.python_version(), "plateforme": platform.platform(),
+                             "processeurs": os.cpu_count()},
+                 "mesures": mesures}
+    for mesure, valeur in mesures.items():
+        print(f"{mesure:<36} {valeur:14.2f}")
+    if not any(m.startswith("pdf.") for m in mesures):
+        print("pdf : WeasyPrint indisponible, rendu non mesure")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2)
+    if args.enregistrer_reference:
+        with open(args.reference, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2)
+        print(f"Reference enregistree -> {args.reference}")
+        return 0
+    if not os.path.exists(args.reference):
+        print(f"Pas de reference ({args.reference}) : rien a comparer")
+        return 0
+    with open(args.reference, encoding="utf-8") as f:
+        reference = json.load(f)["mesures"]
+    regressions = comparer(mesures, reference, args.tolerance)
+    for mesure, ref, valeur, ecart in regressions:
+        print(f"REGRESSION {mesure} : {ref:.2f} -> {valeur:.2f} ({ecart:+.0%})")
+    if not regressions:
+        print(f"Aucune regression par rapport a {args.reference} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
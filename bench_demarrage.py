@@ -0,0 +1,105 @@
+"""
+Benchmark du demarrage de l'app : temps d'import de chaque dependance, mesure
+dans un interpreteur neuf (python -X importtime), et controle que les
+bibliotheques de rendu (WeasyPrint, matplotlib, Jinja) ne sont pas chargees
+avant le premier PDF.
+
+Usage : python bench_demarrage.py [--repetitions 3] [--json demarrage.json]
+Code retour 1 si une bibliotheque de rendu est chargee au demarrage.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Importes par app.py avant le premier widget
+DEPENDANCES_DEMARRAGE = (
+    "streamlit", "pandas", "plotly.graph_objects", "numpy", "moteur", "moteur_batch", "projection",
+    "solveur_inverse", "grille", "comparaison", "geolocalisation", "portefeuille", "rendu_pdf",
+)
+# Importees a la premiere utilisation (PDF, graphiques, geocodage, fichiers)
+DEPENDANCES_DIFFEREES = ("matplotlib.pyplot", "jinja2", "weasyprint", "httpx", "openpyxl", "pyarrow.parquet")
+MODULES_DE_RENDU = ("matplotlib", "jinja2", "weasyprint")
+
+
+def _python(code):
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=_BASE_DIR,
+                          capture_output=True, text=True)
+
+
+def _cumul_ms(sortie_importtime, module):
+    """Temps cumule (ms) de `module` dans la sortie de -X importtime."""
+    for ligne in reversed(sortie_importtime.splitlines()):
+        morceaux = ligne.split("|")
+        if len(morceaux) == 3 and morceaux[2].strip() == module:
+            return int(morceaux[1]) / 1000
+    return None
+
+
+def temps_import(module, repetitions=3):
+    """
+    Temps d'import (ms) de `module` seul dans un interpreteur neuf, minimum
+    sur `repetitions` ; None si le module ne s'importe pas ici.
+    """
+    mesures = []
+    for _ in range(repetitions):
+        resultat = _python(f"import {module}")
+        if resultat.returncode != 0:
+            return None
+        mesures.append(_cumul_ms(resultat.stderr, module))
+    return min(mesures)
+
+
+def temps_demarrage(modules=DEPENDANCES_DEMARRAGE, repetitions=3):
+    """Temps (ms) pour importer tous les `modules` ensemble (dependances communes comptees une fois)."""
+    code = "import time; t = time.perf_counter()\n" + "".join(f"import {m}\n" for m in modules) \
+        + "print((time.perf_counter() - t) * 1000)"
+    return min(float(_python(code).stdout) for _ in range(repetitions))
+
+
+def modules_de_rendu_charges(modules=DEPENDANCES_DEMARRAGE):
+    """Bibliotheques de MODULES_DE_RENDU presentes apres l'import des `modules` (liste vide attendue)."""
+    code = "import sys\n" + "".join(f"import {m}\n" for m in modules) \
+        + f"print(','.join(m for m in {MODULES_DE_RENDU!r} if m in sys.modules))"
+    resultat = _python(code)
+    if resultat.returncode != 0:
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1])
+    return [m for m in resultat.stdout.strip().split(",") if m]
+
+
+def mesurer(repetitions=3):
+    """Toutes les mesures : {"demarrage": {module: ms}, "differees": {...}, "total_ms", "rendu_charge"}."""
+    return {
+        "demarrage": {m: temps_import(m, repetitions) for m in DEPENDANCES_DEMARRAGE},
+        "differees": {m: temps_import(m, repetitions) for m in DEPENDANCES_DIFFEREES},
+        "total_ms": temps_demarrage(repetitions=repetitions),
+        "rendu_charge": modules_de_rendu_charges(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import des dependances au demarrage de l'app.")
+    parser.add_argument("--repetitions", type=int, default=3, help="mesures par module (minimum retenu)")
+    parser.add_argument("--json", help="ecrit les resultats dans ce fichier JSON")
+    args = parser.parse_args(argv)
+    resultats = mesurer(args.repetitions)
+
+    for titre, cle in (("Au demarrage", "demarrage"), ("Differees (premiere utilisation)", "differees")):
+        print(titre)
+        for module, ms in resultats[cle].items():
+            print(f"  {module:<24} {'indisponible' if ms is None else f'{ms:8.1f} ms'}")
+    print(f"Total demarrage (imports communs comptes une fois) : {resultats['total_ms']:.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2)
+    if resultats["rendu_charge"]:
+        print(f"REGRESSION : charge(s) au demarrage : {', '.join(resultats['rendu_charge'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""
+Cache LRU en memoire avec expiration (TTL), taille bornee et compteurs.
+
+Utilise pour memoiser les simulations (moteur.calculate_salary_memo) : un
+rerun Streamlit qui ne change aucune entree ne coute qu'une recherche dans
+un dict. Sans dependance, partage entre les sessions (verrou interne).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Dictionnaire borne : au-dela de `taille_max` entrees, la moins recemment
+    utilisee est evincee ; une entree plus vieille que `ttl` secondes (None =
+    pas d'expiration) est consideree absente. `horloge` est injectable (tests).
+    """
+
+    def __init__(self, taille_max=256, ttl=None, horloge=time.monotonic):
+        if taille_max < 1:
+            raise ValueError("taille_max doit etre >= 1")
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._horloge = horloge
+        self._entrees = OrderedDict()  # cle -> (instant d'insertion, valeur)
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expiree(self, instant):
+        return self.ttl is not None and self._horloge() - instant > self.ttl
+
+    def get(self, cle, defaut=None):
+        """Valeur associee a `cle` (compte un hit) ou `defaut` (compte un miss)."""
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and self._expiree(entree[0]):
+                del self._entrees[cle]
+                entree = None
+            if entree is None:
+                self.misses += 1
+                return defaut
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return entree[1]
+
+    def set(self, cle, valeur):
+        """Insere ou remplace `cle`, puis evince les entrees en surplus."""
+        with self._verrou:
+            self._entrees[cle] = (self._horloge(), valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def get_ou_calcule(self, cle, fonction):
+        """Valeur en cache, sinon fonction() memorisee (calcul hors verrou)."""
+        manquant = object()
+        valeur = self.get(cle, manquant)
+        if valeur is manquant:
+            valeur = fonction()
+            self.set(cle, valeur)
+        return valeur
+
+    def vider(self):
+        """Supprime toutes les entrees et remet les compteurs a zero."""
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Compteurs : hits, misses, evictions, taille courante et maximale."""
+        with self._verrou:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "taille": len(self._entrees), "taille_max": self.taille_max}
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            return entree is not None and not self._expiree(entree[0])
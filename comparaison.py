@@ -0,0 +1,92 @@
+"""
+Comparaison de scenarios : toutes les combinaisons des options choisies
+(reserve reintegree ou provisionnee, CDI ou CDD, mutuelle, provision CP,
+teletravail) evaluees cote a cote, avec l'ecart de chacune a la simulation
+de reference.
+
+Les combinaisons sont calculees par le moteur vectorise (moteur_batch) en un
+seul appel : les entrees communes (TJM, jours, frais...) sont des scalaires
+diffuses sur toutes les lignes, seules les options varient d'une ligne a
+l'autre. Les comparaisons sont memorisees sur leurs entrees : un rerun qui ne
+change rien ne relance pas le moteur.
+"""
+import copy
+from itertools import product
+
+from cache import CacheLRU
+from moteur_batch import calculate_salary_batch
+
+JOURS_TELETRAVAIL_COMPARAISON = 8  # "avec teletravail" si la reference n'en a pas (2 j/semaine)
+
+# Option -> (argument de calculate_salary, libelle, libelles des deux valeurs)
+OPTIONS_COMPARAISON = {
+    "reserve": ("use_reserve", "Reserve", {False: "reintegree", True: "provisionnee"}),
+    "contrat": ("type_contrat", "Contrat", {"CDI": "CDI", "CDD": "CDD"}),
+    "mutuelle": ("use_mutuelle", "Mutuelle", {True: "oui", False: "non"}),
+    "provision_cp": ("provision_cp", "Provision CP", {False: "non", True: "oui"}),
+    "teletravail": ("jours_teletravail", "Teletravail", None),
+}
+
+CHAMPS_COMPARAISON = (
+    "net_payable", "net_before_tax", "gross_salary", "employer_charges", "employee_charges",
+    "provision_reserve_financiere", "cout_global",
+)
+SCENARIOS_CACHE_TAILLE = 256
+
+_scenarios = CacheLRU(taille_max=SCENARIOS_CACHE_TAILLE)
+
+
+def valeurs_option(option, arguments):
+    """Les deux valeurs comparees pour `option`, celle de la reference en premier."""
+    if option not in OPTIONS_COMPARAISON:
+        raise ValueError(f"Option de comparaison inconnue : {option!r} (parmi {sorted(OPTIONS_COMPARAISON)})")
+    argument, _, libelles = OPTIONS_COMPARAISON[option]
+    if option == "teletravail":
+        jours = arguments.get(argument, 0)
+        return (jours, 0) if jours > 0 else (0, JOURS_TELETRAVAIL_COMPARAISON)
+    reference = arguments.get(argument, next(iter(libelles)))
+    return (reference,) + tuple(v for v in libelles if v != reference)
+
+
+def libelle_valeur(option, valeur):
+    """Libelle court d'une valeur d'option (ex. "Mutuelle : non")."""
+    _, libelle, libelles = OPTIONS_COMPARAISON[option]
+    if libelles is None:
+        return f"{libelle} : {valeur} j" if valeur else f"{libelle} : non"
+    return f"{libelle} : {libelles[valeur]}"
+
+
+def comparer_scenarios(options, **arguments):
+    """
+    Evalue chaque combinaison des `options` (cles de OPTIONS_COMPARAISON)
+    autour des `arguments` de calculate_salary (scalaires, dont params et
+    periode). Le premier scenario est la reference (valeurs des arguments).
+    Retourne une liste de {"options": {option: valeur}, "libelle",
+    "resultat": {champ: valeur}, "ecarts": {champ: ecart a la reference}}
+    pour les champs de CHAMPS_COMPARAISON (copie du resultat en cache).
+    """
+    options = list(dict.fromkeys(options))
+    cle = (tuple(options), tuple(sorted(arguments.items())))
+    return copy.deepcopy(_scenarios.get_ou_calcule(cle, lambda: _comparer(options, arguments)))
+
+
+def _comparer(options, arguments):
+    """Scenarios de comparer_scenarios, en un appel du moteur vectorise."""
+    combinaisons = list(product(*(valeurs_option(o, arguments) for o in options)))
+    colonnes = {OPTIONS_COMPARAISON[o][0]: [c[i] for c in combinaisons] for i, o in enumerate(options)}
+    communs = {k: v for k, v in arguments.items() if k not in colonnes}
+
+    res = calculate_salary_batch(**colonnes, **communs)
+    scenarios = []
+    for ligne, combinaison in enumerate(combinaisons):
+        valeurs = dict(zip(options, combinaison))
+        resultat = {champ: float(res[champ][ligne]) for champ in CHAMPS_COMPARAISON}
+        scenarios.append({
+            "options": valeurs,
+            "libelle": ", ".join(libelle_valeur(o, v) for o, v in valeurs.items()) or "Reference",
+            "resultat": resultat,
+        })
+    reference = scenarios[0]["resultat"]
+    for scenario in scenarios:
+        scenario["ecarts"] = {champ: round(v - reference[champ], 2) for champ, v in scenario["resultat"].items()}
+    return scenarios
@@ -0,0 +1,466 @@
+"""
+Corpus de non-regression (golden master) tire des classeurs Excel de
+reference : bulletins Silae des retours de simulation, valeurs attendues
+par la BU, exemple comparatif CDI/CDD et grille de la simulation annuelle.
+
+`extraire` ouvre chaque classeur une seule fois (openpyxl en lecture seule,
+valeurs en cache) et ecrit corpus_excel.json : les cas de reference avec
+leurs valeurs Excel, plus des grilles de variantes autour de chaque
+configuration, toutes avec les resultats du moteur au centime au moment de
+l'extraction. `rejouer` recalcule tout le corpus par le moteur vectorise
+(un appel par configuration) et liste les ecarts en centimes : au moteur
+enregistre (regression) et aux classeurs (ecarts connus, informatifs).
+
+Usage : python corpus_excel.py extraire [--dossier .] [--sortie corpus_excel.json]
+        python corpus_excel.py rejouer [--corpus corpus_excel.json] [--scalaire] [--centimes] [--excel]
+Code retour 1 si un resultat du moteur a change. Avec --centimes, le corpus
+est rejoue en arithmetique en centimes : les ecarts au moteur enregistre
+(flottant) sont alors attendus et seulement resumes.
+"""
+import argparse
+import inspect
+import json
+import os
+import re
+import time
+import unicodedata
+import warnings
+from dataclasses import replace
+from itertools import product
+
+import numpy as np
+
+from moteur import PERIODE_DEFAUT, REGISTRE_BAREMES, calculate_salary, parametres_pour_bareme
+from moteur_batch import calculate_salary_batch
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(_BASE_DIR, "corpus_excel.json")
+VERSION_CORPUS = 1
+
+CLASSEUR_V2 = "RETOUR SIMUL V2 2.xlsx"
+CLASSEUR_V4 = "RETOUR SIMUL V4.xlsx"
+CLASSEUR_TABLEAU_V4 = "TABLEAU_CALCULS_V4.xlsx"
+CLASSEUR_ANNUEL = "Simulation Annuelle Temps Complet 2025 - Modifiée.xlsx"
+CLASSEURS = (CLASSEUR_V2, CLASSEUR_V4, CLASSEUR_TABLEAU_V4, CLASSEUR_ANNUEL)
+
+# Champs du resultat compares (complement_total = complement + complement d'apport d'affaires)
+CHAMPS_CORPUS = (
+    "base_salary", "prime_apport", "reserve_brute", "complement_remuneration", "complement_apport_affaires",
+    "complement_total", "indemnite_cp", "gross_salary", "employee_charges", "employer_charges",
+    "net_before_tax", "net_payable", "provision_reserve_financiere", "cout_global",
+)
+CHAMPS_DERIVES = {"complement_total": ("complement_remuneration", "complement_apport_affaires")}
+CHAMPS_VARIANTES = (
+    "gross_salary", "employee_charges", "employer_charges", "net_before_tax",
+    "provision_reserve_financiere", "cout_global",
+)
+
+# Libelles Excel (majuscules, sans accents) -> champ du resultat
+LIBELLES_CHAMPS = {
+    "SALAIRE DE BASE": "base_salary",
+    "INDEMNITE APPORT AFFAIRES": "prime_apport",
+    "PRIME D'APPORT D'AFFAIRES": "prime_apport",
+    "PRIME D'APPORT": "prime_apport",
+    "RESERVE FINANCIERE": "reserve_brute",
+    "RESERVE / PRECARITE": "reserve_brute",
+    "COMPLEMENT DE REMUNERATION": "complement_remuneration",
+    "COMPLEMENT APPORT AFFAIRES": "complement_apport_affaires",
+    "COMPLEMENT APPORT D'AFFAIRES": "complement_apport_affaires",
+    "COMPLEMENT TOTAL": "complement_total",
+    "INDEMNITES CONGES PAYES": "indemnite_cp",
+    "INDEMNITES DE CONGES PAYES": "indemnite_cp",
+    "ICP": "indemnite_cp",
+    "SALAIRE BRUT": "gross_salary",
+    "CHARGES SALARIALES": "employee_charges",
+    "CHARGES PATRONALES": "employer_charges",
+    "NET AVANT IMPOTS": "net_before_tax",
+    "BRUT MAJ": "gross_salary",
+    "MTT CH PAT SIMUL MAJ": "employer_charges",
+    "SALAIRE NET SIMUL MAJ": "net_before_tax",
+}
+
+# Colonnes lues dans la grille annuelle (la simulation "MAJ", pas l'ancien calcul par taux)
+COLONNES_GRILLE = ("BRUT MAJ", "MTT CH PAT SIMUL MAJ", "SALAIRE NET SIMUL MAJ")
+
+# Bloc "Ce qu'on doit avoir" des retours V4 : cas V1 (TJM 500, 19 j, 5 %) avec la reserve reintegree
+ARGUMENTS_RESERVE_REINTEGREE = dict(tjm=500.0, days_worked_month=19.0, use_reserve=False, use_mutuelle=True)
+
+# Grilles de variantes autour de chaque configuration (produit des axes, dans cet ordre)
+AXES_VARIANTES = {
+    "tjm": [float(t) for t in range(150, 1501, 50)],
+    "days_worked_month": [5.0, 10.0, 19.0, 22.0],
+    "type_contrat": ["CDI", "CDD"],
+    "use_reserve": [True, False],
+    "provision_cp": [False, True],
+}
+
+_ARGUMENTS_BATCH = {nom: p.default for nom, p in inspect.signature(calculate_salary_batch).parameters.items()
+                    if p.default is not inspect.Parameter.empty and nom not in ("params", "periode", "arithmetique")}
+
+
+def _texte(valeur):
+    """Libelle normalise : majuscules, sans accents ni espaces superflus."""
+    texte = unicodedata.normalize("NFKD", str(valeur).replace("’", "'"))
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    return " ".join(texte.upper().replace(" :", "").split())
+
+
+def _montant(valeur):
+    """Montant d'une cellule (nombre ou texte "2 374,00EUR") ; None si vide ou approche ("~")."""
+    if isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+        return float(valeur)
+    if not isinstance(valeur, str) or valeur.strip().startswith("~"):
+        return None
+    texte = re.sub(r"[\s  €]", "", valeur).replace(",", ".")
+    return float(texte) if re.fullmatch(r"-?\d+(\.\d+)?", texte) else None
+
+
+def centimes(valeur):
+    """Montant en centimes entiers (arrondi au plus proche)."""
+    return int(round(valeur * 100))
+
+
+def lire_classeur(chemin):
+    """Toutes les feuilles du classeur {nom: [lignes]} (lecture seule, valeurs en cache des formules)."""
+    from openpyxl import load_workbook
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Data Validation extension")  # validations non lues
+        classeur = load_workbook(chemin, read_only=True, data_only=True)
+        try:
+            return {feuille.title: [list(ligne) for ligne in feuille.iter_rows(values_only=True)]
+                    for feuille in classeur.worksheets}
+        finally:
+            classeur.close()
+
+
+def _hypotheses(lignes):
+    """
+    Arguments du moteur et parametres lus dans l'entete "Elements pris en
+    compte" (19j/mois, TJM 500 EUR, Frais de gestion 5 %, Avec Mutuelle...) ;
+    None si l'entete est absent.
+    """
+    texte = " | ".join(_texte(v) for ligne in lignes[:10] for v in ligne if isinstance(v, str))
+    tjm = re.search(r"TJM (\d+(?:[.,]\d+)?)", texte)
+    jours = re.search(r"(\d+(?:[.,]\d+)?) ?J/MOIS", texte)
+    if not (tjm and jours):
+        return None
+    arguments = dict(tjm=float(tjm.group(1).replace(",", ".")),
+                     days_worked_month=float(jours.group(1).replace(",", ".")),
+                     use_mutuelle="SANS MUTUELLE" not in texte)
+    params = {}
+    gestion = re.search(r"FRAIS DE GESTION (\d+(?:[.,]\d+)?) ?%", texte)
+    if gestion:
+        params["frais_gestion"] = float(gestion.group(1).replace(",", "."))
+    return arguments, params
+
+
+def _cas(fichier, feuille, ligne, arguments, excel, params=None, periode=None, suffixe=""):
+    return {"id": f"{fichier}|{feuille}|L{ligne}{suffixe}", "periode": periode, "params": params or {},
+            "arguments": arguments, "excel": {champ: centimes(v) for champ, v in excel.items()}}
+
+
+def cas_bulletins_silae(fichier, feuille, lignes):
+    """
+    Lignes "SIMULATION SILAE" des retours de simulation : bulletin de reference
+    (reserve provisionnee, hors brut) avec les hypotheses de l'entete.
+    """
+    hypotheses = _hypotheses(lignes)
+    cas = []
+    for i, ligne in enumerate(lignes):
+        if not (hypotheses and ligne and _texte(ligne[0] or "") == "SIMULATION SILAE"):
+            continue
+        entete = next(lignes[j] for j in range(i - 1, -1, -1) if "SALAIRE BRUT" in map(_texte, lignes[j]))
+        libelles = [_texte(v) if v else "" for v in entete]
+        excel = {}
+        for libelle, valeur in zip(libelles, ligne):
+            champ = LIBELLES_CHAMPS.get(libelle)
+            # Sans colonne dediee, le complement d'apport d'affaires est compte dans le complement
+            if champ == "complement_remuneration" and "COMPLEMENT APPORT AFFAIRES" not in libelles:
+                champ = "complement_total"
+            if champ and _montant(valeur) is not None:
+                excel[champ] = _montant(valeur)
+        arguments, params = hypotheses
+        cas.append(_cas(fichier, feuille, i + 1, dict(arguments, use_reserve=True), excel, params))
+    return cas
+
+
+def cas_valeurs_attendues(fichier, feuille, lignes):
+    """Blocs "Ce qu'on doit avoir" (libelle, montant) jusqu'au salaire brut : reserve reintegree."""
+    cas = []
+    for i, ligne in enumerate(lignes):
+        if not any(isinstance(v, str) and _texte(v).startswith("CE QU'ON DOIT AVOIR") for v in ligne):
+            continue
+        excel = {}
+        for suite in lignes[i:i + 12]:
+            cellules = [v for v in suite if v is not None]
+            for libelle, valeur in zip(cellules, cellules[1:]):
+                champ = LIBELLES_CHAMPS.get(_texte(libelle)) if isinstance(libelle, str) else None
+                if champ and _montant(valeur) is not None:
+                    excel[champ] = _montant(valeur)
+            if "gross_salary" in excel:
+                break
+        cas.append(_cas(fichier, feuille, i + 1, dict(ARGUMENTS_RESERVE_REINTEGREE), excel))
+    return cas
+
+
+def cas_exemple_comparatif(fichier, feuille, lignes):
+    """
+    Tableau "EXEMPLE COMPARATIF (TJM 500EUR, 19j, 5% gestion, reintegree)" :
+    un cas CDI et un cas CDD ; les valeurs approchees ("~") sont ignorees.
+    """
+    cas = []
+    for i, ligne in enumerate(lignes):
+        titre = _texte(ligne[0] or "")
+        if not titre.startswith("EXEMPLE COMPARATIF"):
+            continue
+        tjm, jours, gestion = (float(re.search(motif, titre).group(1))
+                               for motif in (r"TJM (\d+)", r"(\d+) ?J\b", r"(\d+) ?% GESTION"))
+        entete = [_texte(v or "") for v in lignes[i + 1]]
+        for colonne, contrat in ((entete.index("CDI"), "CDI"), (entete.index("CDD"), "CDD")):
+            excel = {}
+            for suite in lignes[i + 2:]:
+                if not suite[0]:
+                    break
+                champ = LIBELLES_CHAMPS.get(_texte(suite[0]).split(" (")[0])
+                if champ and _montant(suite[colonne]) is not None:
+                    excel[champ] = _montant(suite[colonne])
+            arguments = dict(tjm=tjm, days_worked_month=jours, type_contrat=contrat,
+                             use_reserve="REINTEGREE" not in titre, use_mutuelle=True)
+            cas.append(_cas(fichier, feuille, i + 1, arguments, excel, {"frais_gestion": gestion},
+                            suffixe=f"|{contrat}"))
+    return cas
+
+
+def cas_grille_annuelle(fichier, feuille, lignes):
+    """
+    Grille "montant disponible -> brut, charges patronales, net" de la
+    simulation annuelle : un cas par ligne, le montant disponible etant le CA
+    d'une journee sans frais de gestion, reserve reintegree (brut + charges =
+    montant disponible), PMSS et mutuelle lus dans la feuille.
+    """
+    annee = re.search(r"20\d\d", fichier).group(0)
+    valeurs = {_texte(ligne[1]): ligne for ligne in lignes if len(ligne) > 7 and isinstance(ligne[1], str)}
+    params = {"frais_gestion": 0.0}
+    pmss = valeurs.get("PMSS", [None] * 8)[7]
+    if pmss and pmss != REGISTRE_BAREMES.pour_periode(annee).pmss:
+        params["pmss"] = float(pmss)
+    mutuelle = _texte(valeurs.get("MUTUELLE", [None] * 5)[4] or "OUI") == "OUI"
+
+    cas = []
+    for i, ligne in enumerate(lignes):
+        libelles = [_texte(v) if isinstance(v, str) else "" for v in ligne]
+        if "MONTANT DISPONIBLE" not in libelles or "BRUT MAJ" not in libelles:
+            continue
+        colonne_dispo = libelles.index("MONTANT DISPONIBLE")
+        colonnes = {LIBELLES_CHAMPS[l]: j for j, l in enumerate(libelles) if l in COLONNES_GRILLE}
+        for j, suite in enumerate(lignes[i + 1:], start=i + 2):
+            disponible = _montant(suite[colonne_dispo])
+            if disponible is None:
+                if cas:
+                    break
+                continue
+            excel = {champ: _montant(suite[c]) for champ, c in colonnes.items() if _montant(suite[c]) is not None}
+            arguments = dict(tjm=disponible, days_worked_month=1.0, use_reserve=False, use_mutuelle=mutuelle)
+            cas.append(_cas(fichier, feuille, j, arguments, excel, params, periode=f"{annee}-01"))
+    return cas
+
+
+EXTRACTEURS = {
+    CLASSEUR_V2: {"OBSERVATIONS SIMULATEUR": (cas_bulletins_silae,)},
+    CLASSEUR_V4: {"V1": (cas_bulletins_silae,), "V2 V3": (cas_bulletins_silae, cas_valeurs_attendues),
+                  "V4": (cas_valeurs_attendues,)},
+    CLASSEUR_TABLEAU_V4: {"CDI vs CDD": (cas_exemple_comparatif,)},
+    CLASSEUR_ANNUEL: {"a remplir": (cas_grille_annuelle,)},
+}
+
+
+def _configuration(cas):
+    """Cle (periode, params) : les cas d'une meme configuration partagent un appel au moteur."""
+    return cas["periode"], json.dumps(cas["params"], sort_keys=True)
+
+
+def _parametres(periode, params):
+    bareme = REGISTRE_BAREMES.pour_periode(PERIODE_DEFAUT if periode is None else periode)
+    return replace(parametres_pour_bareme(bareme), **params)
+
+
+def _evaluer(periode, params, lignes, champs, scalaire=False, arithmetique="flottant"):
+    """
+    Resultats {champ: [centimes]} des `lignes` (dicts d'arguments) d'une meme
+    configuration : un appel vectorise, ou un calculate_salary par ligne.
+    """
+    p = _parametres(periode, params)
+    if scalaire:
+        resultats = [calculate_salary(**dict(_ARGUMENTS_BATCH, **ligne), params=p, periode=periode,
+                                      arithmetique=arithmetique)
+                     for ligne in lignes]
+        colonnes = {cle: np.array([r[cle] for r in resultats], dtype=float)
+                    for cle in {c for champ in champs for c in CHAMPS_DERIVES.get(champ, (champ,))}}
+    else:
+        noms = sorted({nom for ligne in lignes for nom in ligne})
+        arguments = {nom: np.array([ligne[nom] if nom in ligne else _ARGUMENTS_BATCH[nom] for ligne in lignes])
+                     for nom in noms}
+        colonnes = calculate_salary_batch(**arguments, params=p, periode=periode, arithmetique=arithmetique)
+    sortie = {}
+    for champ in champs:
+        valeurs = sum(colonnes[c] for c in CHAMPS_DERIVES.get(champ, (champ,)))
+        sortie[champ] = [centimes(float(v)) for v in valeurs]
+    return sortie
+
+
+def lignes_variantes(groupe):
+    """Arguments de chaque variante du groupe : base du groupe x produit de ses axes."""
+    axes = groupe["axes"]
+    return [dict(groupe["base"], **dict(zip(axes, valeurs))) for valeurs in product(*axes.values())]
+
+
+def extraire(dossier=_BASE_DIR, classeurs=CLASSEURS, axes=None):
+    """
+    Corpus complet depuis les `classeurs` du `dossier` : {"version",
+    "champs", "references": [cas], "variantes": [groupes]}. Les cas
+    identiques (meme classeur recopie dans plusieurs onglets) sont fusionnes.
+    """
+    references = {}
+    for fichier in classeurs:
+        feuilles = lire_classeur(os.path.join(dossier, fichier))
+        for feuille, extracteurs in EXTRACTEURS[fichier].items():
+            for extracteur in extracteurs:
+                for cas in extracteur(fichier, feuille, feuilles[feuille]):
+                    cle = json.dumps([cas["periode"], cas["params"], cas["arguments"], cas["excel"]], sort_keys=True)
+                    if cle in references:
+                        references[cle].setdefault("doublons", []).append(cas["id"])
+                    else:
+                        references[cle] = cas
+    references = list(references.values())
+
+    configurations = {}
+    for cas in references:
+        configurations.setdefault(_configuration(cas), []).append(cas)
+    variantes = []
+    for (periode, _), groupe in configurations.items():
+        valeurs = _evaluer(periode, groupe[0]["params"], [c["arguments"] for c in groupe], CHAMPS_CORPUS)
+        for k, cas in enumerate(groupe):
+            cas["moteur"] = {champ: valeurs[champ][k] for champ in CHAMPS_CORPUS}
+        base = {"use_mutuelle": groupe[0]["arguments"].get("use_mutuelle", True)}
+        variante = {"periode": periode, "params": groupe[0]["params"], "base": base,
+                    "axes": axes or AXES_VARIANTES}
+        variante["moteur"] = _evaluer(periode, variante["params"], lignes_variantes(variante), CHAMPS_VARIANTES)
+        variantes.append(variante)
+    return {"version": VERSION_CORPUS, "champs": list(CHAMPS_CORPUS), "references": references,
+            "variantes": variantes}
+
+
+def ecrire_corpus(corpus, chemin=CORPUS_PATH):
+    """Ecrit le corpus en JSON compact : une ligne par cas de reference et par groupe de variantes."""
+    def ligne(valeur):
+        return json.dumps(valeur, ensure_ascii=False, separators=(",", ":"))
+
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write(f'{{"version":{corpus["version"]},"champs":{ligne(corpus["champs"])},\n"references":[\n')
+        f.write(",\n".join(ligne(cas) for cas in corpus["references"]))
+        f.write('\n],\n"variantes":[\n')
+        f.write(",\n".join(ligne(groupe) for groupe in corpus["variantes"]))
+        f.write("\n]}\n")
+
+
+def charger_corpus(chemin=CORPUS_PATH):
+    """Corpus ecrit par ecrire_corpus."""
+    with open(chemin, encoding="utf-8") as f:
+        corpus = json.load(f)
+    if corpus.get("version") != VERSION_CORPUS:
+        raise ValueError(f"Version de corpus non supportee : {corpus.get('version')!r} "
+                         f"(attendue {VERSION_CORPUS}, relancer l'extraction)")
+    return corpus
+
+
+def rejouer(corpus, scalaire=False, tolerance=0, arithmetique="flottant"):
+    """
+    Recalcule tout le corpus (un appel au moteur par configuration) et compare
+    au centime. Retourne {"cas", "duree", "moteur": [ecarts], "excel":
+    [ecarts]} ; un ecart est (id, champ, attendu, obtenu) en centimes, retenu
+    au-dela de `tolerance` centimes. `scalaire` : calculate_salary cas par cas
+    au lieu du moteur vectorise (valide le solveur scalaire, plus lent).
+    `arithmetique` : voir calculate_salary ; le corpus enregistre les
+    resultats en flottant.
+    """
+    debut = time.perf_counter()
+    lots = {}  # configuration -> (periode, params, lignes d'arguments, [(id, attendu moteur, attendu excel)])
+
+    def ajouter(cas, arguments, ident, moteur, excel):
+        periode, params, lignes, attentes = lots.setdefault(
+            _configuration(cas), (cas["periode"], cas["params"], [], []))
+        lignes.append(arguments)
+        attentes.append((ident, moteur, excel))
+
+    for cas in corpus["references"]:
+        ajouter(cas, cas["arguments"], cas["id"], cas["moteur"], cas["excel"])
+    for g, groupe in enumerate(corpus["variantes"]):
+        for k, arguments in enumerate(lignes_variantes(groupe)):
+            ident = f"variante {g}.{k} (" + ", ".join(f"{nom}={v}" for nom, v in arguments.items()) + ")"
+            ajouter(groupe, arguments, ident, {champ: v[k] for champ, v in groupe["moteur"].items()}, {})
+
+    ecarts = {"moteur": [], "excel": []}
+    for periode, params, lignes, attentes in lots.values():
+        valeurs = _evaluer(periode, params, lignes, corpus["champs"], scalaire, arithmetique)
+        for k, (ident, *attendus) in enumerate(attentes):
+            for cle, attendu in zip(ecarts, attendus):
+                for champ, valeur in attendu.items():
+                    if abs(valeurs[champ][k] - valeur) > tolerance:
+                        ecarts[cle].append((ident, champ, valeur, valeurs[champ][k]))
+    return {"cas": sum(len(lot[2]) for lot in lots.values()), "duree": time.perf_counter() - debut, **ecarts}
+
+
+def _afficher(ecarts, limite):
+    for ident, champ, attendu, obtenu in ecarts[:limite]:
+        print(f"  {ident} {champ} : {attendu / 100:.2f} -> {obtenu / 100:.2f} ({(obtenu - attendu) / 100:+.2f})")
+    if len(ecarts) > limite:
+        print(f"  ... et {len(ecarts) - limite} autres")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corpus de non-regression tire des classeurs Excel de reference.")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    extraction = commandes.add_parser("extraire", help="lit les classeurs et ecrit le corpus")
+    extraction.add_argument("--dossier", default=_BASE_DIR, help="dossier des classeurs")
+    extraction.add_argument("--sortie", default=CORPUS_PATH, help="fichier corpus (JSON)")
+    rejeu = commandes.add_parser("rejouer", help="recalcule le corpus et liste les ecarts")
+    rejeu.add_argument("--corpus", default=CORPUS_PATH, help="fichier corpus (JSON)")
+    rejeu.add_argument("--scalaire", action="store_true", help="calculate_salary cas par cas")
+    rejeu.add_argument("--centimes", action="store_true", help="arithmetique en centimes entiers")
+    rejeu.add_argument("--tolerance", type=int, default=0, help="ecart tolere (centimes)")
+    rejeu.add_argument("--excel", action="store_true", help="detaille les ecarts aux classeurs")
+    rejeu.add_argument("--limite", type=int, default=20, help="ecarts affiches par categorie")
+    args = parser.parse_args(argv)
+
+    if args.commande == "extraire":
+        corpus = extraire(args.dossier)
+        ecrire_corpus(corpus, args.sortie)
+        variantes = sum(len(lignes_variantes(g)) for g in corpus["variantes"])
+        print(f"{len(corpus['references'])} cas de reference et {variantes} variantes -> {args.sortie}")
+        return 0
+
+    arithmetique = "centimes" if args.centimes else "flottant"
+    rapport = rejouer(charger_corpus(args.corpus), args.scalaire, args.tolerance, arithmetique)
+    print(f"{rapport['cas']} cas rejoues en {rapport['duree']:.2f} s "
+          f"({rapport['cas'] / rapport['duree']:.0f} cas/s, moteur {'scalaire' if args.scalaire else 'vectorise'}, "
+          f"arithmetique {arithmetique})")
+    cas_excel = len({e[0] for e in rapport["excel"]})
+    print(f"Ecarts aux classeurs Excel (connus, informatifs) : {len(rapport['excel'])} valeurs sur {cas_excel} cas")
+    if args.excel:
+        _afficher(rapport["excel"], args.limite)
+    if args.centimes:
+        ecart_max = max((abs(obtenu - attendu) for _, _, attendu, obtenu in rapport["moteur"]), default=0)
+        print(f"Ecarts au moteur flottant enregistre (informatifs) : {len(rapport['moteur'])} valeurs, "
+              f"au plus {ecart_max} centime(s)")
+        return 0
+    if rapport["moteur"]:
+        print(f"REGRESSION : {len(rapport['moteur'])} valeurs differentes du moteur enregistre")
+        _afficher(rapport["moteur"], args.limite)
+        return 1
+    print("Aucun ecart au moteur enregistre")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
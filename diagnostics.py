@@ -0,0 +1,151 @@
+"""
+Instrumentation optionnelle des chemins critiques : durees (appels, cumul,
+max) et compteurs (iterations de convergence, requetes, lignes...) par
+phase : moteur (simulation, convergence, cotisations, RGDU), moteur
+vectorise, graphiques, rendu PDF (WeasyPrint) et geocodage.
+
+Desactivee par defaut : une fonction instrumentee ne paie alors qu'un test
+de booleen. Activation par `activer()` (panneau de diagnostics de l'app,
+?diagnostics=1) ou par la variable d'environnement SIMULATEUR_DIAGNOSTICS
+pour les executions sans interface : "1" ecrit le resume en une ligne JSON
+sur la sortie d'erreur a la fin du processus, un chemin l'ajoute a ce
+fichier (JSON Lines).
+
+Les mesures sont globales au processus (toutes les sessions de l'app) et
+protegees par un verrou ; les rendus PDF d'un pool de processus sont
+reportes par le processus parent.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+VARIABLE_ENV = "SIMULATEUR_DIAGNOSTICS"
+
+_actif = False
+_verrou = threading.Lock()
+_durees = {}     # nom -> [appels, cumul (s), max (s)]
+_compteurs = {}  # nom -> [n, cumul, max]
+_INACTIF = nullcontext()
+
+
+def activer(actif=True):
+    """Active (ou desactive) la collecte ; les mesures deja faites sont gardees."""
+    global _actif
+    _actif = bool(actif)
+
+
+def est_actif():
+    return _actif
+
+
+def reinitialiser():
+    """Efface toutes les mesures."""
+    with _verrou:
+        _durees.clear()
+        _compteurs.clear()
+
+
+def enregistrer(nom, duree):
+    """Ajoute une duree (secondes) a la phase `nom` (sans effet si inactif)."""
+    if not _actif:
+        return
+    with _verrou:
+        mesure = _durees.setdefault(nom, [0, 0.0, 0.0])
+        mesure[0] += 1
+        mesure[1] += duree
+        mesure[2] = max(mesure[2], duree)
+
+
+def compter(nom, valeur=1):
+    """Ajoute `valeur` au compteur `nom` (ex. iterations d'une convergence)."""
+    if not _actif:
+        return
+    with _verrou:
+        compteur = _compteurs.setdefault(nom, [0, 0, 0])
+        compteur[0] += 1
+        compteur[1] += valeur
+        compteur[2] = max(compteur[2], valeur)
+
+
+class _Chrono:
+    __slots__ = ("nom", "debut")
+
+    def __init__(self, nom):
+        self.nom = nom
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        enregistrer(self.nom, time.perf_counter() - self.debut)
+        return False
+
+
+def chrono(nom):
+    """Contexte qui chronometre son bloc sous `nom` (contexte vide si inactif)."""
+    return _Chrono(nom) if _actif else _INACTIF
+
+
+def mesure(nom):
+    """Decorateur : chronometre chaque appel de la fonction sous `nom`."""
+    def decorer(fonction):
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                enregistrer(nom, time.perf_counter() - debut)
+        return enveloppe
+    return decorer
+
+
+def resume():
+    """
+    Mesures collectees : {"durees": {nom: {"appels", "total_ms", "moyenne_ms",
+    "max_ms"}}, "compteurs": {nom: {"n", "total", "moyenne", "max"}}}, par nom.
+    """
+    with _verrou:
+        durees = {nom: list(m) for nom, m in _durees.items()}
+        compteurs = {nom: list(c) for nom, c in _compteurs.items()}
+    return {
+        "durees": {nom: {"appels": n, "total_ms": total * 1000, "moyenne_ms": total * 1000 / n,
+                         "max_ms": maxi * 1000}
+                   for nom, (n, total, maxi) in sorted(durees.items())},
+        "compteurs": {nom: {"n": n, "total": total, "moyenne": total / n, "max": maxi}
+                      for nom, (n, total, maxi) in sorted(compteurs.items())},
+    }
+
+
+def ecrire_resume(destination=None):
+    """
+    Ecrit le resume en une ligne JSON ({"evenement": "diagnostics",
+    "horodatage", "pid", "durees", "compteurs"}) : sur la sortie d'erreur si
+    `destination` est None, sinon en fin du fichier `destination`.
+    """
+    ligne = json.dumps(dict(evenement="diagnostics", horodatage=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                            pid=os.getpid(), **resume()), ensure_ascii=False)
+    if destination is None:
+        print(ligne, file=sys.stderr)
+    else:
+        with open(destination, "a", encoding="utf-8") as f:
+            f.write(ligne + "\n")
+
+
+def _depuis_environnement():
+    valeur = os.environ.get(VARIABLE_ENV, "").strip()
+    if valeur in ("", "0"):
+        return
+    activer()
+    atexit.register(ecrire_resume, None if valeur == "1" else valeur)
+
+
+_depuis_environnement()
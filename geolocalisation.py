@@ -0,0 +1,445 @@
+"""
+Geocodage d'adresses et calcul de trajets (api-adresse.data.gouv.fr, OSRM).
+
+Un client HTTP asynchrone unique (httpx, connexions reutilisees) tourne dans
+une boucle d'evenements dediee ; l'app l'appelle par des methodes
+synchrones. Les adresses et les trajets sont gardes dans un cache SQLite
+persistant : un redemarrage ne refait pas les requetes deja faites ; ses
+acces (bloquants) passent par un thread (`asyncio.to_thread`) pour ne pas
+figer la boucle partagee, et un lot de trajets est lu et ecrit en une fois.
+L'autocompletion est "debouncee" par session et par champ : une saisie
+remplacee avant la fin du delai est abandonnee sans requete, et
+`ServiceGeo.suggerer` rend la main tout de suite (recherche en
+arriere-plan) au lieu de bloquer le script.
+
+Pour un portefeuille, `ServiceGeo.distances` calcule les trajets de
+nombreux couples d'adresses en une fois : adresses dedoublonnees et
+geocodees en parallele, trajets demandes par matrices (endpoint "table"
+d'OSRM), estimation a vol d'oiseau si le routage est indisponible.
+
+Les URL des services et le chemin du cache sont configurables (variables
+d'environnement ou arguments de ServiceGeo), par exemple pour tester hors
+ligne contre un serveur local.
+
+Usage : python geolocalisation.py consultants.xlsx distances.csv
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import CancelledError
+from contextlib import closing
+from functools import lru_cache
+
+import diagnostics
+from cache import CacheLRU
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+URL_GEOCODAGE = os.environ.get("SIMULATEUR_URL_GEOCODAGE", "https://api-adresse.data.gouv.fr/search/")
+URL_ROUTAGE = os.environ.get("SIMULATEUR_URL_ROUTAGE", "https://router.project-osrm.org")
+CHEMIN_CACHE_GEO = os.environ.get("SIMULATEUR_CACHE_GEO", os.path.join(_BASE_DIR, "cache_geo.sqlite"))
+DUREE_CACHE_GEO = 30 * 24 * 3600  # secondes
+DELAI_DEBOUNCE = 0.3  # secondes sans nouvelle saisie avant d'interroger le geocodeur
+SAISIES_SUIVIES = 1024  # (session, champ) dont la derniere recherche en arriere-plan est gardee
+LONGUEUR_MIN_ADRESSE = 5
+TIMEOUT_GEOCODAGE = 5
+TIMEOUT_ROUTAGE = 10
+REQUETES_SIMULTANEES = 8
+TAILLE_TABLE = 50  # sources (et destinations) par requete table OSRM
+CLES_PAR_LECTURE = 500  # parametres par requete SQLite (limite 999 des anciennes versions)
+RAYON_TERRE_KM = 6371.0
+COEFFICIENT_DETOUR = 1.3  # route / vol d'oiseau, pour l'estimation sans routage
+VITESSE_ESTIMEE_KMH = 60.0
+COLONNES_DISTANCES = (
+    "ligne", "nom", "adresse_domicile", "adresse_mission", "distance_km", "km_aller_retour", "jours",
+    "km_mois", "duree_min", "source", "erreur",
+)
+
+
+def normaliser_adresse(adresse):
+    """Cle de cache d'une saisie : minuscules, espaces reduits."""
+    return re.sub(r"\s+", " ", adresse.strip().lower())
+
+
+def cle_trajet(lat1, lon1, lat2, lon2):
+    """Cle de cache d'un trajet : coordonnees arrondies a ~1 m."""
+    return f"{lat1:.5f},{lon1:.5f};{lat2:.5f},{lon2:.5f}"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance a vol d'oiseau (km) entre deux points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * RAYON_TERRE_KM * math.asin(math.sqrt(a))
+
+
+def trajet_estime(lat1, lon1, lat2, lon2):
+    """Trajet estime sans routage : vol d'oiseau x COEFFICIENT_DETOUR, a VITESSE_ESTIMEE_KMH."""
+    distance_km = round(haversine_km(lat1, lon1, lat2, lon2) * COEFFICIENT_DETOUR, 1)
+    return {"distance_km": distance_km, "duree_min": round(distance_km / VITESSE_ESTIMEE_KMH * 60, 0),
+            "source": "haversine"}
+
+
+class CacheGeo:
+    """
+    Cache SQLite des adresses geocodees et des trajets, partage entre
+    processus et redemarrages. Une entree plus vieille que `duree` secondes
+    est consideree absente. `horloge` est injectable (tests).
+    """
+
+    def __init__(self, chemin=CHEMIN_CACHE_GEO, duree=DUREE_CACHE_GEO, horloge=time.time):
+        self.chemin = chemin
+        self.duree = duree
+        self._horloge = horloge
+        with closing(self._connexion()) as cx, cx:
+            cx.execute("PRAGMA journal_mode=WAL")
+            cx.execute("CREATE TABLE IF NOT EXISTS adresses (cle TEXT PRIMARY KEY, valeur TEXT, instant REAL)")
+            cx.execute("CREATE TABLE IF NOT EXISTS trajets (cle TEXT PRIMARY KEY, valeur TEXT, instant REAL)")
+
+    def _connexion(self):
+        return sqlite3.connect(self.chemin, timeout=10)
+
+    def lire(self, table, cle):
+        """Valeur (decodee du JSON) ou None si absente ou expiree."""
+        with closing(self._connexion()) as cx:
+            ligne = cx.execute(f"SELECT valeur, instant FROM {table} WHERE cle = ?", (cle,)).fetchone()
+        if ligne is None or self._horloge() - ligne[1] > self.duree:
+            return None
+        return json.loads(ligne[0])
+
+    def lire_plusieurs(self, table, cles):
+        """{cle: valeur} des cles presentes et non expirees, sur une seule connexion."""
+        cles = list(dict.fromkeys(cles))
+        valeurs = {}
+        with closing(self._connexion()) as cx:
+            for i in range(0, len(cles), CLES_PAR_LECTURE):
+                lot = cles[i:i + CLES_PAR_LECTURE]
+                valeurs.update((cle, (valeur, instant)) for cle, valeur, instant in cx.execute(
+                    f"SELECT cle, valeur, instant FROM {table} WHERE cle IN ({','.join('?' * len(lot))})", lot))
+        maintenant = self._horloge()
+        return {cle: json.loads(valeur) for cle, (valeur, instant) in valeurs.items()
+                if maintenant - instant <= self.duree}
+
+    def ecrire(self, table, cle, valeur):
+        self.ecrire_plusieurs(table, {cle: valeur})
+
+    def ecrire_plusieurs(self, table, valeurs):
+        """Ecrit {cle: valeur} en une transaction."""
+        instant = self._horloge()
+        with closing(self._connexion()) as cx, cx:
+            cx.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)",
+                           [(cle, json.dumps(valeur), instant) for cle, valeur in valeurs.items()])
+
+    def compter(self, table):
+        with closing(self._connexion()) as cx:
+            return cx.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class ServiceGeo:
+    """
+    Client de geocodage et de routage : requetes asynchrones sur un client
+    httpx partage (boucle d'evenements dans un thread dedie), cache SQLite
+    persistant lu hors de la boucle, debounce de l'autocompletion par
+    session et champ de saisie.
+    """
+
+    def __init__(self, url_geocodage=URL_GEOCODAGE, url_routage=URL_ROUTAGE, chemin_cache=CHEMIN_CACHE_GEO,
+                 delai_debounce=DELAI_DEBOUNCE):
+        self.url_geocodage = url_geocodage
+        self.url_routage = url_routage.rstrip("/")
+        self.delai_debounce = delai_debounce
+        self.cache = CacheGeo(chemin_cache)
+        self.requetes = 0  # requetes HTTP effectivement envoyees
+        self._client = None
+        self._limite = None
+        self._en_attente = {}  # (session, champ) -> tache debouncee en cours
+        self._recherches = CacheLRU(SAISIES_SUIVIES)  # (session, champ) -> (saisie, future)
+        self._boucle = asyncio.new_event_loop()
+        threading.Thread(target=self._boucle.run_forever, name="service-geo", daemon=True).start()
+
+    # --- Cote boucle d'evenements ---
+    def _http(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=REQUETES_SIMULTANEES, max_keepalive_connections=4),
+                headers={"User-Agent": "simulateur-portage"})
+            self._limite = asyncio.Semaphore(REQUETES_SIMULTANEES)
+        return self._client
+
+    async def _get_json(self, url, params, timeout):
+        import httpx
+
+        client = self._http()
+        async with self._limite:
+            try:
+                self.requetes += 1
+                with diagnostics.chrono("geo.requete"):
+                    reponse = await client.get(url, params=params, timeout=timeout)
+                reponse.raise_for_status()
+                return reponse.json()
+            except (httpx.HTTPError, ValueError):
+                return None
+
+    async def geocoder_async(self, adresse):
+        """Suggestions [{"label", "lon", "lat", "score"}] pour une saisie, None si echec."""
+        if not adresse or len(adresse.strip()) < LONGUEUR_MIN_ADRESSE:
+            return None
+        cle = normaliser_adresse(adresse)
+        suggestions = await asyncio.to_thread(self.cache.lire, "adresses", cle)
+        diagnostics.compter("geo.cache.adresses", int(suggestions is not None))  # moyenne = taux de succes
+        if suggestions is not None:
+            return suggestions or None
+        data = await self._get_json(self.url_geocodage, {"q": adresse, "limit": 5}, TIMEOUT_GEOCODAGE)
+        if data is None:
+            return None  # echec reseau : non mis en cache
+        suggestions = []
+        for f in data.get("features") or []:
+            coords = f["geometry"]["coordinates"]  # [lon, lat]
+            suggestions.append({"label": f["properties"].get("label", ""), "lon": coords[0],
+                                "lat": coords[1], "score": f["properties"].get("score", 0)})
+        await asyncio.to_thread(self.cache.ecrire, "adresses", cle, suggestions)
+        return suggestions or None
+
+    async def trajet_async(self, lat1, lon1, lat2, lon2):
+        """Trajet routier le plus court {"distance_km", "duree_min"}, None si echec."""
+        cle = cle_trajet(lat1, lon1, lat2, lon2)
+        trajet = await asyncio.to_thread(self.cache.lire, "trajets", cle)
+        diagnostics.compter("geo.cache.trajets", int(trajet is not None))
+        if trajet is not None:
+            return trajet
+        url = f"{self.url_routage}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}"
+        data = await self._get_json(url, {"overview": "false"}, TIMEOUT_ROUTAGE)
+        if not data or not data.get("routes"):
+            return None
+        route = data["routes"][0]
+        trajet = {"distance_km": round(route["distance"] / 1000, 1), "duree_min": round(route["duration"] / 60, 0)}
+        await asyncio.to_thread(self.cache.ecrire, "trajets", cle, trajet)
+        return trajet
+
+    async def _table_async(self, sources, destinations):
+        """Matrices OSRM sources x destinations (points (lat, lon)) : (distances m, durees s) ou None."""
+        coords = ";".join(f"{lon},{lat}" for lat, lon in sources + destinations)
+        params = {"sources": ";".join(str(i) for i in range(len(sources))),
+                  "destinations": ";".join(str(len(sources) + j) for j in range(len(destinations))),
+                  "annotations": "distance,duration"}
+        data = await self._get_json(f"{self.url_routage}/table/v1/driving/{coords}", params, TIMEOUT_ROUTAGE)
+        if not data or not data.get("distances") or not data.get("durations"):
+            return None
+        return data["distances"], data["durations"]
+
+    async def trajets_async(self, couples):
+        """
+        Trajets de couples de points ((lat, lon), (lat, lon)) : {couple: trajet
+        avec "source"}. Cache SQLite, sinon matrices OSRM par blocs de
+        TAILLE_TABLE (les trajets obtenus sont mis en cache), sinon estimation.
+        Le cache est lu puis ecrit en un seul acces chacun, hors de la boucle.
+        """
+        couples = list(dict.fromkeys(couples))
+        en_cache = await asyncio.to_thread(
+            self.cache.lire_plusieurs, "trajets", [cle_trajet(*d, *a) for d, a in couples])
+        resultats = {}
+        manquants = []
+        for depart, arrivee in couples:
+            trajet = en_cache.get(cle_trajet(*depart, *arrivee))
+            diagnostics.compter("geo.cache.trajets", int(trajet is not None))
+            if trajet is not None:
+                resultats[(depart, arrivee)] = dict(trajet, source="cache")
+            else:
+                manquants.append((depart, arrivee))
+
+        sources = list(dict.fromkeys(d for d, _ in manquants))
+        destinations = list(dict.fromkeys(a for _, a in manquants))
+        blocs = []
+        for i in range(0, len(sources), TAILLE_TABLE):
+            for j in range(0, len(destinations), TAILLE_TABLE):
+                bloc_s = {p: n for n, p in enumerate(sources[i:i + TAILLE_TABLE])}
+                bloc_d = {p: n for n, p in enumerate(destinations[j:j + TAILLE_TABLE])}
+                voulus = [(d, a) for d, a in manquants if d in bloc_s and a in bloc_d]
+                if voulus:
+                    blocs.append((bloc_s, bloc_d, voulus))
+        matrices = await asyncio.gather(*(self._table_async(list(s), list(d)) for s, d, _ in blocs))
+
+        nouveaux = {}
+        for (bloc_s, bloc_d, voulus), matrice in zip(blocs, matrices):
+            for depart, arrivee in voulus:
+                distance = duree = None
+                if matrice is not None:
+                    distance = matrice[0][bloc_s[depart]][bloc_d[arrivee]]
+                    duree = matrice[1][bloc_s[depart]][bloc_d[arrivee]]
+                if distance is None or duree is None:  # routage indisponible ou point non routable
+                    resultats[(depart, arrivee)] = trajet_estime(*depart, *arrivee)
+                    continue
+                trajet = {"distance_km": round(distance / 1000, 1), "duree_min": round(duree / 60, 0)}
+                nouveaux[cle_trajet(*depart, *arrivee)] = trajet
+                resultats[(depart, arrivee)] = dict(trajet, source="osrm")
+        if nouveaux:
+            await asyncio.to_thread(self.cache.ecrire_plusieurs, "trajets", nouveaux)
+        return resultats
+
+    async def _geocoder_debounce(self, cle, adresse):
+        precedente = self._en_attente.get(cle)
+        if precedente is not None:
+            precedente.cancel()
+        tache = asyncio.current_task()
+        self._en_attente[cle] = tache
+        try:
+            await asyncio.sleep(self.delai_debounce)
+            return await self.geocoder_async(adresse)
+        finally:
+            if self._en_attente.get(cle) is tache:
+                del self._en_attente[cle]
+
+    # --- Cote appelant (synchrone) ---
+    def _executer(self, coroutine):
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, self._boucle).result()
+        except CancelledError:
+            return None
+
+    def _en_cache(self, adresse):
+        return not adresse or self.cache.lire("adresses", normaliser_adresse(adresse)) is not None
+
+    @diagnostics.mesure("geo.geocodage")
+    def geocoder(self, adresse, champ=None, session=None):
+        """
+        Geocode une saisie. Avec `champ` (autocompletion), la requete attend
+        `delai_debounce` et est abandonnee (None) si une nouvelle saisie du
+        meme champ de la meme `session` arrive entre-temps ; une saisie deja
+        en cache repond tout de suite.
+        """
+        if champ is None or self._en_cache(adresse):
+            return self._executer(self.geocoder_async(adresse))
+        return self._executer(self._geocoder_debounce((session, champ), adresse))
+
+    @diagnostics.mesure("geo.suggestion")
+    def suggerer(self, adresse, champ, session=None):
+        """
+        Autocompletion sans attente : (suggestions ou None, en_cours). Une
+        saisie en cache repond tout de suite ; sinon la recherche debouncee
+        de (session, champ) est lancee en arriere-plan et en_cours vaut True
+        jusqu'a ce qu'un appel avec la meme saisie trouve son resultat. Une
+        nouvelle saisie remplace la precedente de la meme session seulement.
+        """
+        if not adresse or len(adresse.strip()) < LONGUEUR_MIN_ADRESSE:
+            return None, False
+        if self._en_cache(adresse):
+            return self._executer(self.geocoder_async(adresse)), False
+        cle = (session, champ)
+        recherche = self._recherches.get(cle)
+        if recherche is not None and recherche[0] == adresse and not recherche[1].cancelled():
+            return (recherche[1].result(), False) if recherche[1].done() else (None, True)
+        tache = asyncio.run_coroutine_threadsafe(self._geocoder_debounce(cle, adresse), self._boucle)
+        self._recherches.set(cle, (adresse, tache))
+        return None, True
+
+    @diagnostics.mesure("geo.geocodage_lot")
+    def geocoder_plusieurs(self, adresses):
+        """Geocode des adresses en parallele : {adresse: suggestions ou None}."""
+        adresses = list(dict.fromkeys(adresses))
+
+        async def tout():
+            return await asyncio.gather(*(self.geocoder_async(a) for a in adresses))
+
+        return dict(zip(adresses, self._executer(tout())))
+
+    @diagnostics.mesure("geo.trajet")
+    def trajet(self, lat1, lon1, lat2, lon2):
+        """Trajet entre deux points (cache SQLite, sinon OSRM)."""
+        return self._executer(self.trajet_async(lat1, lon1, lat2, lon2))
+
+    @diagnostics.mesure("geo.distances")
+    def distances(self, paires):
+        """
+        Trajets de couples d'adresses (depart, arrivee), dans l'ordre :
+        {"distance_km", "duree_min", "source" (cache, osrm ou haversine),
+        "erreur"}. Chaque adresse n'est geocodee qu'une fois (premiere
+        suggestion) ; une adresse introuvable est reportee dans "erreur".
+        """
+        paires = [tuple(p) for p in paires]
+
+        async def tout():
+            adresses = list(dict.fromkeys(a for paire in paires for a in paire))
+            suggestions = await asyncio.gather(*(self.geocoder_async(a) for a in adresses))
+            points = {a: (s[0]["lat"], s[0]["lon"]) for a, s in zip(adresses, suggestions) if s}
+            couples = [(points[d], points[a]) for d, a in paires if d in points and a in points]
+            return points, await self.trajets_async(couples)
+
+        points, trajets = self._executer(tout())
+        resultats = []
+        for paire in paires:
+            introuvables = [a for a in paire if a not in points]
+            if introuvables:
+                resultats.append({"distance_km": None, "duree_min": None, "source": "",
+                                  "erreur": f"adresse introuvable : {introuvables[0]!r}"})
+            else:
+                resultats.append(dict(trajets[(points[paire[0]], points[paire[1]])], erreur=""))
+        return resultats
+
+    def fermer(self):
+        """Ferme le client HTTP et arrete la boucle."""
+        if self._client is not None:
+            self._executer(self._client.aclose())
+        self._boucle.call_soon_threadsafe(self._boucle.stop)
+
+
+@lru_cache(maxsize=1)
+def service_geo():
+    """Service partage par toutes les sessions du processus (endpoints de l'environnement)."""
+    return ServiceGeo()
+
+
+def distances_portefeuille(source, service=None):
+    """
+    Distances domicile-mission d'un fichier portefeuille (CSV/XLSX, colonnes
+    adresse_domicile et adresse_mission ; jours optionnel) pour le budget IK :
+    une ligne (COLONNES_DISTANCES) par consultant, km du mois = aller-retour
+    x jours.
+    """
+    from portefeuille import lire_lignes
+
+    service = service or service_geo()
+    lignes = [(numero, ligne) for numero, ligne in lire_lignes(source)]
+    paires = [(str(ligne.get("adresse_domicile") or "").strip(), str(ligne.get("adresse_mission") or "").strip())
+              for _, ligne in lignes]
+    resultats = []
+    for (numero, ligne), paire, trajet in zip(lignes, paires, service.distances(paires)):
+        try:
+            jours = float(str(ligne.get("jours") or 0).replace(",", "."))
+        except ValueError:
+            jours = 0.0
+        aller_retour = None if trajet["distance_km"] is None else round(trajet["distance_km"] * 2, 1)
+        resultats.append(dict(
+            trajet, ligne=numero, nom=str(ligne.get("nom") or ""), adresse_domicile=paire[0],
+            adresse_mission=paire[1], km_aller_retour=aller_retour, jours=jours,
+            km_mois=None if aller_retour is None else round(aller_retour * jours, 1)))
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distances domicile-mission d'un portefeuille (budget IK).")
+    parser.add_argument("entree", help="fichier CSV ou XLSX (colonnes adresse_domicile, adresse_mission, jours)")
+    parser.add_argument("sortie", help="fichier CSV des distances")
+    args = parser.parse_args(argv)
+    resultats = distances_portefeuille(args.entree)
+    with open(args.sortie, "w", encoding="utf-8-sig", newline="") as f:
+        ecrivain = csv.writer(f, delimiter=";")
+        ecrivain.writerow(COLONNES_DISTANCES)
+        for r in resultats:
+            ecrivain.writerow([str(r[c]).replace(".", ",") if isinstance(r[c], float)
+                               else "" if r[c] is None else r[c] for c in COLONNES_DISTANCES])
+    erreurs = sum(bool(r["erreur"]) for r in resultats)
+    print(f"{len(resultats)} trajets, {erreurs} en erreur -> {args.sortie}")
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
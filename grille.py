@@ -0,0 +1,77 @@
+"""
+Grille de sensibilite TJM x jours travailles : net, cout global et taux de
+charges sur une matrice de scenarios, les autres entrees etant fixees.
+
+Les cellules sont calculees par le moteur vectorise (moteur_batch) en un seul
+appel. Chaque ligne (un TJM sur l'axe des jours) est gardee en cache : quand
+la plage de TJM est decalee, seules les nouvelles lignes sont simulees.
+"""
+import numpy as np
+
+from cache import CacheLRU
+from moteur_batch import calculate_salary_batch
+
+CHAMPS_GRILLE = ("net_payable", "cout_global", "taux_charges")
+ARGUMENTS_AXES = ("tjm", "days_worked_month", "nb_journees")
+LIGNES_CACHE_TAILLE = 4096
+NB_JOURS_OUVRES_DEFAUT = 22  # defaut de calculate_salary
+
+_lignes = CacheLRU(taille_max=LIGNES_CACHE_TAILLE)
+
+
+def axe(debut, fin, pas):
+    """Valeurs de debut a fin incluse par pas (arrondies au centime)."""
+    if pas <= 0 or fin < debut:
+        raise ValueError(f"Axe invalide : {debut} -> {fin} par {pas}")
+    return np.round(np.arange(debut, fin + pas / 2, pas), 2)
+
+
+def _cle_ligne(tjm, jours, arguments):
+    return float(tjm), jours, tuple(sorted(arguments.items()))
+
+
+def calculer_grille(tjms, jours, **arguments):
+    """
+    Simule chaque couple (TJM, jours). Les jours fixent le CA
+    (days_worked_month) et, pour leur partie entiere plafonnee a
+    nb_jours_ouvres, le prorata du salaire de base (nb_journees). `arguments` : autres arguments nommes de
+    calculate_salary (scalaires). Retourne {"tjm", "jours", champ: matrice
+    (len(tjms), len(jours)) pour chaque champ de CHAMPS_GRILLE,
+    "lignes_calculees": nombre de lignes simulees (hors cache)}.
+    """
+    imposes = set(arguments) & set(ARGUMENTS_AXES)
+    if imposes:
+        raise ValueError(f"Arguments fixes par les axes de la grille : {sorted(imposes)}")
+    tjms = [float(t) for t in tjms]
+    jours = tuple(float(j) for j in jours)
+    lignes = {t: _lignes.get(_cle_ligne(t, jours, arguments)) for t in tjms}
+    manquants = sorted(t for t, ligne in lignes.items() if ligne is None)
+
+    if manquants:
+        # Moteur en une dimension : la sous-grille est mise a plat
+        tjm_cellules, jours_cellules = (a.ravel() for a in np.meshgrid(manquants, jours, indexing="ij"))
+        # Prorata du salaire de base au plus un mois complet
+        journees = np.minimum(np.floor(jours_cellules), arguments.get("nb_jours_ouvres", NB_JOURS_OUVRES_DEFAUT))
+        res = calculate_salary_batch(tjm_cellules, jours_cellules, **{**arguments, "nb_journees": journees})
+        forme = (len(manquants), len(jours))
+        for i, t in enumerate(manquants):
+            lignes[t] = {champ: res[champ].reshape(forme)[i].copy() for champ in CHAMPS_GRILLE}
+            _lignes.set(_cle_ligne(t, jours, arguments), lignes[t])
+
+    grille = {"tjm": np.array(tjms), "jours": np.array(jours), "lignes_calculees": len(manquants)}
+    for champ in CHAMPS_GRILLE:
+        grille[champ] = np.array([lignes[t][champ] for t in tjms]).reshape(len(tjms), len(jours))
+    return grille
+
+
+def grille_en_table(grille):
+    """Grille a plat : une ligne par couple (tjm, jours), pour affichage ou export."""
+    tjm, jours = np.meshgrid(grille["tjm"], grille["jours"], indexing="ij")
+    table = {"tjm": tjm.ravel(), "jours": jours.ravel()}
+    table.update({champ: grille[champ].ravel() for champ in CHAMPS_GRILLE})
+    return table
+
+
+def stats_lignes():
+    """Compteurs du cache des lignes de grille."""
+    return _lignes.stats()
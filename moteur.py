@@ -0,0 +1,697 @@
+"""
+Moteur de calcul du simulateur de portage salarial 2026.
+
+Module autonome (sans Streamlit ni bibliotheque de rendu) : les parametres
+globaux sont passes explicitement via ParametresCalcul au lieu d'etre lus
+dans st.session_state. Utilisable depuis l'app, les scripts batch et les tests.
+"""
+import inspect
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from typing import Optional
+
+import diagnostics
+from cache import CacheLRU
+from registre_baremes import BASES_COTISATIONS, RegistreBaremes
+
+# --- Baremes (registre versionne, fichiers baremes/*.json) ---
+REGISTRE_BAREMES = RegistreBaremes.charger()
+PERIODE_DEFAUT = "2026-01"  # periode utilisee quand calculate_salary ne recoit pas de periode
+BAREME_2026 = REGISTRE_BAREMES["2026"]
+
+# Alias historiques du bareme 2026 (app, exports)
+BAREME_IK_VOITURE_2026 = BAREME_2026.ik_voiture
+BAREME_IK_MOTO_2026 = BAREME_2026.ik_moto
+IGD_BAREME_2026 = BAREME_2026.igd
+JOURS_OUVRES_2026 = BAREME_2026.jours_ouvres
+MOIS_LABELS = {
+    1: "Janvier", 2: "Février", 3: "Mars", 4: "Avril",
+    5: "Mai", 6: "Juin", 7: "Juillet", 8: "Août",
+    9: "Septembre", 10: "Octobre", 11: "Novembre", 12: "Décembre",
+}
+TR_VALEUR_FACIALE = BAREME_2026.tr_valeur_faciale
+TR_PART_PATRONALE_MAX = BAREME_2026.tr_part_patronale_max
+TELETRAVAIL_TAUX_JOUR = BAREME_2026.teletravail_taux_jour
+TELETRAVAIL_MAX_JOURS = BAREME_2026.teletravail_max_jours
+RGDU_TMIN = BAREME_2026.reduction_generale["tmin"]
+RGDU_TDELTA_FNAL_50 = BAREME_2026.reduction_generale["tdelta_fnal_50"]
+RGDU_TDELTA_FNAL_10 = BAREME_2026.reduction_generale["tdelta_fnal_10"]
+RGDU_EXPOSANT = BAREME_2026.reduction_generale["exposant"]
+RGDU_SEUIL_SMIC = BAREME_2026.reduction_generale["seuil_smic"]
+FNAL_TAUX_SUP_50 = BAREME_2026.fnal_taux_sup_50
+FNAL_TAUX_INF_50 = BAREME_2026.fnal_taux_inf_50
+COTISATIONS_2026 = BAREME_2026.cotisations
+
+COTISATIONS_LABELS = {
+    "maladie": "Maladie",
+    "maladie_compl": "Maladie complementaire",
+    "csa": "Contrib. Solidarite Autonomie",
+    "vieillesse_dep": "Vieillesse deplafonnee",
+    "af": "Allocations Familiales",
+    "af_compl": "Alloc. Familiales compl.",
+    "atmp": "AT/MP",
+    "chomage": "Chomage",
+    "ags": "AGS",
+    "formation": "Formation professionnelle",
+    "taxe_appr": "Taxe d'apprentissage",
+    "taxe_appr_lib": "Taxe appr. (liberatoire)",
+    "dialogue_soc": "Dialogue social",
+    "vieillesse_pl": "Vieillesse plafonnee",
+    "fnal": "FNAL",
+    "retraite_t1": "Retraite AGIRC-ARRCO T1",
+    "ceg_t1": "CEG T1",
+    "cet_t1": "CET T1",
+    "apec_t1": "APEC T1",
+    "prevoyance_deces": "Prevoyance deces cadre",
+    "retraite_t2": "Retraite AGIRC-ARRCO T2",
+    "ceg_t2": "CEG T2",
+    "cet_t2": "CET T2",
+    "apec_t2": "APEC T2",
+    "prevoyance_supp": "Prevoyance supp. cadre T2",
+    "csg_deductible": "CSG deductible",
+    "csg_crds": "CSG/CRDS non deductible",
+}
+
+# --- Parametres globaux de calcul (equivalent des cfg_* de l'app) ---
+@dataclass(frozen=True)
+class ParametresCalcul:
+    """
+    Parametres globaux immuables du moteur (valeurs en % comme dans l'onglet Configuration).
+    Chaque champ correspond a la cle cfg_<champ> de st.session_state.
+    PMSS et SMIC : None = valeur du bareme de la periode simulee.
+    """
+    base_salary: float = 2374.0
+    frais_gestion: float = 5.0
+    taux_prime: float = 5.0
+    taux_reserve: float = 10.0
+    taux_cp: float = 10.0
+    pmss: Optional[float] = None
+    mutuelle_taux: float = 1.5
+    mutuelle_part_pat: float = 50.0
+    smic_mensuel: Optional[float] = None
+    taux_atmp: float = 0.64
+    taux_charges_override: float = 0.0  # 0 = auto-calcul
+
+    @classmethod
+    def depuis_session(cls, session_state):
+        """Construit les parametres a partir des cles cfg_* de la session Streamlit (None conserve)."""
+        valeurs = {f.name: session_state["cfg_" + f.name] for f in fields(cls)}
+        return cls(**{nom: None if v is None else float(v) for nom, v in valeurs.items()})
+
+    def en_session(self):
+        """Retourne les parametres sous forme {cfg_<champ>: valeur}."""
+        return {"cfg_" + f.name: getattr(self, f.name) for f in fields(self)}
+
+
+PARAMETRES_DEFAUT = ParametresCalcul()
+
+
+@lru_cache(maxsize=None)
+def parametres_pour_bareme(bareme):
+    """PARAMETRES_DEFAUT avec le PMSS et le SMIC du bareme."""
+    return parametres_periode(PARAMETRES_DEFAUT, bareme)
+
+
+@lru_cache(maxsize=256)
+def parametres_periode(params, bareme):
+    """
+    Parametres effectifs d'une simulation sur la periode du `bareme` : le PMSS
+    et le SMIC saisis dans `params`, ceux du bareme la ou ils valent None.
+    """
+    if params is None:
+        return parametres_pour_bareme(bareme)
+    changements = {nom: getattr(bareme, nom) for nom in ("pmss", "smic_mensuel") if getattr(params, nom) is None}
+    return replace(params, **changements) if changements else params
+
+
+# --- Fonction RGDU ---
+def coefficient_rgdu(brut_mensuel, smic_mensuel, use_fnal_50=True, bareme=None):
+    """
+    Coefficient de la Reduction Generale Degressive Unique (RGDU) 2026,
+    arrondi a 4 decimales ; 0.0 si le brut n'ouvre pas droit a la reduction.
+    """
+    r = (bareme or BAREME_2026).reduction_generale
+    smic_annuel = smic_mensuel * 12
+    brut_annuel = brut_mensuel * 12
+
+    # Pas de reduction au-dela de 3 SMIC
+    if brut_annuel >= r["seuil_smic"] * smic_annuel:
+        return 0.0
+
+    # Choix du Tdelta selon FNAL
+    tdelta = r["tdelta_fnal_50"] if use_fnal_50 else r["tdelta_fnal_10"]
+
+    # Formule RGDU 2026
+    ratio = (r["seuil_smic"] * smic_annuel / brut_annuel) - 1
+    if ratio <= 0:
+        return 0.0
+
+    base = 0.5 * ratio
+    coefficient = r["tmin"] + (tdelta * (base ** r["exposant"]))
+
+    # Plafonner le coefficient a Tmin + Tdelta
+    coefficient = min(coefficient, r["tmin"] + tdelta)
+
+    # Arrondir a 4 decimales
+    return round(coefficient, 4)
+
+
+def calculer_rgdu(brut_mensuel, smic_mensuel, use_fnal_50=True, bareme=None):
+    """
+    Calcule la Reduction Generale Degressive Unique (RGDU) 2026
+    Retourne le montant de la reduction des charges patronales
+    """
+    coefficient = coefficient_rgdu(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+
+    # Reduction mensuelle
+    return brut_mensuel * coefficient if coefficient else 0.0
+
+
+def coefficient_fillon(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """
+    Coefficient de la reduction generale ex-Fillon (jusqu'en 2025) :
+    T / 0.6 x (1.6 x SMIC annuel / brut annuel - 1), plafonne a T, arrondi a 4 decimales.
+    """
+    r = bareme.reduction_generale
+    smic_annuel = smic_mensuel * 12
+    brut_annuel = brut_mensuel * 12
+    if brut_annuel <= 0 or brut_annuel >= r["seuil_smic"] * smic_annuel:
+        return 0.0
+    t = r["t_fnal_50"] if use_fnal_50 else r["t_fnal_10"]
+    coefficient = t / 0.6 * (r["seuil_smic"] * smic_annuel / brut_annuel - 1)
+    return round(min(coefficient, t), 4)
+
+
+def calculer_reduction_fillon(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Reduction generale (ex-Fillon, jusqu'en 2025) : brut x coefficient_fillon."""
+    coefficient = coefficient_fillon(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return brut_mensuel * coefficient if coefficient else 0.0
+
+
+def coefficient_reduction_generale(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Coefficient de la reduction generale selon la formule du bareme (RGDU 2026 ou ex-Fillon)."""
+    if bareme.reduction_generale["formule"] == "fillon":
+        return coefficient_fillon(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return coefficient_rgdu(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+
+
+@diagnostics.mesure("moteur.rgdu")
+def calculer_reduction_generale(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Reduction generale selon la formule du bareme (RGDU 2026 ou ex-Fillon)."""
+    if bareme.reduction_generale["formule"] == "fillon":
+        return calculer_reduction_fillon(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return calculer_rgdu(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+
+
+# --- Calcul cotisations ligne par ligne ---
+
+
+@lru_cache(maxsize=32)
+def _taux_par_base(bareme, atmp_rate, fnal_rate):
+    """
+    Bareme compile : pour chaque base (ordre de BASES_COTISATIONS), les taux
+    patronaux et salariaux non nuls dans l'ordre du bareme, AT/MP et FNAL
+    substitues. Les lignes a taux nul (montant 0) sont omises.
+    """
+    taux_pat = {base: [] for base in BASES_COTISATIONS}
+    taux_sal = {base: [] for base in BASES_COTISATIONS}
+    for nom, cotis in bareme.cotisations.items():
+        if cotis["base"] not in taux_pat:
+            continue
+        pat = atmp_rate if nom == "atmp" else fnal_rate if nom == "fnal" else cotis["pat"]
+        if pat:
+            taux_pat[cotis["base"]].append(pat)
+        if cotis["sal"]:
+            taux_sal[cotis["base"]].append(cotis["sal"])
+    return tuple((tuple(taux_pat[base]), tuple(taux_sal[base])) for base in BASES_COTISATIONS)
+
+
+def _details_cotisations(bases, atmp_rate, fnal_rate, bareme):
+    """Detail ligne par ligne (affichage) : base, taux et montants de chaque cotisation."""
+    details = []
+    for nom, cotis in bareme.cotisations.items():
+        base = bases.get(cotis["base"])
+        if base is None or (cotis["base"] == "TRANCHE_B" and base == 0):
+            continue  # pas de T2 si brut <= PMSS
+
+        # Appliquer taux AT/MP et FNAL configurables
+        taux_pat = cotis["pat"]
+        taux_sal = cotis["sal"]
+        if nom == "atmp":
+            taux_pat = atmp_rate
+        if nom == "fnal":
+            taux_pat = fnal_rate
+
+        details.append({
+            "nom": nom, "base": round(base, 2),
+            "taux_pat": taux_pat, "montant_pat": round(base * taux_pat, 2),
+            "taux_sal": taux_sal, "montant_sal": round(base * taux_sal, 2)
+        })
+    return details
+
+
+@diagnostics.mesure("moteur.cotisations")
+def calculer_cotisations(brut, pmss, atmp_rate, fnal_rate, prev_pat_contributions, details=False,
+                         bareme=None):
+    """
+    Calcule chaque cotisation individuellement (comme Silae) : chaque ligne est
+    arrondie au centime avant d'etre cumulee, a partir du bareme compile
+    (BAREME_2026 si None). Retourne un dict avec les totaux, et le detail
+    ligne par ligne si details=True (None sinon).
+    """
+    bareme = bareme or BAREME_2026
+    tranche_a = min(brut, pmss)
+    tranche_b = max(0, brut - pmss)
+
+    # Base CSG = 98.25% du brut + contributions pat prevoyance/mutuelle
+    base_csg = brut * 0.9825 + prev_pat_contributions
+
+    total_pat = 0
+    total_sal = 0
+    for base, (taux_pat, taux_sal) in zip((brut, tranche_a, tranche_b, base_csg),
+                                          _taux_par_base(bareme, atmp_rate, fnal_rate)):
+        for taux in taux_pat:
+            total_pat += round(base * taux, 2)
+        for taux in taux_sal:
+            total_sal += round(base * taux, 2)
+
+    if details:
+        bases = dict(zip(BASES_COTISATIONS, (brut, tranche_a, tranche_b, base_csg)))
+        details = _details_cotisations(bases, atmp_rate, fnal_rate, bareme)
+    else:
+        details = None
+
+    return {
+        "details": details,
+        "total_pat": total_pat,
+        "total_sal": total_sal,
+        "tranche_a": tranche_a,
+        "tranche_b": tranche_b,
+        "base_csg": round(base_csg, 2),
+    }
+
+
+# --- Charges sur un brut donne (prevoyance, cotisations, forfait social) ---
+def _charges_sur_brut(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme, details=False):
+    """
+    Cotisations ligne par ligne sur `brut`, avec les contributions patronales
+    prevoyance/mutuelle (base CSG) et le forfait social de 8% sur celles-ci.
+    Retourne (cotisations, prev_pat_total, forfait_social).
+    """
+    tranche_a = min(brut, pmss)
+    tranche_b = max(0, brut - pmss)
+    prev_deces_pat = round(tranche_a * 0.0159, 2)
+    prev_supp_pat = round(tranche_b * 0.0073, 2) if tranche_b > 0 else 0.0
+    prev_pat_total = prev_deces_pat + mutuelle_part_pat + prev_supp_pat
+    cotis = calculer_cotisations(brut, pmss, atmp_rate, fnal_rate, prev_pat_total, details, bareme)
+    forfait_social = round(prev_pat_total * 0.08, 2)
+    return cotis, prev_pat_total, forfait_social
+
+
+# --- Resolution du taux de charges (point fixe) ---
+TAUX_CHARGES_INITIAL = 0.55
+TOLERANCE_TAUX = 0.00001
+MAX_ITERATIONS_POOL = 50
+
+
+@diagnostics.mesure("moteur.convergence")
+def _resoudre_pool(budget, charges_estimees):
+    """
+    Point fixe taux = charges / pool avec pool = budget / (1 + taux), depuis
+    TAUX_CHARGES_INITIAL jusqu'a |delta taux| < TOLERANCE_TAUX : meme
+    trajectoire, donc memes centimes, que le calcul d'origine.
+
+    `charges_estimees(pool)` retourne (charges, calculees) ; calculees est
+    faux quand le brut estime est celui de l'appel precedent et que les
+    cotisations ont ete reprises (segment plat, complement nul : la plupart
+    des iterations longues ne coutent alors que quelques operations).
+    Retourne (taux de charges, nombre d'evaluations des cotisations).
+    """
+    taux_charges = TAUX_CHARGES_INITIAL
+    evaluations = 0
+    for _ in range(MAX_ITERATIONS_POOL):
+        pool = budget / (1 + taux_charges)
+        charges, calculees = charges_estimees(pool)
+        evaluations += calculees
+        tn = charges / pool if pool > 0 else 0
+        converge = abs(tn - taux_charges) < TOLERANCE_TAUX
+        taux_charges = tn
+        if converge:
+            break
+    return taux_charges, evaluations
+
+
+# --- Moteur de Calcul ---
+# "flottant" : montants en float, lignes arrondies par round() ;
+# "centimes" : centimes entiers et arrondis de paie explicites (moteur_centimes.py)
+ARITHMETIQUES = ("flottant", "centimes")
+
+
+@diagnostics.mesure("moteur.simulation")
+def calculate_salary(tjm, days_worked_month, days_worked_week,
+                     ik_amount, igd_amount, other_expenses, use_reserve, use_mutuelle,
+                     nb_titres_restaurant=0, frais_intermediation_pct=0.0,
+                     jours_teletravail=0, effectif_sup_50=False,
+                     frais_partages_pct=0.0, commission_apporteur=0.0,
+                     type_contrat="CDI", provision_cp=False,
+                     nb_journees=0, nb_jours_ouvres=22, params=None, periode=None,
+                     arithmetique="flottant"):
+    """
+    Calcule la simulation complete a partir du TJM (methode Silae).
+    `periode` : periode de paie ("AAAA-MM", date, annee...) qui selectionne le
+    bareme dans REGISTRE_BAREMES (PERIODE_DEFAUT si None).
+    `params` : ParametresCalcul ; si None, PARAMETRES_DEFAUT. Le PMSS et le
+    SMIC sont ceux du bareme de la periode, sauf valeurs modifiees (voir
+    parametres_periode).
+    `arithmetique` : "flottant" ou "centimes" (voir ARITHMETIQUES).
+    """
+    if arithmetique == "centimes":
+        from moteur_centimes import calculate_salary_centimes  # importe moteur : import differe
+
+        return calculate_salary_centimes(
+            tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+            use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+            jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+            type_contrat, provision_cp, nb_journees, nb_jours_ouvres, params, periode)
+    if arithmetique != "flottant":
+        raise ValueError(f"Arithmetique inconnue : {arithmetique!r} (attendue parmi {', '.join(ARITHMETIQUES)})")
+    bareme = REGISTRE_BAREMES.pour_periode(PERIODE_DEFAUT if periode is None else periode)
+    p = parametres_periode(params, bareme)
+
+    cfg_base = p.base_salary
+    rate_gestion = p.frais_gestion / 100.0
+    rate_prime = p.taux_prime / 100.0
+    rate_cp = p.taux_cp / 100.0
+
+    pmss = p.pmss
+    smic = p.smic_mensuel
+    atmp_rate = p.taux_atmp / 100.0
+    fnal_rate = bareme.fnal_taux_sup_50 if effectif_sup_50 else bareme.fnal_taux_inf_50
+
+    # Mutuelle
+    mutuelle_total_cost = 0.0
+    mutuelle_part_pat = 0.0
+    mutuelle_part_sal = 0.0
+    if use_mutuelle:
+        mutuelle_rate = p.mutuelle_taux / 100.0
+        split_pat = p.mutuelle_part_pat / 100.0
+        mutuelle_total_cost = pmss * mutuelle_rate
+        mutuelle_part_pat = round(mutuelle_total_cost * split_pat, 2)
+        mutuelle_part_sal = round(mutuelle_total_cost * (1 - split_pat), 2)
+
+    # Titres Restaurant
+    tr_part_sal = nb_titres_restaurant * bareme.tr_part_patronale_max
+    tr_part_pat = nb_titres_restaurant * bareme.tr_part_patronale_max
+
+    # Forfait teletravail
+    jours_teletravail_effectifs = min(jours_teletravail, bareme.teletravail_max_jours)
+    forfait_teletravail = jours_teletravail_effectifs * bareme.teletravail_taux_jour
+
+    # CA et deductions
+    turnover = tjm * days_worked_month
+    management_fees = turnover * rate_gestion
+    frais_intermediation = turnover * (frais_intermediation_pct / 100.0)
+    frais_partages = turnover * (frais_partages_pct / 100.0)
+
+    # Montant disponible = CA - Gestion - Intermediation - Partages - Commission
+    montant_disponible = turnover - management_fees - frais_intermediation - frais_partages - commission_apporteur
+
+    # Total des frais rembourses
+    total_frais_rembourses = ik_amount + igd_amount + forfait_teletravail + other_expenses
+
+    # Salaire de base proratise selon jours ouvres du mois
+    if nb_journees > 0 and nb_jours_ouvres > 0:
+        base_salary = cfg_base * (nb_journees / nb_jours_ouvres)
+    else:
+        base_salary = cfg_base * (days_worked_week / 5.0)
+    prime_apport = base_salary * rate_prime
+
+    # Reserve financiere (CDI) / Indemnite de precarite (CDD)
+    rate_reserve = p.taux_reserve / 100.0
+    if type_contrat == "CDD":
+        # CDD : Precarite = (Base + Prime + Complement) x 10% — calculee dans la convergence
+        reserve_brute = 0  # sera recalcule dans la convergence
+    else:
+        # CDI : Reserve financiere = Base x 10%
+        reserve_brute = base_salary * rate_reserve
+
+    budget_salaire = montant_disponible - total_frais_rembourses
+    taux_charges_override = p.taux_charges_override / 100.0
+    reserve_reintegree = not use_reserve
+
+    is_cdd = (type_contrat == "CDD")
+
+    # CDD : facteur 1.2705 = 1 + 5% + (1.05×10%) + (1.155×10%)
+    # precarite_fixe = (base + prime) × 10%
+    # cp_fixe = (base + prime + precarite_fixe) × 10%
+    # complement_rem = (pool - base - prime - precarite_fixe - cp_fixe) / 1.2705
+    facteur_cdd = 1 + rate_prime + (1 + rate_prime) * rate_reserve + (1 + rate_prime) * (1 + rate_reserve) * rate_cp
+    preca_fixe = (base_salary + prime_apport) * rate_reserve
+    cp_fixe = (base_salary + prime_apport + preca_fixe) * rate_cp
+    # Cotisations du dernier brut estime : sur le segment plat (complement
+    # nul) le brut ne change pas d'une iteration a l'autre, elles sont reprises
+    derniers = {}
+
+    def _cotisations_estimees(cle, brut):
+        """(calculees, total patronal, forfait social) sur `brut` ; reprises si `brut` n'a pas change pour `cle`."""
+        dernier = derniers.get(cle)
+        if dernier is not None and dernier[0] == brut:
+            return False, dernier[1], dernier[2]
+        c_, _, fs_ = _charges_sur_brut(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme)
+        derniers[cle] = (brut, c_["total_pat"], fs_)
+        return True, c_["total_pat"], fs_
+
+    def _charges_estimees(pool):
+        """
+        Charges patronales estimees (hors RGDU) pour un pool donne, et si les
+        cotisations ont du etre calculees (faux si le brut estime est inchange).
+        """
+        if is_cdd:
+            comp_rem_est = max(0, (pool - base_salary - prime_apport - preca_fixe - cp_fixe) / facteur_cdd)
+            comp_apport_est = comp_rem_est * rate_prime
+            ct_est = comp_rem_est + comp_apport_est
+            res_est = (base_salary + prime_apport + ct_est) * rate_reserve
+        else:
+            # CDI : reserve = base x 10% (fixe)
+            ct_est = max(0, pool - base_salary - prime_apport - reserve_brute)
+            res_est = reserve_brute
+
+        if reserve_reintegree:
+            # ICP = (base + prime + reserve/precarite + complement) x 10%
+            brut_components = base_salary + prime_apport + res_est + ct_est
+            icp_ = brut_components * rate_cp
+            brut_est = brut_components + icp_
+            calculees, cotis_pat, fs_ = _cotisations_estimees("brut", brut_est)
+            cpf_cdd_est = round(brut_est * 0.01, 2) if is_cdd else 0.0
+            return cotis_pat + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est, calculees
+
+        # Reserve/precarite HORS brut : charges marginales
+        brut_components = base_salary + prime_apport + ct_est
+        brut_est = brut_components * (1 + rate_cp)
+        calculees, cotis_pat, fs_ = _cotisations_estimees("brut", brut_est)
+        icp_ = brut_components * rate_cp
+        cpf_cdd_est = round(brut_est * 0.01, 2) if is_cdd else 0.0
+        ch_brut = cotis_pat + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est
+        reserve_brut_cp = res_est * (1 + rate_cp)
+        brut_avec_reserve = brut_est + reserve_brut_cp
+        _, cotis2_pat, fs2 = _cotisations_estimees("brut_avec_reserve", brut_avec_reserve)
+        ch_reserve = (cotis2_pat + fs2) - (cotis_pat + fs_) + res_est * rate_cp + mutuelle_part_pat * (res_est / pool if pool > 0 else 0)
+        return ch_brut + ch_reserve, calculees
+
+    iterations = 0
+    if taux_charges_override > 0:
+        taux_charges = taux_charges_override
+    elif budget_salaire <= 0:
+        taux_charges = 0.0
+    else:
+        taux_charges, iterations = _resoudre_pool(budget_salaire, _charges_estimees)
+        diagnostics.compter("moteur.iterations", iterations)
+
+    # --- Resultats depuis le taux converge ---
+    pool = budget_salaire / (1 + taux_charges)
+
+    if is_cdd:
+        # CDD : facteur cascade 1.2705
+        complement_remuneration = max(0, (pool - base_salary - prime_apport - preca_fixe - cp_fixe) / facteur_cdd)
+        complement_apport_affaires = complement_remuneration * rate_prime
+        complement_total = complement_remuneration + complement_apport_affaires
+        reserve_brute = (base_salary + prime_apport + complement_total) * rate_reserve
+    else:
+        complement_total = max(0, pool - base_salary - prime_apport - reserve_brute)
+        complement_remuneration = complement_total / (1 + rate_prime)
+        complement_apport_affaires = complement_total - complement_remuneration
+
+    if reserve_reintegree:
+        brut_base = base_salary + prime_apport + reserve_brute + complement_total
+        # ICP sur tout (CDI et CDD)
+        indemnite_cp = brut_base * rate_cp
+        gross_salary = brut_base + indemnite_cp
+    else:
+        # Reserve/precarite hors brut (provisionnee)
+        brut_base = base_salary + prime_apport + complement_total
+        indemnite_cp = brut_base * rate_cp
+        gross_salary = brut_base + indemnite_cp
+
+    # Cotisations reelles sur le brut
+    cotis, prev_pat_total, forfait_social = _charges_sur_brut(gross_salary, pmss, atmp_rate, fnal_rate,
+                                                              mutuelle_part_pat, bareme, details=True)
+
+    # Contribution CPF-CDD (1% patronal sur brut, CDD uniquement)
+    cpf_cdd = round(gross_salary * 0.01, 2) if is_cdd else 0.0
+
+    # RGDU (toujours appliquee)
+    reduction_rgdu = calculer_reduction_generale(gross_salary, smic, effectif_sup_50, bareme)
+
+    # Charges patronales totales
+    employer_charges_avant_rgdu = cotis["total_pat"] + mutuelle_part_pat + tr_part_pat + forfait_social + cpf_cdd
+    employer_charges = employer_charges_avant_rgdu - reduction_rgdu
+
+    # Charges salariales totales
+    employee_charges = cotis["total_sal"] + mutuelle_part_sal + tr_part_sal
+
+    # Provision reserve / indemnite precarite
+    if reserve_reintegree:
+        provision_reserve_financiere = 0
+    else:
+        provision_reserve_financiere = max(0, budget_salaire - gross_salary - employer_charges)
+
+    reserve_amount = reserve_brute
+
+    # Cout global = Brut + Charges Pat + Frais
+    cout_global = gross_salary + employer_charges + total_frais_rembourses
+
+    # Net
+    net_before_tax = gross_salary - employee_charges
+    net_payable = net_before_tax + total_frais_rembourses
+
+    # --- Provision Conges Payes ---
+    provision_cp_amount = 0
+    brut_hors_cp = gross_salary
+    employee_charges_hors_cp = employee_charges
+    net_hors_cp = net_before_tax
+
+    if provision_cp and indemnite_cp > 0:
+        brut_hors_cp = gross_salary - indemnite_cp
+        cotis_hcp, _, fs_hcp = _charges_sur_brut(brut_hors_cp, pmss, atmp_rate, fnal_rate,
+                                                 mutuelle_part_pat, bareme)
+        rgdu_hcp = calculer_reduction_generale(brut_hors_cp, smic, effectif_sup_50, bareme)
+        employer_charges_hcp = cotis_hcp["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_hcp - rgdu_hcp
+        employee_charges_hors_cp = cotis_hcp["total_sal"] + mutuelle_part_sal + tr_part_sal
+        cout_global_hcp = brut_hors_cp + employer_charges_hcp + total_frais_rembourses
+        provision_cp_amount = cout_global - cout_global_hcp
+        net_hors_cp = brut_hors_cp - employee_charges_hors_cp
+
+    # Label selon type de contrat
+    label_reserve = "Indemnite de precarite" if type_contrat == "CDD" else "Reserve financiere"
+
+    return {
+        "tjm": tjm,
+        "days_worked_month": days_worked_month,
+        "turnover": turnover,
+        "management_fees": management_fees,
+        "frais_intermediation": frais_intermediation,
+        "frais_partages": frais_partages,
+        "commission_apporteur": commission_apporteur,
+        "montant_disponible": montant_disponible,
+        "ik_amount": ik_amount,
+        "igd_amount": igd_amount,
+        "forfait_teletravail": forfait_teletravail,
+        "jours_teletravail": jours_teletravail_effectifs,
+        "other_expenses": other_expenses,
+        "total_frais_rembourses": total_frais_rembourses,
+        "base_salary": base_salary,
+        "prime_apport": prime_apport,
+        "complement_remuneration": complement_remuneration,
+        "complement_apport_affaires": complement_apport_affaires,
+        "indemnite_cp": indemnite_cp,
+        "gross_salary": gross_salary,
+        "reserve_brute": reserve_brute,
+        "reserve_amount": reserve_amount,
+        "reserve_reintegree": reserve_reintegree,
+        "employer_charges": employer_charges,
+        "employer_charges_avant_rgdu": employer_charges_avant_rgdu,
+        "cotis_total_pat": cotis["total_pat"],
+        "cotis_total_sal": cotis["total_sal"],
+        "cotis_details": cotis["details"],
+        "forfait_social": forfait_social,
+        "cpf_cdd": cpf_cdd,
+        "prev_pat_total": prev_pat_total,
+        "tranche_a": cotis["tranche_a"],
+        "tranche_b": cotis["tranche_b"],
+        "base_csg": cotis["base_csg"],
+        "reduction_rgdu": reduction_rgdu,
+        "employee_charges": employee_charges,
+        "mutuelle_part_pat": mutuelle_part_pat,
+        "mutuelle_part_sal": mutuelle_part_sal,
+        "tr_part_sal": tr_part_sal,
+        "tr_part_pat": tr_part_pat,
+        "nb_titres_restaurant": nb_titres_restaurant,
+        "cout_global": cout_global,
+        "net_before_tax": net_before_tax,
+        "net_payable": net_payable,
+        "effectif_sup_50": effectif_sup_50,
+        "taux_charges": taux_charges,
+        "iterations": iterations,
+        "bareme": bareme.nom,
+        "pool_silae": pool,
+        "provision_reserve_financiere": provision_reserve_financiere,
+        "budget_salaire": budget_salaire,
+        "type_contrat": type_contrat,
+        "label_reserve": label_reserve,
+        "provision_cp": provision_cp,
+        "provision_cp_amount": provision_cp_amount,
+        "brut_hors_cp": brut_hors_cp,
+        "employee_charges_hors_cp": employee_charges_hors_cp,
+        "net_hors_cp": net_hors_cp,
+    }
+
+
+# --- Memoisation des simulations ---
+SIMULATIONS_CACHE_TAILLE = 512
+SIMULATIONS_CACHE_TTL = 3600  # secondes
+
+_simulations = CacheLRU(taille_max=SIMULATIONS_CACHE_TAILLE, ttl=SIMULATIONS_CACHE_TTL)
+_ARGUMENTS = {nom: p.default for nom, p in inspect.signature(calculate_salary).parameters.items()}
+
+
+def _normaliser(valeur):
+    """Nombres en float (500 et 500.0 : meme cle) ; booleens, textes, dates tels quels."""
+    if isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+        return float(valeur)
+    return valeur
+
+
+def cle_simulation(*args, **kwargs):
+    """
+    Cle de memoisation : arguments de calculate_salary normalises (positionnels
+    ou nommes, valeurs par defaut appliquees) + ParametresCalcul, empreinte
+    hashable des cfg_* qui influencent le calcul.
+    """
+    if len(args) > len(_ARGUMENTS) or not kwargs.keys() <= _ARGUMENTS.keys():
+        raise TypeError("arguments invalides pour calculate_salary")
+    valeurs = dict(_ARGUMENTS)
+    valeurs.update(zip(_ARGUMENTS, args))
+    valeurs.update(kwargs)
+    if inspect.Parameter.empty in valeurs.values():
+        raise TypeError("argument obligatoire manquant pour calculate_salary")
+    params = valeurs.pop("params")  # None : parametres du bareme de la periode (voir parametres_periode)
+    return tuple((nom, _normaliser(v)) for nom, v in valeurs.items()), params
+
+
+def calculate_salary_memo(*args, **kwargs):
+    """
+    calculate_salary memoise (LRU + TTL, voir cache.CacheLRU) : memes arguments.
+    Seule la cle est normalisee, le calcul recoit les arguments tels quels.
+    Retourne une copie du dict en cache (detail des cotisations compris),
+    modifiable sans effet sur les appels suivants.
+    """
+    resultat = dict(_simulations.get_ou_calcule(cle_simulation(*args, **kwargs),
+                                                lambda: calculate_salary(*args, **kwargs)))
+    if resultat.get("cotis_details") is not None:
+        resultat["cotis_details"] = [dict(ligne) for ligne in resultat["cotis_details"]]
+    return resultat
+
+
+def stats_simulations():
+    """Compteurs du cache des simulations (hits, misses, evictions, taille)."""
+    return _simulations.stats()
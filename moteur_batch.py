@@ -0,0 +1,433 @@
+"""
+Moteur de calcul vectorise (NumPy) : des milliers de simulations en un appel.
+
+Reprend ligne a ligne la methode de calculate_salary (moteur.py) sur des
+tableaux : toutes les lignes convergent ensemble, chacune s'arretant a la
+meme iteration que le calcul scalaire. Les resultats sont retournes en
+colonnes (dict de tableaux NumPy, memes cles que calculate_salary).
+"""
+import numpy as np
+
+import diagnostics
+from moteur import (
+    ARITHMETIQUES, BAREME_2026, MAX_ITERATIONS_POOL, PERIODE_DEFAUT, REGISTRE_BAREMES,
+    TAUX_CHARGES_INITIAL, TOLERANCE_TAUX, parametres_periode,
+)
+
+
+def _arrondi(x, decimales=2):
+    """
+    np.round aligne sur round() de Python (arrondi exact de la valeur decimale) :
+    les cas a mi-chemin, ou x * 10^n est fausse par l'erreur flottante, sont
+    recalcules avec round().
+    """
+    f = 10.0 ** decimales
+    y = x * f
+    r = np.rint(y) / f
+    ambigu = np.abs(y - np.floor(y) - 0.5) < 1e-6
+    if ambigu.any():
+        r[ambigu] = [round(float(v), decimales) for v in x[ambigu]]
+    return r
+
+
+@diagnostics.mesure("batch.cotisations")
+def calculer_cotisations_batch(brut, pmss, atmp_rate, fnal_rate, prev_pat_contributions, bareme=None):
+    """
+    Version vectorisee de calculer_cotisations (totaux uniquement, sans detail).
+    Les lignes sont cumulees dans l'ordre du bareme, comme le calcul scalaire,
+    pour rester identiques au centime pres.
+    """
+    brut = np.asarray(brut, dtype=float)
+    tranche_a = np.minimum(brut, pmss)
+    tranche_b = np.maximum(0.0, brut - pmss)
+    base_csg = brut * 0.9825 + prev_pat_contributions
+    bases = {"TOTALITE": brut, "TRANCHE_A": tranche_a, "TRANCHE_B": tranche_b, "CSG": base_csg}
+
+    total_pat = np.zeros_like(brut)
+    total_sal = np.zeros_like(brut)
+    for nom, cotis in (bareme or BAREME_2026).cotisations.items():
+        base = bases[cotis["base"]]
+        taux_pat, taux_sal = cotis["pat"], cotis["sal"]
+        if nom == "atmp":
+            taux_pat = atmp_rate
+        if nom == "fnal":
+            taux_pat = fnal_rate
+        if np.any(taux_pat):
+            total_pat += _arrondi(base * taux_pat)
+        if taux_sal:
+            total_sal += _arrondi(base * taux_sal)
+
+    return {
+        "total_pat": total_pat,
+        "total_sal": total_sal,
+        "tranche_a": tranche_a,
+        "tranche_b": tranche_b,
+        "base_csg": _arrondi(base_csg),
+    }
+
+
+def coefficient_rgdu_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme=None):
+    """Version vectorisee de coefficient_rgdu : (lignes eligibles, coefficient arrondi)."""
+    r = (bareme or BAREME_2026).reduction_generale
+    brut_annuel = np.asarray(brut_mensuel, dtype=float) * 12
+    seuil = r["seuil_smic"] * smic_mensuel * 12
+    tdelta = np.where(use_fnal_50, r["tdelta_fnal_50"], r["tdelta_fnal_10"])
+    eligible = brut_annuel < seuil
+    ratio = np.where(eligible, seuil / np.where(eligible, brut_annuel, 1.0) - 1, 0.0)
+    eligible &= ratio > 0
+    coefficient = r["tmin"] + tdelta * (0.5 * np.maximum(ratio, 0.0)) ** r["exposant"]
+    return eligible, _arrondi(np.minimum(coefficient, r["tmin"] + tdelta), 4)
+
+
+def calculer_rgdu_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme=None):
+    """Version vectorisee de calculer_rgdu."""
+    eligible, coefficient = coefficient_rgdu_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return np.where(eligible, brut_mensuel * coefficient, 0.0)
+
+
+def coefficient_fillon_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Version vectorisee de coefficient_fillon : (lignes eligibles, coefficient arrondi)."""
+    r = bareme.reduction_generale
+    brut_annuel = np.asarray(brut_mensuel, dtype=float) * 12
+    seuil = r["seuil_smic"] * smic_mensuel * 12
+    t = np.where(use_fnal_50, r["t_fnal_50"], r["t_fnal_10"])
+    eligible = (brut_annuel > 0) & (brut_annuel < seuil)
+    coefficient = t / 0.6 * (seuil / np.where(eligible, brut_annuel, 1.0) - 1)
+    return eligible, _arrondi(np.minimum(coefficient, t), 4)
+
+
+def calculer_reduction_fillon_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Version vectorisee de calculer_reduction_fillon."""
+    eligible, coefficient = coefficient_fillon_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return np.where(eligible, brut_mensuel * coefficient, 0.0)
+
+
+def coefficient_reduction_generale_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Version vectorisee de coefficient_reduction_generale (0 hors des lignes eligibles)."""
+    if bareme.reduction_generale["formule"] == "fillon":
+        eligible, coefficient = coefficient_fillon_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    else:
+        eligible, coefficient = coefficient_rgdu_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return np.where(eligible, coefficient, 0.0)
+
+
+@diagnostics.mesure("batch.rgdu")
+def calculer_reduction_generale_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme):
+    """Version vectorisee de calculer_reduction_generale."""
+    if bareme.reduction_generale["formule"] == "fillon":
+        return calculer_reduction_fillon_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+    return calculer_rgdu_batch(brut_mensuel, smic_mensuel, use_fnal_50, bareme)
+
+
+def _prevoyance_pat(brut, pmss, mutuelle_part_pat):
+    """Contributions patronales prevoyance + mutuelle (base CSG / forfait social)."""
+    prev_deces = _arrondi(np.minimum(brut, pmss) * 0.0159)
+    prev_supp = _arrondi(np.maximum(0.0, brut - pmss) * 0.0073)
+    return prev_deces + mutuelle_part_pat + prev_supp
+
+
+def _charges_brut(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme):
+    """Cotisations patronales + forfait social sur un brut donne."""
+    pt = _prevoyance_pat(brut, pmss, mutuelle_part_pat)
+    c = calculer_cotisations_batch(brut, pmss, atmp_rate, fnal_rate, pt, bareme)
+    return c, pt, _arrondi(pt * 0.08)
+
+
+def _div(a, b):
+    """a / b, 0 la ou b <= 0 (comme `a / b if b > 0 else 0`)."""
+    return np.where(b > 0, a / np.where(b > 0, b, 1.0), 0.0)
+
+
+def _diffuser(tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+              use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+              jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+              type_contrat, provision_cp, nb_journees, nb_jours_ouvres):
+    """Arguments de calculate_salary_batch diffuses ensemble en tableaux 1-D (TJM et jours en float, options en bool)."""
+    (tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+     use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+     jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+     type_contrat, provision_cp, nb_journees, nb_jours_ouvres) = [
+        np.atleast_1d(a) for a in np.broadcast_arrays(
+            tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+            use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+            jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+            np.asarray(type_contrat), provision_cp, nb_journees, nb_jours_ouvres)]
+    return (tjm.astype(float), days_worked_month.astype(float), days_worked_week, ik_amount, igd_amount,
+            other_expenses, use_reserve.astype(bool), use_mutuelle.astype(bool), nb_titres_restaurant,
+            frais_intermediation_pct, jours_teletravail, effectif_sup_50.astype(bool), frais_partages_pct,
+            commission_apporteur, type_contrat, provision_cp.astype(bool), nb_journees, nb_jours_ouvres)
+
+
+def _resoudre_pools(budget_salaire, charges_estimees, taux_override=0.0):
+    """
+    Point fixe de moteur._resoudre_pool sur chaque ligne : seules les lignes
+    non convergees sont recalculees. `charges_estimees(i, pool)` retourne
+    (charges, calculees) des lignes i. Retourne (taux de charges, nombre
+    d'evaluations des cotisations) par ligne.
+    """
+    n = budget_salaire.size
+    iterations = np.zeros(n, dtype=np.int64)
+    if taux_override > 0:
+        return np.full(n, taux_override), iterations
+    taux_charges = np.zeros(n)
+    actif = np.flatnonzero(budget_salaire > 0)
+    taux_charges[actif] = TAUX_CHARGES_INITIAL
+    for _ in range(MAX_ITERATIONS_POOL):
+        if actif.size == 0:
+            break
+        pool = budget_salaire[actif] / (1 + taux_charges[actif])
+        charges, calculees = charges_estimees(actif, pool)
+        iterations[actif] += calculees
+        tn = _div(charges, pool)
+        converge = np.abs(tn - taux_charges[actif]) < TOLERANCE_TAUX
+        taux_charges[actif] = tn
+        actif = actif[~converge]
+    return taux_charges, iterations
+
+
+@diagnostics.mesure("batch.simulation")
+@np.errstate(all="ignore")  # inf/nan silencieux comme les floats Python du calcul scalaire
+def calculate_salary_batch(tjm, days_worked_month, days_worked_week=5.0,
+                           ik_amount=0.0, igd_amount=0.0, other_expenses=0.0,
+                           use_reserve=True, use_mutuelle=True,
+                           nb_titres_restaurant=0, frais_intermediation_pct=0.0,
+                           jours_teletravail=0, effectif_sup_50=False,
+                           frais_partages_pct=0.0, commission_apporteur=0.0,
+                           type_contrat="CDI", provision_cp=False,
+                           nb_journees=0, nb_jours_ouvres=22, params=None, periode=None,
+                           arithmetique="flottant"):
+    """
+    Equivalent vectorise de calculate_salary.
+    Chaque argument est un scalaire ou un tableau (diffuses ensemble, broadcasting NumPy).
+    Retourne un dict {cle: tableau} (memes cles que calculate_salary, sans cotis_details).
+    `arithmetique` : "flottant" ou "centimes" (moteur_centimes.calculate_salary_batch_centimes).
+    """
+    arguments = _diffuser(tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+                          use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+                          jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+                          type_contrat, provision_cp, nb_journees, nb_jours_ouvres)
+    if arithmetique == "centimes":
+        from moteur_centimes import calculate_salary_batch_centimes  # importe ce module : import differe
+
+        return calculate_salary_batch_centimes(*arguments, params=params, periode=periode)
+    if arithmetique != "flottant":
+        raise ValueError(f"Arithmetique inconnue : {arithmetique!r} (attendue parmi {', '.join(ARITHMETIQUES)})")
+
+    bareme = REGISTRE_BAREMES.pour_periode(PERIODE_DEFAUT if periode is None else periode)
+    p = parametres_periode(params, bareme)
+    (tjm, days_worked_month, days_worked_week, ik_amount, igd_amount, other_expenses,
+     use_reserve, use_mutuelle, nb_titres_restaurant, frais_intermediation_pct,
+     jours_teletravail, effectif_sup_50, frais_partages_pct, commission_apporteur,
+     type_contrat, provision_cp, nb_journees, nb_jours_ouvres) = arguments
+
+    cfg_base = p.base_salary
+    rate_gestion = p.frais_gestion / 100.0
+    rate_prime = p.taux_prime / 100.0
+    rate_cp = p.taux_cp / 100.0
+    rate_reserve = p.taux_reserve / 100.0
+    pmss = p.pmss
+    atmp_rate = p.taux_atmp / 100.0
+    fnal_rate = np.where(effectif_sup_50, bareme.fnal_taux_sup_50, bareme.fnal_taux_inf_50)
+
+    # Mutuelle
+    mutuelle_total_cost = pmss * (p.mutuelle_taux / 100.0)
+    split_pat = p.mutuelle_part_pat / 100.0
+    mutuelle_part_pat = np.where(use_mutuelle, round(mutuelle_total_cost * split_pat, 2), 0.0)
+    mutuelle_part_sal = np.where(use_mutuelle, round(mutuelle_total_cost * (1 - split_pat), 2), 0.0)
+
+    # Titres restaurant, teletravail
+    tr_part_sal = nb_titres_restaurant * bareme.tr_part_patronale_max
+    tr_part_pat = nb_titres_restaurant * bareme.tr_part_patronale_max
+    jours_teletravail_effectifs = np.minimum(jours_teletravail, bareme.teletravail_max_jours)
+    forfait_teletravail = jours_teletravail_effectifs * bareme.teletravail_taux_jour
+
+    # CA et deductions
+    turnover = tjm * days_worked_month
+    management_fees = turnover * rate_gestion
+    frais_intermediation = turnover * (frais_intermediation_pct / 100.0)
+    frais_partages = turnover * (frais_partages_pct / 100.0)
+    montant_disponible = turnover - management_fees - frais_intermediation - frais_partages - commission_apporteur
+    total_frais_rembourses = ik_amount + igd_amount + forfait_teletravail + other_expenses
+
+    prorata = (nb_journees > 0) & (nb_jours_ouvres > 0)
+    base_salary = np.where(prorata, cfg_base * _div(nb_journees, nb_jours_ouvres),
+                           cfg_base * (days_worked_week / 5.0))
+    prime_apport = base_salary * rate_prime
+
+    is_cdd = type_contrat == "CDD"
+    reserve_reintegree = ~use_reserve
+    reserve_brute = np.where(is_cdd, 0.0, base_salary * rate_reserve)
+    budget_salaire = montant_disponible - total_frais_rembourses
+
+    # Cascade CDD (constantes par ligne)
+    facteur_cdd = 1 + rate_prime + (1 + rate_prime) * rate_reserve + (1 + rate_prime) * (1 + rate_reserve) * rate_cp
+    preca_fixe = (base_salary + prime_apport) * rate_reserve
+    cp_fixe = (base_salary + prime_apport + preca_fixe) * rate_cp
+    cpf_taux = np.where(is_cdd, 0.01, 0.0)
+
+    def _complement(pool, i):
+        """Complement total et reserve/precarite des lignes i pour un pool donne."""
+        base, prime, cdd = base_salary[i], prime_apport[i], is_cdd[i]
+        comp_rem = np.maximum(0.0, (pool - base - prime - preca_fixe[i] - cp_fixe[i]) / facteur_cdd)
+        ct_cdd = comp_rem + comp_rem * rate_prime
+        ct_cdi = np.maximum(0.0, pool - base - prime - reserve_brute[i])
+        ct = np.where(cdd, ct_cdd, ct_cdi)
+        res = np.where(cdd, (base + prime + ct_cdd) * rate_reserve, reserve_brute[i])
+        return comp_rem, ct, res
+
+    # Cotisations du dernier brut estime par ligne (voir calculate_salary)
+    derniers = {cle: (np.full(tjm.size, np.nan), np.zeros(tjm.size), np.zeros(tjm.size))
+                for cle in ("brut", "brut_avec_reserve")}
+
+    def _cotisations_estimees(cle, i, brut):
+        """(calculees, total patronal, forfait social) des lignes i ; reprises ou `brut` n'a pas change."""
+        dernier_brut, dernier_pat, dernier_fs = derniers[cle]
+        calculees = dernier_brut[i] != brut
+        j = i[calculees]
+        if j.size:
+            c, _, fs = _charges_brut(brut[calculees], pmss, atmp_rate, fnal_rate[j], mutuelle_part_pat[j], bareme)
+            dernier_brut[j], dernier_pat[j], dernier_fs[j] = brut[calculees], c["total_pat"], fs
+        return calculees, dernier_pat[i], dernier_fs[i]
+
+    def _charges_reintegree(i, pool):
+        """Charges estimees, reserve reintegree dans le brut (lignes i)."""
+        _, ct_est, res_est = _complement(pool, i)
+        bc = base_salary[i] + prime_apport[i] + res_est + ct_est
+        brut = bc + bc * rate_cp
+        calculees, cotis_pat, fs = _cotisations_estimees("brut", i, brut)
+        ch = (cotis_pat + mutuelle_part_pat[i] + tr_part_pat[i] + fs + bc * rate_cp
+              + _arrondi(brut * cpf_taux[i]))
+        return ch, calculees
+
+    def _charges_provisionnee(i, pool):
+        """Charges estimees, reserve hors brut : charges marginales (lignes i)."""
+        _, ct_est, res_est = _complement(pool, i)
+        bc = base_salary[i] + prime_apport[i] + ct_est
+        brut = bc * (1 + rate_cp)
+        calculees, cotis_pat, fs = _cotisations_estimees("brut", i, brut)
+        ch_brut = (cotis_pat + mutuelle_part_pat[i] + tr_part_pat[i] + fs + bc * rate_cp
+                   + _arrondi(brut * cpf_taux[i]))
+        brut_avec_reserve = brut + res_est * (1 + rate_cp)
+        _, cotis2_pat, fs2 = _cotisations_estimees("brut_avec_reserve", i, brut_avec_reserve)
+        ch_reserve = ((cotis2_pat + fs2) - (cotis_pat + fs) + res_est * rate_cp
+                      + mutuelle_part_pat[i] * _div(res_est, pool))
+        return ch_brut + ch_reserve, calculees
+
+    def _charges_estimees(i, pool):
+        """Charges estimees des lignes i, selon le traitement de la reserve."""
+        ch, calculees = np.empty(i.size), np.empty(i.size, dtype=bool)
+        reint = reserve_reintegree[i]
+        for masque, fonction in ((reint, _charges_reintegree), (~reint, _charges_provisionnee)):
+            if masque.any():
+                ch[masque], calculees[masque] = fonction(i[masque], pool[masque])
+        return ch, calculees
+
+    n = tjm.size
+    taux_charges, iterations = _resoudre_pools(budget_salaire, _charges_estimees, p.taux_charges_override / 100.0)
+
+    diagnostics.compter("batch.lignes", n)
+    diagnostics.compter("batch.iterations", int(iterations.max()) if n else 0)
+
+    # --- Resultats depuis le taux converge ---
+    pool = budget_salaire / (1 + taux_charges)
+    comp_rem_cdd, complement_total, reserve_brute = _complement(pool, slice(None))
+    complement_remuneration = np.where(is_cdd, comp_rem_cdd, complement_total / (1 + rate_prime))
+    complement_apport_affaires = np.where(is_cdd, comp_rem_cdd * rate_prime,
+                                          complement_total - complement_total / (1 + rate_prime))
+
+    brut_base = np.where(reserve_reintegree,
+                         base_salary + prime_apport + reserve_brute + complement_total,
+                         base_salary + prime_apport + complement_total)
+    indemnite_cp = brut_base * rate_cp
+    gross_salary = brut_base + indemnite_cp
+
+    # Cotisations reelles sur le brut
+    cotis, prev_pat_total, forfait_social = _charges_brut(gross_salary, pmss, atmp_rate, fnal_rate,
+                                                          mutuelle_part_pat, bareme)
+    cpf_cdd = _arrondi(gross_salary * cpf_taux)
+    reduction_rgdu = calculer_reduction_generale_batch(gross_salary, p.smic_mensuel, effectif_sup_50, bareme)
+
+    employer_charges_avant_rgdu = cotis["total_pat"] + mutuelle_part_pat + tr_part_pat + forfait_social + cpf_cdd
+    employer_charges = employer_charges_avant_rgdu - reduction_rgdu
+    employee_charges = cotis["total_sal"] + mutuelle_part_sal + tr_part_sal
+
+    provision_reserve_financiere = np.where(
+        reserve_reintegree, 0.0, np.maximum(0.0, budget_salaire - gross_salary - employer_charges))
+    cout_global = gross_salary + employer_charges + total_frais_rembourses
+    net_before_tax = gross_salary - employee_charges
+    net_payable = net_before_tax + total_frais_rembourses
+
+    # --- Provision Conges Payes ---
+    avec_provision_cp = provision_cp & (indemnite_cp > 0)
+    brut_hcp = gross_salary - indemnite_cp
+    cotis_hcp, _, fs_hcp = _charges_brut(brut_hcp, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme)
+    rgdu_hcp = calculer_reduction_generale_batch(brut_hcp, p.smic_mensuel, effectif_sup_50, bareme)
+    employer_charges_hcp = cotis_hcp["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_hcp - rgdu_hcp
+    cout_global_hcp = brut_hcp + employer_charges_hcp + total_frais_rembourses
+    brut_hors_cp = np.where(avec_provision_cp, brut_hcp, gross_salary)
+    employee_charges_hors_cp = np.where(
+        avec_provision_cp, cotis_hcp["total_sal"] + mutuelle_part_sal + tr_part_sal, employee_charges)
+    provision_cp_amount = np.where(avec_provision_cp, cout_global - cout_global_hcp, 0.0)
+    net_hors_cp = brut_hors_cp - employee_charges_hors_cp
+
+    label_reserve = np.where(is_cdd, "Indemnite de precarite", "Reserve financiere")
+
+    return {
+        "tjm": tjm,
+        "days_worked_month": days_worked_month,
+        "turnover": turnover,
+        "management_fees": management_fees,
+        "frais_intermediation": frais_intermediation,
+        "frais_partages": frais_partages,
+        "commission_apporteur": commission_apporteur,
+        "montant_disponible": montant_disponible,
+        "ik_amount": ik_amount,
+        "igd_amount": igd_amount,
+        "forfait_teletravail": forfait_teletravail,
+        "jours_teletravail": jours_teletravail_effectifs,
+        "other_expenses": other_expenses,
+        "total_frais_rembourses": total_frais_rembourses,
+        "base_salary": base_salary,
+        "prime_apport": prime_apport,
+        "complement_remuneration": complement_remuneration,
+        "complement_apport_affaires": complement_apport_affaires,
+        "indemnite_cp": indemnite_cp,
+        "gross_salary": gross_salary,
+        "reserve_brute": reserve_brute,
+        "reserve_amount": reserve_brute,
+        "reserve_reintegree": reserve_reintegree,
+        "employer_charges": employer_charges,
+        "employer_charges_avant_rgdu": employer_charges_avant_rgdu,
+        "cotis_total_pat": cotis["total_pat"],
+        "cotis_total_sal": cotis["total_sal"],
+        "forfait_social": forfait_social,
+        "cpf_cdd": cpf_cdd,
+        "prev_pat_total": prev_pat_total,
+        "tranche_a": cotis["tranche_a"],
+        "tranche_b": cotis["tranche_b"],
+        "base_csg": cotis["base_csg"],
+        "reduction_rgdu": reduction_rgdu,
+        "employee_charges": employee_charges,
+        "mutuelle_part_pat": mutuelle_part_pat,
+        "mutuelle_part_sal": mutuelle_part_sal,
+        "tr_part_sal": tr_part_sal,
+        "tr_part_pat": tr_part_pat,
+        "nb_titres_restaurant": nb_titres_restaurant,
+        "cout_global": cout_global,
+        "net_before_tax": net_before_tax,
+        "net_payable": net_payable,
+        "effectif_sup_50": effectif_sup_50,
+        "taux_charges": taux_charges,
+        "iterations": iterations,
+        "bareme": np.full(n, bareme.nom),
+        "pool_silae": pool,
+        "provision_reserve_financiere": provision_reserve_financiere,
+        "budget_salaire": budget_salaire,
+        "type_contrat": type_contrat,
+        "label_reserve": label_reserve,
+        "provision_cp": provision_cp,
+        "provision_cp_amount": provision_cp_amount,
+        "brut_hors_cp": brut_hors_cp,
+        "employee_charges_hors_cp": employee_charges_hors_cp,
+        "net_hors_cp": net_hors_cp,
+    }
@@ -0,0 +1,783 @@
+"""
+Mode de calcul exact en centimes entiers (calculate_salary(..., arithmetique="centimes")).
+
+Reprend la methode de calculate_salary (moteur.py) avec tous les montants en
+centimes entiers (int) et des points d'arrondi explicites, comme un bulletin
+de paie : chaque element de salaire (base, prime, complement, reserve,
+ICP), le brut, chaque ligne de cotisation, la base CSG, la prevoyance, le
+forfait social, la contribution CPF-CDD et la reduction generale sont
+arrondis au centime ; les totaux sont des sommes exactes de ces lignes.
+
+Les saisies et les taux sont lus comme les decimaux ecrits (0.0159 est
+exactement 159 / 10000, pas le flottant le plus proche) et les arrondis se
+font au centime le plus proche, demi-centime au-dessus (en valeur absolue) :
+plus d'ecart d'un centime du a la representation binaire des flottants.
+Seul le coefficient de reduction generale (puissance) reste calcule en
+flottant avant son arrondi legal a 4 decimales.
+
+La resolution du pool reutilise le solveur du mode flottant (le pool est
+l'inconnue, arrondie au centime a chaque evaluation). Les resultats sont
+retournes en euros (centimes / 100, memes cles que calculate_salary).
+"""
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+import diagnostics
+from moteur import (
+    BAREME_2026, PERIODE_DEFAUT, REGISTRE_BAREMES, _resoudre_pool, coefficient_reduction_generale,
+    parametres_periode,
+)
+from moteur_batch import _resoudre_pools, coefficient_reduction_generale_batch
+from registre_baremes import BASES_COTISATIONS
+
+# Taux exacts (numerateur, denominateur) ; memes valeurs que moteur._charges_sur_brut et calculate_salary
+TAUX_BASE_CSG = (9825, 10000)
+TAUX_PREVOYANCE_DECES = (159, 10000)
+TAUX_PREVOYANCE_SUPP = (73, 10000)
+TAUX_FORFAIT_SOCIAL = (8, 100)
+TAUX_CPF_CDD = (1, 100)
+DECIMALES_COEFFICIENT = 10000  # coefficient de reduction generale arrondi a 4 decimales
+
+
+@lru_cache(maxsize=4096)
+def taux_exact(valeur, echelle=1):
+    """
+    Valeur decimale exacte d'un nombre saisi, divisee par `echelle`, en
+    (numerateur, denominateur) irreductible : 0.0159 -> (159, 10000) et non
+    le flottant binaire le plus proche.
+    """
+    exact = Fraction(valeur) if isinstance(valeur, int) else Fraction(repr(float(valeur)))
+    exact /= echelle
+    return exact.numerator, exact.denominator
+
+
+def pourcentage(valeur):
+    """Taux exact d'un pourcentage saisi : 5.0 -> (1, 20)."""
+    return taux_exact(valeur, 100)
+
+
+def diviser(numerateur, denominateur):
+    """numerateur / denominateur (> 0) arrondi a l'entier le plus proche, demi au-dessus en valeur absolue."""
+    if numerateur >= 0:
+        return (2 * numerateur + denominateur) // (2 * denominateur)
+    return -((denominateur - 2 * numerateur) // (2 * denominateur))
+
+
+def produit(montant, taux):
+    """Montant (centimes) x taux (numerateur, denominateur), arrondi au centime."""
+    return diviser(montant * taux[0], taux[1])
+
+
+def centimes(montant):
+    """Montant saisi en euros -> centimes entiers (valeur decimale exacte, arrondie au centime)."""
+    numerateur, denominateur = taux_exact(montant)
+    return diviser(numerateur * 100, denominateur)
+
+
+def euros(montant):
+    """Centimes -> euros (flottant le plus proche du decimal, ex. 12345 -> 123.45)."""
+    return montant / 100
+
+
+# --- Cotisations ligne par ligne en centimes ---
+@lru_cache(maxsize=32)
+def _lignes_cotisations(bareme, atmp_rate, fnal_rate):
+    """
+    Lignes du bareme : (nom, base, taux patronal, taux salarial) exacts, AT/MP
+    et FNAL substitues.
+    """
+    lignes = []
+    for nom, cotis in bareme.cotisations.items():
+        pat = atmp_rate if nom == "atmp" else fnal_rate if nom == "fnal" else taux_exact(cotis["pat"])
+        lignes.append((nom, cotis["base"], pat, taux_exact(cotis["sal"])))
+    return tuple(lignes)
+
+
+@lru_cache(maxsize=32)
+def _taux_entiers(bareme, atmp_rate, fnal_rate):
+    """
+    Bareme compile pour le calcul entier : pour chaque base (ordre de
+    BASES_COTISATIONS), les taux patronaux et salariaux non nuls sous la forme
+    (2 x numerateur, denominateur, 2 x denominateur). Une ligne vaut alors
+    (base x 2n + d) // 2d : arrondi demi au-dessus pour une base >= 0.
+    """
+    taux_pat = {base: [] for base in BASES_COTISATIONS}
+    taux_sal = {base: [] for base in BASES_COTISATIONS}
+    for _, base, pat, sal in _lignes_cotisations(bareme, atmp_rate, fnal_rate):
+        if base not in taux_pat:
+            continue
+        for taux, liste in ((pat, taux_pat[base]), (sal, taux_sal[base])):
+            if taux[0]:
+                liste.append((2 * taux[0], taux[1], 2 * taux[1]))
+    return tuple((tuple(taux_pat[base]), tuple(taux_sal[base])) for base in BASES_COTISATIONS)
+
+
+def _details_cotisations(bases, atmp_rate, fnal_rate, bareme):
+    """Detail ligne par ligne (affichage, en euros) : base, taux et montants de chaque cotisation."""
+    details = []
+    for nom, nom_base, taux_pat, taux_sal in _lignes_cotisations(bareme, atmp_rate, fnal_rate):
+        base = bases.get(nom_base)
+        if base is None or (nom_base == "TRANCHE_B" and base == 0):
+            continue  # pas de T2 si brut <= PMSS
+        details.append({
+            "nom": nom, "base": euros(base),
+            "taux_pat": taux_pat[0] / taux_pat[1], "montant_pat": euros(produit(base, taux_pat)),
+            "taux_sal": taux_sal[0] / taux_sal[1], "montant_sal": euros(produit(base, taux_sal)),
+        })
+    return details
+
+
+def calculer_cotisations_centimes(brut, pmss, atmp_rate, fnal_rate, prev_pat_contributions, details=False,
+                                  bareme=None):
+    """
+    calculer_cotisations en centimes : `brut`, `pmss` et les contributions
+    prevoyance/mutuelle en centimes entiers, taux AT/MP et FNAL exacts
+    (numerateur, denominateur). La base CSG est arrondie au centime, puis
+    chaque ligne ; totaux en centimes.
+    """
+    bareme = bareme or BAREME_2026
+    tranche_a = min(brut, pmss)
+    tranche_b = max(0, brut - pmss)
+    base_csg = produit(brut, TAUX_BASE_CSG) + prev_pat_contributions
+
+    total_pat = 0
+    total_sal = 0
+    for base, (taux_pat, taux_sal) in zip((brut, tranche_a, tranche_b, base_csg),
+                                          _taux_entiers(bareme, atmp_rate, fnal_rate)):
+        for numerateur, denominateur, double in taux_pat:
+            total_pat += (base * numerateur + denominateur) // double
+        for numerateur, denominateur, double in taux_sal:
+            total_sal += (base * numerateur + denominateur) // double
+
+    if details:
+        bases = dict(zip(BASES_COTISATIONS, (brut, tranche_a, tranche_b, base_csg)))
+        details = _details_cotisations(bases, atmp_rate, fnal_rate, bareme)
+    else:
+        details = None
+
+    return {
+        "details": details,
+        "total_pat": total_pat,
+        "total_sal": total_sal,
+        "tranche_a": tranche_a,
+        "tranche_b": tranche_b,
+        "base_csg": base_csg,
+    }
+
+
+def _charges_sur_brut(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme, details=False):
+    """moteur._charges_sur_brut en centimes : (cotisations, prev_pat_total, forfait_social)."""
+    prev_pat_total = (produit(min(brut, pmss), TAUX_PREVOYANCE_DECES) + mutuelle_part_pat
+                      + produit(max(0, brut - pmss), TAUX_PREVOYANCE_SUPP))
+    cotis = calculer_cotisations_centimes(brut, pmss, atmp_rate, fnal_rate, prev_pat_total, details, bareme)
+    return cotis, prev_pat_total, produit(prev_pat_total, TAUX_FORFAIT_SOCIAL)
+
+
+def calculer_reduction_generale_centimes(brut, smic_mensuel, use_fnal_50, bareme):
+    """Reduction generale (centimes) : brut en centimes x coefficient du bareme (4 decimales), arrondi."""
+    coefficient = coefficient_reduction_generale(euros(brut), smic_mensuel, use_fnal_50, bareme)
+    return diviser(brut * round(coefficient * DECIMALES_COEFFICIENT), DECIMALES_COEFFICIENT)
+
+
+@lru_cache(maxsize=32)
+def _facteur_cdd(rate_prime, rate_reserve, rate_cp):
+    """Facteur de la cascade CDD 1 + p + (1 + p) r + (1 + p)(1 + r) cp, exact (numerateur, denominateur)."""
+    p, r, cp = Fraction(*rate_prime), Fraction(*rate_reserve), Fraction(*rate_cp)
+    facteur = 1 + p + (1 + p) * r + (1 + p) * (1 + r) * cp
+    return facteur.numerator, facteur.denominator
+
+
+# --- Moteur de calcul en centimes ---
+def calculate_salary_centimes(tjm, days_worked_month, days_worked_week,
+                              ik_amount, igd_amount, other_expenses, use_reserve, use_mutuelle,
+                              nb_titres_restaurant=0, frais_intermediation_pct=0.0,
+                              jours_teletravail=0, effectif_sup_50=False,
+                              frais_partages_pct=0.0, commission_apporteur=0.0,
+                              type_contrat="CDI", provision_cp=False,
+                              nb_journees=0, nb_jours_ouvres=22, params=None, periode=None):
+    """
+    calculate_salary en centimes entiers (memes arguments, memes cles de
+    resultat, montants en euros). Voir le docstring du module pour les points
+    d'arrondi.
+    """
+    bareme = REGISTRE_BAREMES.pour_periode(PERIODE_DEFAUT if periode is None else periode)
+    p = parametres_periode(params, bareme)
+
+    rate_gestion = pourcentage(p.frais_gestion)
+    rate_prime = pourcentage(p.taux_prime)
+    rate_cp = pourcentage(p.taux_cp)
+    rate_reserve = pourcentage(p.taux_reserve)
+
+    pmss = centimes(p.pmss)
+    atmp_rate = pourcentage(p.taux_atmp)
+    fnal_rate = taux_exact(bareme.fnal_taux_sup_50 if effectif_sup_50 else bareme.fnal_taux_inf_50)
+
+    # Mutuelle : cout total non arrondi, parts arrondies
+    mutuelle_part_pat = 0
+    mutuelle_part_sal = 0
+    if use_mutuelle:
+        (n_taux, d_taux), (n_pat, d_pat) = pourcentage(p.mutuelle_taux), pourcentage(p.mutuelle_part_pat)
+        mutuelle_part_pat = diviser(pmss * n_taux * n_pat, d_taux * d_pat)
+        mutuelle_part_sal = diviser(pmss * n_taux * (d_pat - n_pat), d_taux * d_pat)
+
+    # Titres Restaurant
+    tr_part_sal = produit(centimes(bareme.tr_part_patronale_max), taux_exact(nb_titres_restaurant))
+    tr_part_pat = tr_part_sal
+
+    # Forfait teletravail
+    jours_teletravail_effectifs = min(jours_teletravail, bareme.teletravail_max_jours)
+    forfait_teletravail = produit(centimes(bareme.teletravail_taux_jour), taux_exact(jours_teletravail_effectifs))
+
+    # CA et deductions
+    turnover = produit(centimes(tjm), taux_exact(days_worked_month))
+    management_fees = produit(turnover, rate_gestion)
+    frais_intermediation = produit(turnover, pourcentage(frais_intermediation_pct))
+    frais_partages = produit(turnover, pourcentage(frais_partages_pct))
+    commission = centimes(commission_apporteur)
+    montant_disponible = turnover - management_fees - frais_intermediation - frais_partages - commission
+
+    ik, igd, autres = centimes(ik_amount), centimes(igd_amount), centimes(other_expenses)
+    total_frais_rembourses = ik + igd + forfait_teletravail + autres
+
+    # Salaire de base proratise selon jours ouvres du mois
+    if nb_journees > 0 and nb_jours_ouvres > 0:
+        (n_jours, d_jours), (n_ouvres, d_ouvres) = taux_exact(nb_journees), taux_exact(nb_jours_ouvres)
+        prorata = (n_jours * d_ouvres, d_jours * n_ouvres)
+    else:
+        prorata = taux_exact(days_worked_week, 5)
+    base_salary = produit(centimes(p.base_salary), prorata)
+    prime_apport = produit(base_salary, rate_prime)
+
+    is_cdd = (type_contrat == "CDD")
+    reserve_brute = 0 if is_cdd else produit(base_salary, rate_reserve)
+    budget_salaire = montant_disponible - total_frais_rembourses
+    taux_charges_override = p.taux_charges_override / 100.0
+    reserve_reintegree = not use_reserve
+
+    # CDD : complement = (pool - base - prime - precarite fixe - CP fixe) / facteur (exact)
+    facteur_cdd = _facteur_cdd(rate_prime, rate_reserve, rate_cp)
+    preca_fixe = produit(base_salary + prime_apport, rate_reserve)
+    cp_fixe = produit(base_salary + prime_apport + preca_fixe, rate_cp)
+
+    def _complement(pool):
+        """(complement de remuneration, complement d'apport d'affaires, reserve/precarite) pour un pool."""
+        if is_cdd:
+            reste = pool - base_salary - prime_apport - preca_fixe - cp_fixe
+            comp_rem = max(0, diviser(reste * facteur_cdd[1], facteur_cdd[0]))
+            comp_apport = produit(comp_rem, rate_prime)
+            reserve = produit(base_salary + prime_apport + comp_rem + comp_apport, rate_reserve)
+            return comp_rem, comp_apport, reserve
+        complement_total = max(0, pool - base_salary - prime_apport - reserve_brute)
+        comp_rem = diviser(complement_total * rate_prime[1], rate_prime[0] + rate_prime[1])
+        return comp_rem, complement_total - comp_rem, reserve_brute
+
+    # Cotisations du dernier brut estime (voir moteur.calculate_salary)
+    derniers = {}
+
+    def _cotisations_estimees(cle, brut):
+        """(calculees, total patronal, forfait social) sur `brut` ; reprises si `brut` n'a pas change pour `cle`."""
+        dernier = derniers.get(cle)
+        if dernier is not None and dernier[0] == brut:
+            return False, dernier[1], dernier[2]
+        c_, _, fs_ = _charges_sur_brut(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme)
+        derniers[cle] = (brut, c_["total_pat"], fs_)
+        return True, c_["total_pat"], fs_
+
+    def _charges_estimees(pool_euros):
+        """
+        Charges patronales estimees (euros, hors RGDU) pour un pool arrondi au
+        centime, et si les cotisations ont du etre calculees.
+        """
+        pool = round(pool_euros * 100)
+        comp_rem, comp_apport, res_est = _complement(pool)
+        ct_est = comp_rem + comp_apport
+
+        if reserve_reintegree:
+            brut_components = base_salary + prime_apport + res_est + ct_est
+            icp_ = produit(brut_components, rate_cp)
+            brut_est = brut_components + icp_
+            calculees, cotis_pat, fs_ = _cotisations_estimees("brut", brut_est)
+            cpf_cdd_est = produit(brut_est, TAUX_CPF_CDD) if is_cdd else 0
+            return euros(cotis_pat + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est), calculees
+
+        # Reserve/precarite HORS brut : charges marginales
+        brut_components = base_salary + prime_apport + ct_est
+        icp_ = produit(brut_components, rate_cp)
+        brut_est = brut_components + icp_
+        calculees, cotis_pat, fs_ = _cotisations_estimees("brut", brut_est)
+        cpf_cdd_est = produit(brut_est, TAUX_CPF_CDD) if is_cdd else 0
+        ch_brut = cotis_pat + mutuelle_part_pat + tr_part_pat + fs_ + icp_ + cpf_cdd_est
+        reserve_cp = produit(res_est, rate_cp)
+        brut_avec_reserve = brut_est + res_est + reserve_cp
+        _, cotis2_pat, fs2 = _cotisations_estimees("brut_avec_reserve", brut_avec_reserve)
+        ch_reserve = ((cotis2_pat + fs2) - (cotis_pat + fs_) + reserve_cp
+                      + (diviser(mutuelle_part_pat * res_est, pool) if pool > 0 else 0))
+        return euros(ch_brut + ch_reserve), calculees
+
+    iterations = 0
+    if taux_charges_override > 0:
+        taux_charges = taux_charges_override
+    elif budget_salaire <= 0:
+        taux_charges = 0.0
+    else:
+        taux_charges, iterations = _resoudre_pool(euros(budget_salaire), _charges_estimees)
+        diagnostics.compter("moteur.iterations", iterations)
+
+    # --- Resultats depuis le taux converge (pool arrondi au centime) ---
+    pool = round(budget_salaire / (1 + taux_charges))
+    complement_remuneration, complement_apport_affaires, reserve_brute = _complement(pool)
+    complement_total = complement_remuneration + complement_apport_affaires
+
+    brut_base = base_salary + prime_apport + complement_total
+    if reserve_reintegree:
+        brut_base += reserve_brute
+    indemnite_cp = produit(brut_base, rate_cp)
+    gross_salary = brut_base + indemnite_cp
+
+    # Cotisations reelles sur le brut
+    cotis, prev_pat_total, forfait_social = _charges_sur_brut(gross_salary, pmss, atmp_rate, fnal_rate,
+                                                              mutuelle_part_pat, bareme, details=True)
+    cpf_cdd = produit(gross_salary, TAUX_CPF_CDD) if is_cdd else 0
+    reduction_rgdu = calculer_reduction_generale_centimes(gross_salary, p.smic_mensuel, effectif_sup_50, bareme)
+
+    employer_charges_avant_rgdu = cotis["total_pat"] + mutuelle_part_pat + tr_part_pat + forfait_social + cpf_cdd
+    employer_charges = employer_charges_avant_rgdu - reduction_rgdu
+    employee_charges = cotis["total_sal"] + mutuelle_part_sal + tr_part_sal
+
+    if reserve_reintegree:
+        provision_reserve_financiere = 0
+    else:
+        provision_reserve_financiere = max(0, budget_salaire - gross_salary - employer_charges)
+
+    cout_global = gross_salary + employer_charges + total_frais_rembourses
+    net_before_tax = gross_salary - employee_charges
+    net_payable = net_before_tax + total_frais_rembourses
+
+    # --- Provision Conges Payes ---
+    provision_cp_amount = 0
+    brut_hors_cp = gross_salary
+    employee_charges_hors_cp = employee_charges
+    net_hors_cp = net_before_tax
+
+    if provision_cp and indemnite_cp > 0:
+        brut_hors_cp = gross_salary - indemnite_cp
+        cotis_hcp, _, fs_hcp = _charges_sur_brut(brut_hors_cp, pmss, atmp_rate, fnal_rate,
+                                                 mutuelle_part_pat, bareme)
+        rgdu_hcp = calculer_reduction_generale_centimes(brut_hors_cp, p.smic_mensuel, effectif_sup_50, bareme)
+        employer_charges_hcp = cotis_hcp["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_hcp - rgdu_hcp
+        employee_charges_hors_cp = cotis_hcp["total_sal"] + mutuelle_part_sal + tr_part_sal
+        cout_global_hcp = brut_hors_cp + employer_charges_hcp + total_frais_rembourses
+        provision_cp_amount = cout_global - cout_global_hcp
+        net_hors_cp = brut_hors_cp - employee_charges_hors_cp
+
+    return {
+        "tjm": tjm,
+        "days_worked_month": days_worked_month,
+        "turnover": euros(turnover),
+        "management_fees": euros(management_fees),
+        "frais_intermediation": euros(frais_intermediation),
+        "frais_partages": euros(frais_partages),
+        "commission_apporteur": euros(commission),
+        "montant_disponible": euros(montant_disponible),
+        "ik_amount": euros(ik),
+        "igd_amount": euros(igd),
+        "forfait_teletravail": euros(forfait_teletravail),
+        "jours_teletravail": jours_teletravail_effectifs,
+        "other_expenses": euros(autres),
+        "total_frais_rembourses": euros(total_frais_rembourses),
+        "base_salary": euros(base_salary),
+        "prime_apport": euros(prime_apport),
+        "complement_remuneration": euros(complement_remuneration),
+        "complement_apport_affaires": euros(complement_apport_affaires),
+        "indemnite_cp": euros(indemnite_cp),
+        "gross_salary": euros(gross_salary),
+        "reserve_brute": euros(reserve_brute),
+        "reserve_amount": euros(reserve_brute),
+        "reserve_reintegree": reserve_reintegree,
+        "employer_charges": euros(employer_charges),
+        "employer_charges_avant_rgdu": euros(employer_charges_avant_rgdu),
+        "cotis_total_pat": euros(cotis["total_pat"]),
+        "cotis_total_sal": euros(cotis["total_sal"]),
+        "cotis_details": cotis["details"],
+        "forfait_social": euros(forfait_social),
+        "cpf_cdd": euros(cpf_cdd),
+        "prev_pat_total": euros(prev_pat_total),
+        "tranche_a": euros(cotis["tranche_a"]),
+        "tranche_b": euros(cotis["tranche_b"]),
+        "base_csg": euros(cotis["base_csg"]),
+        "reduction_rgdu": euros(reduction_rgdu),
+        "employee_charges": euros(employee_charges),
+        "mutuelle_part_pat": euros(mutuelle_part_pat),
+        "mutuelle_part_sal": euros(mutuelle_part_sal),
+        "tr_part_sal": euros(tr_part_sal),
+        "tr_part_pat": euros(tr_part_pat),
+        "nb_titres_restaurant": nb_titres_restaurant,
+        "cout_global": euros(cout_global),
+        "net_before_tax": euros(net_before_tax),
+        "net_payable": euros(net_payable),
+        "effectif_sup_50": effectif_sup_50,
+        "taux_charges": taux_charges,
+        "iterations": iterations,
+        "bareme": bareme.nom,
+        "pool_silae": euros(pool),
+        "provision_reserve_financiere": euros(provision_reserve_financiere),
+        "budget_salaire": euros(budget_salaire),
+        "type_contrat": type_contrat,
+        "label_reserve": "Indemnite de precarite" if is_cdd else "Reserve financiere",
+        "provision_cp": provision_cp,
+        "provision_cp_amount": euros(provision_cp_amount),
+        "brut_hors_cp": euros(brut_hors_cp),
+        "employee_charges_hors_cp": euros(employee_charges_hors_cp),
+        "net_hors_cp": euros(net_hors_cp),
+    }
+
+
+# --- Moteur vectorise en centimes (tableaux int64) ---
+# Un taux saisi avec beaucoup de decimales (55/3 jours = 18.333333333333332)
+# a un denominateur jusqu'a 10^15 : les produits qui depasseraient l'int64
+# sont calcules en entiers Python (tableaux object), comme le calcul scalaire.
+LIMITE_INT64 = 2 ** 63
+
+
+def _borne(valeurs):
+    """Plus grande valeur absolue (entier Python) d'un scalaire ou d'un tableau."""
+    return int(np.max(np.abs(valeurs))) if np.size(valeurs) else 0
+
+
+def _diviser_batch(numerateur, denominateur):
+    """Version vectorisee de diviser (entiers int64 ou Python, denominateur > 0)."""
+    double = 2 * denominateur
+    return np.where(numerateur >= 0, (2 * numerateur + denominateur) // double,
+                    -((denominateur - 2 * numerateur) // double))
+
+
+def _produit_batch(montant, taux):
+    """
+    Version vectorisee de produit (taux scalaire ou par ligne) : en int64, ou
+    en entiers Python si montant x numerateur peut depasser l'int64.
+    """
+    numerateur, denominateur = taux
+    if 2 * _borne(montant) * _borne(numerateur) + 2 * _borne(denominateur) < LIMITE_INT64:
+        return _diviser_batch(montant * numerateur, denominateur)
+    montant, numerateur, denominateur = (np.asarray(v, dtype=object) for v in (montant, numerateur, denominateur))
+    return _diviser_batch(montant * numerateur, denominateur).astype(np.int64)
+
+
+def _exacts_batch(valeurs, echelle=1):
+    """
+    Version vectorisee de taux_exact : (numerateurs, denominateurs), une
+    conversion par valeur distincte ; tableaux object si un terme depasse 2^31
+    (leurs produits deux a deux restent alors exacts).
+    """
+    distinctes, indices = np.unique(valeurs, return_inverse=True)
+    paires = [taux_exact(v.item(), echelle) for v in distinctes]
+    grands = any(abs(terme) >= 2 ** 31 for paire in paires for terme in paire)
+    paires = np.array(paires, dtype=object if grands else np.int64).reshape(-1, 2)
+    return paires[indices.ravel(), 0], paires[indices.ravel(), 1]
+
+
+def _centimes_batch(montants):
+    """
+    Version vectorisee de centimes : arrondi direct de x * 100 ; les
+    demi-centimes, ou l'erreur flottante peut tromper, passent par centimes().
+    """
+    montants = np.asarray(montants, dtype=float)
+    y = montants * 100
+    resultat = np.rint(y)
+    ambigu = np.abs(y - np.floor(y) - 0.5) < 1e-6
+    if ambigu.any():
+        resultat[ambigu] = [centimes(float(v)) for v in montants[ambigu]]
+    return resultat.astype(np.int64)
+
+
+def _cotisations_batch(brut, pmss, atmp_rate, fnal_rate, prev_pat_contributions, bareme):
+    """
+    Version vectorisee de calculer_cotisations_centimes (totaux uniquement) ;
+    `fnal_rate` par ligne (numerateurs, denominateurs).
+    """
+    tranche_a = np.minimum(brut, pmss)
+    tranche_b = np.maximum(0, brut - pmss)
+    base_csg = _produit_batch(brut, TAUX_BASE_CSG) + prev_pat_contributions
+    bases = {"TOTALITE": brut, "TRANCHE_A": tranche_a, "TRANCHE_B": tranche_b, "CSG": base_csg}
+    numerateur, denominateur = _bornes_taux(bareme, atmp_rate)
+    numerateur, denominateur = max(numerateur, _borne(fnal_rate[0])), max(denominateur, _borne(fnal_rate[1]))
+    grands = 2 * _borne(np.maximum(brut, base_csg)) * numerateur + 2 * denominateur >= LIMITE_INT64
+    if grands:
+        bases = {nom: base.astype(object) for nom, base in bases.items()}
+
+    total_pat = np.zeros(brut.shape, dtype=object if grands else np.int64)
+    total_sal = np.zeros_like(total_pat)
+    for nom, nom_base, taux_pat, taux_sal in _lignes_cotisations(bareme, atmp_rate, None):
+        base = bases.get(nom_base)
+        if base is None:
+            continue
+        if nom == "fnal":
+            taux_pat = fnal_rate
+        if np.any(taux_pat[0]):
+            total_pat += (base * (2 * taux_pat[0]) + taux_pat[1]) // (2 * taux_pat[1])
+        if taux_sal[0]:
+            total_sal += (base * (2 * taux_sal[0]) + taux_sal[1]) // (2 * taux_sal[1])
+
+    return {"total_pat": total_pat.astype(np.int64), "total_sal": total_sal.astype(np.int64),
+            "tranche_a": tranche_a, "tranche_b": tranche_b, "base_csg": base_csg}
+
+
+@lru_cache(maxsize=32)
+def _bornes_taux(bareme, atmp_rate):
+    """Plus grands numerateur et denominateur des taux du bareme (hors FNAL, par ligne)."""
+    taux = [t for nom, _, pat, sal in _lignes_cotisations(bareme, atmp_rate, None)
+            for t in ((sal,) if nom == "fnal" else (pat, sal))]
+    return max(abs(n) for n, _ in taux), max(d for _, d in taux)
+
+
+def _charges_brut_batch(brut, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme):
+    """Version vectorisee de _charges_sur_brut : (cotisations, prev_pat_total, forfait_social)."""
+    prev_pat_total = (_produit_batch(np.minimum(brut, pmss), TAUX_PREVOYANCE_DECES) + mutuelle_part_pat
+                      + _produit_batch(np.maximum(0, brut - pmss), TAUX_PREVOYANCE_SUPP))
+    cotis = _cotisations_batch(brut, pmss, atmp_rate, fnal_rate, prev_pat_total, bareme)
+    return cotis, prev_pat_total, _produit_batch(prev_pat_total, TAUX_FORFAIT_SOCIAL)
+
+
+def _reduction_generale_batch(brut, smic_mensuel, use_fnal_50, bareme):
+    """Version vectorisee de calculer_reduction_generale_centimes."""
+    coefficient = coefficient_reduction_generale_batch(euros(brut), smic_mensuel, use_fnal_50, bareme)
+    return _diviser_batch(brut * np.rint(coefficient * DECIMALES_COEFFICIENT).astype(np.int64),
+                          DECIMALES_COEFFICIENT)
+
+
+@np.errstate(all="ignore")  # inf/nan silencieux comme les floats Python du calcul scalaire
+def calculate_salary_batch_centimes(tjm, days_worked_month, days_worked_week, ik_amount, igd_amount,
+                                    other_expenses, use_reserve, use_mutuelle, nb_titres_restaurant,
+                                    frais_intermediation_pct, jours_teletravail, effectif_sup_50,
+                                    frais_partages_pct, commission_apporteur, type_contrat, provision_cp,
+                                    nb_journees, nb_jours_ouvres, params=None, periode=None):
+    """
+    calculate_salary_centimes sur des tableaux 1-D deja diffuses (voir
+    calculate_salary_batch) : montants en centimes int64, memes arrondis et
+    memes resultats au centime que le calcul scalaire. Retourne les colonnes
+    de calculate_salary_batch, montants en euros.
+    """
+    bareme = REGISTRE_BAREMES.pour_periode(PERIODE_DEFAUT if periode is None else periode)
+    p = parametres_periode(params, bareme)
+    n = tjm.size
+
+    rate_gestion = pourcentage(p.frais_gestion)
+    rate_prime = pourcentage(p.taux_prime)
+    rate_cp = pourcentage(p.taux_cp)
+    rate_reserve = pourcentage(p.taux_reserve)
+
+    pmss = centimes(p.pmss)
+    atmp_rate = pourcentage(p.taux_atmp)
+    fnal_sup_50 = taux_exact(bareme.fnal_taux_sup_50)
+    fnal_inf_50 = taux_exact(bareme.fnal_taux_inf_50)
+    fnal_rate = (np.where(effectif_sup_50, fnal_sup_50[0], fnal_inf_50[0]),
+                 np.where(effectif_sup_50, fnal_sup_50[1], fnal_inf_50[1]))
+
+    # Mutuelle
+    (n_taux, d_taux), (n_pat, d_pat) = pourcentage(p.mutuelle_taux), pourcentage(p.mutuelle_part_pat)
+    mutuelle_part_pat = np.where(use_mutuelle, diviser(pmss * n_taux * n_pat, d_taux * d_pat), 0)
+    mutuelle_part_sal = np.where(use_mutuelle, diviser(pmss * n_taux * (d_pat - n_pat), d_taux * d_pat), 0)
+
+    # Titres restaurant, teletravail
+    tr_part_sal = _produit_batch(centimes(bareme.tr_part_patronale_max), _exacts_batch(nb_titres_restaurant))
+    tr_part_pat = tr_part_sal
+    jours_teletravail_effectifs = np.minimum(jours_teletravail, bareme.teletravail_max_jours)
+    forfait_teletravail = _produit_batch(centimes(bareme.teletravail_taux_jour),
+                                         _exacts_batch(jours_teletravail_effectifs))
+
+    # CA et deductions
+    turnover = _produit_batch(_centimes_batch(tjm), _exacts_batch(days_worked_month))
+    management_fees = _produit_batch(turnover, rate_gestion)
+    frais_intermediation = _produit_batch(turnover, _exacts_batch(frais_intermediation_pct, 100))
+    frais_partages = _produit_batch(turnover, _exacts_batch(frais_partages_pct, 100))
+    commission = _centimes_batch(commission_apporteur)
+    montant_disponible = turnover - management_fees - frais_intermediation - frais_partages - commission
+    ik, igd, autres = _centimes_batch(ik_amount), _centimes_batch(igd_amount), _centimes_batch(other_expenses)
+    total_frais_rembourses = ik + igd + forfait_teletravail + autres
+
+    prorata = (nb_journees > 0) & (nb_jours_ouvres > 0)
+    (n_jours, d_jours), (n_ouvres, d_ouvres) = _exacts_batch(nb_journees), _exacts_batch(nb_jours_ouvres)
+    n_semaine, d_semaine = _exacts_batch(days_worked_week, 5)
+    base_salary = _produit_batch(centimes(p.base_salary),
+                                 (np.where(prorata, n_jours * d_ouvres, n_semaine),
+                                  np.where(prorata, d_jours * n_ouvres, d_semaine)))
+    prime_apport = _produit_batch(base_salary, rate_prime)
+
+    is_cdd = type_contrat == "CDD"
+    reserve_reintegree = ~use_reserve
+    reserve_brute = np.where(is_cdd, 0, _produit_batch(base_salary, rate_reserve))
+    budget_salaire = montant_disponible - total_frais_rembourses
+
+    # Cascade CDD (exacte)
+    facteur_cdd = _facteur_cdd(rate_prime, rate_reserve, rate_cp)
+    preca_fixe = _produit_batch(base_salary + prime_apport, rate_reserve)
+    cp_fixe = _produit_batch(base_salary + prime_apport + preca_fixe, rate_cp)
+    cpf_cdd_taux = (np.where(is_cdd, TAUX_CPF_CDD[0], 0), TAUX_CPF_CDD[1])
+
+    def _complement(pool, i):
+        """(complement de remuneration, complement d'apport d'affaires, reserve) des lignes i pour un pool."""
+        base, prime, cdd = base_salary[i], prime_apport[i], is_cdd[i]
+        rem_cdd = np.maximum(0, _produit_batch(pool - base - prime - preca_fixe[i] - cp_fixe[i],
+                                               (facteur_cdd[1], facteur_cdd[0])))
+        apport_cdd = _produit_batch(rem_cdd, rate_prime)
+        total_cdi = np.maximum(0, pool - base - prime - reserve_brute[i])
+        rem_cdi = _produit_batch(total_cdi, (rate_prime[1], rate_prime[0] + rate_prime[1]))
+        comp_rem = np.where(cdd, rem_cdd, rem_cdi)
+        comp_apport = np.where(cdd, apport_cdd, total_cdi - rem_cdi)
+        reserve = np.where(cdd, _produit_batch(base + prime + rem_cdd + apport_cdd, rate_reserve), reserve_brute[i])
+        return comp_rem, comp_apport, reserve
+
+    # Cotisations du dernier brut estime par ligne (voir moteur_batch)
+    derniers = {cle: (np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64))
+                for cle in ("brut", "brut_avec_reserve")}
+
+    def _cotisations_estimees(cle, i, brut):
+        """(calculees, total patronal, forfait social) des lignes i ; reprises ou `brut` n'a pas change."""
+        dernier_brut, dernier_pat, dernier_fs = derniers[cle]
+        calculees = dernier_brut[i] != brut
+        j = i[calculees]
+        if j.size:
+            c, _, fs = _charges_brut_batch(brut[calculees], pmss, atmp_rate, (fnal_rate[0][j], fnal_rate[1][j]),
+                                           mutuelle_part_pat[j], bareme)
+            dernier_brut[j], dernier_pat[j], dernier_fs[j] = brut[calculees], c["total_pat"], fs
+        return calculees, dernier_pat[i], dernier_fs[i]
+
+    def _charges_brut_estimees(i, brut, icp):
+        """Charges patronales estimees sur un brut (hors RGDU), cotisations + forfait social, et si calculees."""
+        calculees, cotis_pat, fs = _cotisations_estimees("brut", i, brut)
+        cpf = _produit_batch(brut, (cpf_cdd_taux[0][i], cpf_cdd_taux[1]))
+        return cotis_pat + mutuelle_part_pat[i] + tr_part_pat[i] + fs + icp + cpf, cotis_pat + fs, calculees
+
+    def _charges_reintegree(i, pool):
+        comp_rem, comp_apport, res_est = _complement(pool, i)
+        bc = base_salary[i] + prime_apport[i] + res_est + comp_rem + comp_apport
+        icp = _produit_batch(bc, rate_cp)
+        ch, _, calculees = _charges_brut_estimees(i, bc + icp, icp)
+        return euros(ch), calculees
+
+    def _charges_provisionnee(i, pool):
+        comp_rem, comp_apport, res_est = _complement(pool, i)
+        bc = base_salary[i] + prime_apport[i] + comp_rem + comp_apport
+        icp = _produit_batch(bc, rate_cp)
+        brut = bc + icp
+        ch_brut, cotis_fs, calculees = _charges_brut_estimees(i, brut, icp)
+        reserve_cp = _produit_batch(res_est, rate_cp)
+        _, cotis2_pat, fs2 = _cotisations_estimees("brut_avec_reserve", i, brut + res_est + reserve_cp)
+        positif = pool > 0
+        ch_reserve = ((cotis2_pat + fs2) - cotis_fs + reserve_cp
+                      + np.where(positif, _diviser_batch(mutuelle_part_pat[i] * res_est, np.where(positif, pool, 1)), 0))
+        return euros(ch_brut + ch_reserve), calculees
+
+    def _charges_estimees(i, pool_euros):
+        """Charges estimees (euros) des lignes i, pool arrondi au centime."""
+        pool = np.rint(pool_euros * 100).astype(np.int64)
+        ch, calculees = np.empty(i.size), np.empty(i.size, dtype=bool)
+        reint = reserve_reintegree[i]
+        for masque, fonction in ((reint, _charges_reintegree), (~reint, _charges_provisionnee)):
+            if masque.any():
+                ch[masque], calculees[masque] = fonction(i[masque], pool[masque])
+        return ch, calculees
+
+    taux_charges, iterations = _resoudre_pools(euros(budget_salaire), _charges_estimees,
+                                               p.taux_charges_override / 100.0)
+    diagnostics.compter("batch.lignes", n)
+    diagnostics.compter("batch.iterations", int(iterations.max()) if n else 0)
+
+    # --- Resultats depuis le taux converge (pool arrondi au centime) ---
+    pool = np.rint(budget_salaire / (1 + taux_charges)).astype(np.int64)
+    complement_remuneration, complement_apport_affaires, reserve_brute = _complement(pool, slice(None))
+    complement_total = complement_remuneration + complement_apport_affaires
+
+    brut_base = base_salary + prime_apport + complement_total + np.where(reserve_reintegree, reserve_brute, 0)
+    indemnite_cp = _produit_batch(brut_base, rate_cp)
+    gross_salary = brut_base + indemnite_cp
+
+    cotis, prev_pat_total, forfait_social = _charges_brut_batch(gross_salary, pmss, atmp_rate, fnal_rate,
+                                                                mutuelle_part_pat, bareme)
+    cpf_cdd = _produit_batch(gross_salary, cpf_cdd_taux)
+    reduction_rgdu = _reduction_generale_batch(gross_salary, p.smic_mensuel, effectif_sup_50, bareme)
+
+    employer_charges_avant_rgdu = cotis["total_pat"] + mutuelle_part_pat + tr_part_pat + forfait_social + cpf_cdd
+    employer_charges = employer_charges_avant_rgdu - reduction_rgdu
+    employee_charges = cotis["total_sal"] + mutuelle_part_sal + tr_part_sal
+
+    provision_reserve_financiere = np.where(
+        reserve_reintegree, 0, np.maximum(0, budget_salaire - gross_salary - employer_charges))
+    cout_global = gross_salary + employer_charges + total_frais_rembourses
+    net_before_tax = gross_salary - employee_charges
+    net_payable = net_before_tax + total_frais_rembourses
+
+    # --- Provision Conges Payes ---
+    avec_provision_cp = provision_cp & (indemnite_cp > 0)
+    brut_hcp = gross_salary - indemnite_cp
+    cotis_hcp, _, fs_hcp = _charges_brut_batch(brut_hcp, pmss, atmp_rate, fnal_rate, mutuelle_part_pat, bareme)
+    rgdu_hcp = _reduction_generale_batch(brut_hcp, p.smic_mensuel, effectif_sup_50, bareme)
+    employer_charges_hcp = cotis_hcp["total_pat"] + mutuelle_part_pat + tr_part_pat + fs_hcp - rgdu_hcp
+    cout_global_hcp = brut_hcp + employer_charges_hcp + total_frais_rembourses
+    brut_hors_cp = np.where(avec_provision_cp, brut_hcp, gross_salary)
+    employee_charges_hors_cp = np.where(
+        avec_provision_cp, cotis_hcp["total_sal"] + mutuelle_part_sal + tr_part_sal, employee_charges)
+    provision_cp_amount = np.where(avec_provision_cp, cout_global - cout_global_hcp, 0)
+    net_hors_cp = brut_hors_cp - employee_charges_hors_cp
+
+    return {
+        "tjm": tjm,
+        "days_worked_month": days_worked_month,
+        "turnover": euros(turnover),
+        "management_fees": euros(management_fees),
+        "frais_intermediation": euros(frais_intermediation),
+        "frais_partages": euros(frais_partages),
+        "commission_apporteur": euros(commission),
+        "montant_disponible": euros(montant_disponible),
+        "ik_amount": euros(ik),
+        "igd_amount": euros(igd),
+        "forfait_teletravail": euros(forfait_teletravail),
+        "jours_teletravail": jours_teletravail_effectifs,
+        "other_expenses": euros(autres),
+        "total_frais_rembourses": euros(total_frais_rembourses),
+        "base_salary": euros(base_salary),
+        "prime_apport": euros(prime_apport),
+        "complement_remuneration": euros(complement_remuneration),
+        "complement_apport_affaires": euros(complement_apport_affaires),
+        "indemnite_cp": euros(indemnite_cp),
+        "gross_salary": euros(gross_salary),
+        "reserve_brute": euros(reserve_brute),
+        "reserve_amount": euros(reserve_brute),
+        "reserve_reintegree": reserve_reintegree,
+        "employer_charges": euros(employer_charges),
+        "employer_charges_avant_rgdu": euros(employer_charges_avant_rgdu),
+        "cotis_total_pat": euros(cotis["total_pat"]),
+        "cotis_total_sal": euros(cotis["total_sal"]),
+        "forfait_social": euros(forfait_social),
+        "cpf_cdd": euros(cpf_cdd),
+        "prev_pat_total": euros(prev_pat_total),
+        "tranche_a": euros(cotis["tranche_a"]),
+        "tranche_b": euros(cotis["tranche_b"]),
+        "base_csg": euros(cotis["base_csg"]),
+        "reduction_rgdu": euros(reduction_rgdu),
+        "employee_charges": euros(employee_charges),
+        "mutuelle_part_pat": euros(mutuelle_part_pat),
+        "mutuelle_part_sal": euros(mutuelle_part_sal),
+        "tr_part_sal": euros(tr_part_sal),
+        "tr_part_pat": euros(tr_part_pat),
+        "nb_titres_restaurant": nb_titres_restaurant,
+        "cout_global": euros(cout_global),
+        "net_before_tax": euros(net_before_tax),
+        "net_payable": euros(net_payable),
+        "effectif_sup_50": effectif_sup_50,
+        "taux_charges": taux_charges,
+        "iterations": iterations,
+        "bareme": np.full(n, bareme.nom),
+        "pool_silae": euros(pool),
+        "provision_reserve_financiere": euros(provision_reserve_financiere),
+        "budget_salaire": euros(budget_salaire),
+        "type_contrat": type_contrat,
+        "label_reserve": np.where(is_cdd, "Indemnite de precarite", "Reserve financiere"),
+        "provision_cp": provision_cp,
+        "provision_cp_amount": euros(provision_cp_amount),
+        "brut_hors_cp": euros(brut_hors_cp),
+        "employee_charges_hors_cp": euros(employee_charges_hors_cp),
+        "net_hors_cp": euros(net_hors_cp),
+    }
@@ -0,0 +1,351 @@
+"""
+Simulation d'un portefeuille de consultants depuis un fichier CSV ou XLSX.
+
+Une ligne par consultant (TJM, jours, contrat, km IK, IGD, titres restaurant,
+options). Le fichier est lu en flux (csv, openpyxl en lecture seule), simule
+par lots avec le moteur vectorise, et les resultats sont ecrits au fil de
+l'eau en CSV, XLSX (openpyxl en ecriture seule) ou Parquet (pyarrow,
+optionnel) : la memoire reste constante quelle que soit la taille du fichier.
+
+Une ligne invalide ne bloque pas le traitement : elle est reportee avec son
+message dans la colonne "erreur".
+
+Usage : python portefeuille.py consultants.xlsx resultats.csv
+"""
+import argparse
+import csv
+import io
+import os
+
+import numpy as np
+
+from moteur import REGISTRE_BAREMES
+from moteur_batch import calculate_salary_batch
+
+TAILLE_LOT = 500
+FORMATS = ("csv", "xlsx", "parquet")
+MAJORATION_ELECTRIQUE = 1.20
+
+# Tranche kilometrique annuelle -> cle du bareme IK (voiture, moto)
+TRANCHES_IK = {
+    "voiture": ("jusqua_5000", "de_5001_a_20000", "au_dela_20000"),
+    "moto": ("jusqua_3000", "de_3001_a_6000", "au_dela_6000"),
+}
+DUREES_IGD = ("moins_3_mois", "3_a_24_mois", "24_a_72_mois")
+
+COLONNES_SORTIE = (
+    "ligne", "nom", "contrat", "periode", "tjm", "jours", "ik_amount", "igd_amount",
+    "turnover", "gross_salary", "employer_charges", "employee_charges", "net_before_tax",
+    "net_payable", "cout_global", "taux_charges", "reserve_brute", "provision_reserve_financiere",
+    "erreur",
+)
+COLONNES_TEXTE = ("nom", "contrat", "periode", "erreur")
+RESULTATS = COLONNES_SORTIE[COLONNES_SORTIE.index("turnover"):-1]
+
+
+# --- Lecture en flux ---
+def format_fichier(nom, format=None):
+    """Format explicite ou deduit de l'extension du fichier."""
+    format = (format or os.path.splitext(nom)[1].lstrip(".")).lower()
+    if format not in FORMATS:
+        raise ValueError(f"Format non supporte : {format!r} (parmi {FORMATS})")
+    return format
+
+
+def _lignes_csv(source):
+    """Lignes d'un CSV (separateur ; , ou tabulation detecte sur le debut du fichier)."""
+    if isinstance(source, str):
+        flux = open(source, encoding="utf-8-sig", newline="")
+    else:
+        flux = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        echantillon = flux.read(4096)
+        flux.seek(0)
+        try:
+            dialecte = csv.Sniffer().sniff(echantillon, delimiters=";,\t")
+        except csv.Error:
+            dialecte = csv.excel
+        yield from csv.reader(flux, dialecte)
+    finally:
+        # Un fichier recu ouvert reste ouvert (relecture possible par l'appelant)
+        if isinstance(source, str):
+            flux.close()
+        else:
+            flux.detach()
+
+
+def _lignes_xlsx(source):
+    from openpyxl import load_workbook
+
+    classeur = load_workbook(source, read_only=True, data_only=True)
+    try:
+        yield from classeur.active.iter_rows(values_only=True)
+    finally:
+        classeur.close()
+
+
+def lire_lignes(source, format=None):
+    """
+    Genere (numero de ligne, dict colonne -> valeur) depuis un chemin ou un
+    fichier ouvert en binaire. Les en-tetes sont normalises (minuscules,
+    sans espaces) ; les lignes vides sont ignorees.
+    """
+    nom = source if isinstance(source, str) else getattr(source, "name", "")
+    format = format_fichier(nom, format)
+    if format == "parquet":
+        raise ValueError("Le Parquet n'est supporte qu'en sortie")
+    lignes = _lignes_xlsx(source) if format == "xlsx" else _lignes_csv(source)
+
+    entetes = None
+    for numero, valeurs in enumerate(lignes, start=1):
+        if not any(v not in (None, "") for v in valeurs):
+            continue
+        if entetes is None:
+            entetes = [str(v or "").strip().lower().replace(" ", "_") for v in valeurs]
+            continue
+        yield numero, dict(zip(entetes, valeurs))
+
+
+# --- Interpretation d'une ligne ---
+def _vide(valeur):
+    return valeur is None or (isinstance(valeur, str) and not valeur.strip())
+
+
+def _nombre(ligne, colonne, defaut=0.0):
+    valeur = ligne.get(colonne)
+    if _vide(valeur):
+        return defaut
+    try:
+        return float(str(valeur).strip().replace(" ", "").replace(",", ".")) if isinstance(valeur, str) \
+            else float(valeur)
+    except ValueError:
+        raise ValueError(f"{colonne} : nombre attendu (recu {valeur!r})") from None
+
+
+def _booleen(ligne, colonne, defaut=False):
+    valeur = ligne.get(colonne)
+    if _vide(valeur):
+        return defaut
+    if isinstance(valeur, (bool, int, float)):
+        return bool(valeur)
+    texte = str(valeur).strip().lower()
+    if texte in ("1", "oui", "o", "vrai", "true", "x", "yes"):
+        return True
+    if texte in ("0", "non", "n", "faux", "false", "no"):
+        return False
+    raise ValueError(f"{colonne} : oui/non attendu (recu {valeur!r})")
+
+
+def _texte(ligne, colonne, defaut=""):
+    valeur = ligne.get(colonne)
+    return defaut if _vide(valeur) else str(valeur).strip()
+
+
+def montant_ik(bareme, km, vehicule="voiture", cv=5, tranche=1):
+    """IK du mois : km x taux du bareme (vehicule voiture/electrique/moto, tranche 1 a 3)."""
+    famille = "moto" if vehicule == "moto" else "voiture"
+    baremes_famille = bareme.ik_moto if famille == "moto" else bareme.ik_voiture
+    if cv not in baremes_famille:
+        raise ValueError(f"cv : {cv} hors bareme {famille} ({sorted(baremes_famille)})")
+    if tranche not in (1, 2, 3):
+        raise ValueError(f"tranche_ik : 1, 2 ou 3 attendu (recu {tranche})")
+    taux = baremes_famille[cv][TRANCHES_IK[famille][tranche - 1]]
+    if vehicule == "electrique":
+        taux *= MAJORATION_ELECTRIQUE
+    return km * taux
+
+
+def montant_igd(bareme, repas, nuitees, duree="moins_3_mois", paris=False):
+    """IGD du mois : repas et nuitees au bareme de la duree de mission."""
+    if duree not in bareme.igd:
+        raise ValueError(f"igd_duree : parmi {DUREES_IGD} (recu {duree!r})")
+    taux = bareme.igd[duree]
+    return repas * taux["repas"] + nuitees * (taux["nuitee_paris"] if paris else taux["nuitee_province"])
+
+
+def arguments_ligne(ligne, annee=2026):
+    """
+    Arguments nommes de calculate_salary pour une ligne du fichier.
+    Colonnes : tjm, jours (obligatoires) ; nom, contrat (CDI/CDD), annee, mois,
+    jours_semaine, ik_km, vehicule (voiture/electrique/moto), cv, tranche_ik,
+    igd_repas, igd_nuitees, igd_duree, igd_paris, titres_restaurant,
+    teletravail, autres_frais, frais_intermediation_pct, frais_partages_pct,
+    commission, reserve_reintegree, mutuelle, provision_cp, effectif_sup_50.
+    ValueError si une valeur est invalide.
+    """
+    for colonne in ("tjm", "jours"):
+        if _vide(ligne.get(colonne)):
+            raise ValueError(f"{colonne} : colonne obligatoire")
+    tjm = _nombre(ligne, "tjm")
+    jours = _nombre(ligne, "jours")
+    if tjm < 0 or not 0 <= jours <= 31:
+        raise ValueError("tjm doit etre positif et jours entre 0 et 31")
+    contrat = _texte(ligne, "contrat", "CDI").upper()
+    if contrat not in ("CDI", "CDD"):
+        raise ValueError(f"contrat : CDI ou CDD attendu (recu {contrat!r})")
+    mois = int(_nombre(ligne, "mois", 1))
+    periode = (int(_nombre(ligne, "annee", annee)), mois)
+    if not 1 <= mois <= 12:
+        raise ValueError(f"mois : 1 a 12 attendu (recu {mois})")
+    bareme = REGISTRE_BAREMES.pour_periode(periode)
+    vehicule = _texte(ligne, "vehicule", "voiture").lower()
+    if vehicule not in ("voiture", "electrique", "moto"):
+        raise ValueError(f"vehicule : voiture, electrique ou moto attendu (recu {vehicule!r})")
+
+    return {
+        "tjm": tjm,
+        "days_worked_month": jours,
+        "days_worked_week": _nombre(ligne, "jours_semaine", 5.0),
+        "ik_amount": montant_ik(bareme, _nombre(ligne, "ik_km"), vehicule,
+                                int(_nombre(ligne, "cv", 5 if vehicule != "moto" else 3)),
+                                int(_nombre(ligne, "tranche_ik", 1))),
+        "igd_amount": montant_igd(bareme, _nombre(ligne, "igd_repas"), _nombre(ligne, "igd_nuitees"),
+                                  _texte(ligne, "igd_duree", "moins_3_mois"), _booleen(ligne, "igd_paris")),
+        "other_expenses": _nombre(ligne, "autres_frais"),
+        "use_reserve": not _booleen(ligne, "reserve_reintegree"),
+        "use_mutuelle": _booleen(ligne, "mutuelle", True),
+        "nb_titres_restaurant": int(_nombre(ligne, "titres_restaurant")),
+        "frais_intermediation_pct": _nombre(ligne, "frais_intermediation_pct"),
+        "jours_teletravail": int(_nombre(ligne, "teletravail")),
+        "effectif_sup_50": _booleen(ligne, "effectif_sup_50"),
+        "frais_partages_pct": _nombre(ligne, "frais_partages_pct"),
+        "commission_apporteur": _nombre(ligne, "commission"),
+        "type_contrat": contrat,
+        "provision_cp": _booleen(ligne, "provision_cp"),
+        "nb_journees": int(jours),
+        "nb_jours_ouvres": bareme.jours_ouvres[mois],
+        "periode": periode,
+    }
+
+
+# --- Simulation par lots ---
+def _simuler_lot(lot, params):
+    """
+    Simule un lot de (numero, ligne, arguments | erreur) : un appel batch par
+    bareme (la periode ne sert qu'a choisir le bareme, les jours ouvres du
+    mois sont deja dans les arguments).
+    """
+    sorties = []
+    par_bareme = {}
+    for numero, ligne, arguments in lot:
+        sortie = {"ligne": numero, "nom": _texte(ligne, "nom"), "erreur": ""}
+        if isinstance(arguments, ValueError):
+            sortie["erreur"] = str(arguments)
+        else:
+            sortie.update(contrat=arguments["type_contrat"], periode="%04d-%02d" % arguments["periode"],
+                          tjm=arguments["tjm"], jours=arguments["days_worked_month"],
+                          ik_amount=round(arguments["ik_amount"], 2),
+                          igd_amount=round(arguments["igd_amount"], 2))
+            bareme = REGISTRE_BAREMES.pour_periode(arguments["periode"])
+            par_bareme.setdefault(bareme, []).append((sortie, arguments))
+        sorties.append(sortie)
+
+    for bareme, groupe in par_bareme.items():
+        colonnes = {cle: np.array([a[cle] for _, a in groupe]) for cle in groupe[0][1] if cle != "periode"}
+        res = calculate_salary_batch(**colonnes, params=params, periode=bareme.valide_du)
+        for i, (sortie, _) in enumerate(groupe):
+            for cle in RESULTATS:
+                sortie[cle] = round(float(res[cle][i]), 4 if cle == "taux_charges" else 2)
+    return sorties
+
+
+def simuler_lignes(lignes, params=None, annee=2026, taille_lot=TAILLE_LOT):
+    """Genere un dict de resultats (COLONNES_SORTIE) par ligne, par lots de `taille_lot`."""
+    lot = []
+    for numero, ligne in lignes:
+        try:
+            arguments = arguments_ligne(ligne, annee)
+        except ValueError as e:
+            arguments = e
+        lot.append((numero, ligne, arguments))
+        if len(lot) >= taille_lot:
+            yield from _simuler_lot(lot, params)
+            lot = []
+    if lot:
+        yield from _simuler_lot(lot, params)
+
+
+# --- Ecriture en flux ---
+def _ecrire_csv(resultats, destination):
+    texte = open(destination, "w", encoding="utf-8-sig", newline="") if isinstance(destination, str) \
+        else io.TextIOWrapper(destination, encoding="utf-8-sig", newline="", write_through=True)
+    try:
+        ecrivain = csv.writer(texte, delimiter=";")
+        ecrivain.writerow(COLONNES_SORTIE)
+        for sortie in resultats:
+            ecrivain.writerow([str(sortie.get(c, "")).replace(".", ",") if isinstance(sortie.get(c), float)
+                               else sortie.get(c, "") for c in COLONNES_SORTIE])
+    finally:
+        if isinstance(destination, str):
+            texte.close()
+        else:
+            texte.detach()
+
+
+def _ecrire_xlsx(resultats, destination):
+    from openpyxl import Workbook
+
+    classeur = Workbook(write_only=True)
+    feuille = classeur.create_sheet("Resultats")
+    feuille.append(COLONNES_SORTIE)
+    for sortie in resultats:
+        feuille.append([sortie.get(c) for c in COLONNES_SORTIE])
+    classeur.save(destination)
+
+
+def _ecrire_parquet(resultats, destination, taille_lot=TAILLE_LOT):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("La sortie Parquet necessite pyarrow (pip install pyarrow)") from None
+
+    schema = pa.schema([(c, pa.string() if c in COLONNES_TEXTE else pa.int64() if c == "ligne" else pa.float64())
+                        for c in COLONNES_SORTIE])
+    with pq.ParquetWriter(destination, schema) as ecrivain:
+        lot = []
+        for sortie in resultats:
+            lot.append(sortie)
+            if len(lot) >= taille_lot:
+                ecrivain.write_table(pa.Table.from_pylist(lot, schema=schema))
+                lot = []
+        if lot:
+            ecrivain.write_table(pa.Table.from_pylist(lot, schema=schema))
+
+
+ECRIVAINS = {"csv": _ecrire_csv, "xlsx": _ecrire_xlsx, "parquet": _ecrire_parquet}
+
+
+def simuler_portefeuille(entree, sortie, format_entree=None, format_sortie=None, params=None, annee=2026):
+    """
+    Lit `entree`, simule chaque ligne et ecrit `sortie` (chemins ou fichiers
+    binaires) en flux. Retourne {"lignes": n, "erreurs": nb de lignes en erreur}.
+    """
+    nom_sortie = sortie if isinstance(sortie, str) else getattr(sortie, "name", "")
+    format_sortie = format_fichier(nom_sortie, format_sortie)
+    compteurs = {"lignes": 0, "erreurs": 0}
+
+    def compter(resultats):
+        for r in resultats:
+            compteurs["lignes"] += 1
+            compteurs["erreurs"] += bool(r["erreur"])
+            yield r
+
+    resultats = simuler_lignes(lire_lignes(entree, format_entree), params, annee)
+    ECRIVAINS[format_sortie](compter(resultats), sortie)
+    return compteurs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation d'un portefeuille de consultants (CSV/XLSX).")
+    parser.add_argument("entree", help="fichier CSV ou XLSX, une ligne par consultant")
+    parser.add_argument("sortie", help="fichier de resultats (.csv, .xlsx ou .parquet)")
+    parser.add_argument("--annee", type=int, default=2026, help="annee de paie par defaut (2026)")
+    args = parser.parse_args(argv)
+    compteurs = simuler_portefeuille(args.entree, args.sortie, annee=args.annee)
+    print(f"{compteurs['lignes']} lignes simulees, {compteurs['erreurs']} en erreur -> {args.sortie}")
+    return 1 if compteurs["erreurs"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""
+Projection annuelle : les 12 mois d'une annee simules avec les jours ouvres
+de chaque mois, des surcharges mois par mois et les cumuls (brut, net,
+charges, reserve...).
+
+Le recalcul est incremental : modifier un mois ne resimule que ce mois, puis
+met a jour les cumuls a partir de lui. Les mois dont les arguments n'ont pas
+change ne sont jamais recalcules.
+"""
+from moteur import MOIS_LABELS, REGISTRE_BAREMES, calculate_salary_memo
+
+MOIS = range(1, 13)
+
+# Hypotheses communes par defaut (arguments de calculate_salary hors mois)
+HYPOTHESES_DEFAUT = {
+    "days_worked_week": 5.0, "ik_amount": 0.0, "igd_amount": 0.0, "other_expenses": 0.0,
+    "use_reserve": True, "use_mutuelle": True,
+}
+
+# Arguments propres a chaque mois, deduits du calendrier (surchargeables)
+ARGUMENTS_MOIS = ("days_worked_month", "nb_journees", "nb_jours_ouvres", "periode")
+
+# Montants cumules mois apres mois
+CUMULS = (
+    "turnover", "gross_salary", "net_before_tax", "net_payable", "employer_charges",
+    "employee_charges", "reserve_brute", "provision_reserve_financiere", "provision_cp_amount",
+    "cout_global",
+)
+
+
+class ProjectionAnnuelle:
+    """
+    Simulation des 12 mois de `annee` a partir d'hypotheses communes
+    (arguments nommes de calculate_salary). Par defaut chaque mois est a temps
+    complet : nb_journees = jours ouvres du mois (bareme de l'annee).
+    `calcul` : fonction de simulation (calculate_salary_memo par defaut).
+    """
+
+    def __init__(self, tjm, annee=2026, params=None, calcul=calculate_salary_memo, **hypotheses):
+        self.annee = annee
+        self.params = params
+        self._calcul = calcul
+        self._verifier_hypotheses(hypotheses)
+        self.hypotheses = {**HYPOTHESES_DEFAUT, "tjm": tjm, **hypotheses}
+        self.surcharges = {mois: {} for mois in MOIS}
+        self.resultats = {}
+        self.cumuls = {}
+        self.nb_calculs = 0
+        self._arguments = {}
+        self._recalculer(MOIS)
+
+    @staticmethod
+    def _verifier_hypotheses(hypotheses):
+        propres_au_mois = set(hypotheses) & set(ARGUMENTS_MOIS)
+        if propres_au_mois:
+            raise ValueError("Arguments propres a chaque mois (utiliser modifier_mois) : "
+                             f"{sorted(propres_au_mois)}")
+
+    def jours_ouvres(self, mois):
+        """Jours ouvres du mois selon le bareme en vigueur."""
+        return REGISTRE_BAREMES.pour_periode((self.annee, mois)).jours_ouvres[mois]
+
+    def arguments_mois(self, mois):
+        """Arguments de calculate_salary du mois : hypotheses, calendrier puis surcharges."""
+        surcharges = self.surcharges[mois]
+        args = dict(self.hypotheses)
+        args["nb_jours_ouvres"] = self.jours_ouvres(mois)
+        args["nb_journees"] = args["nb_jours_ouvres"]
+        args["periode"] = (self.annee, mois)
+        args.update(surcharges)
+        if "days_worked_month" not in surcharges:
+            args["days_worked_month"] = args["nb_journees"]
+        return args
+
+    def modifier_mois(self, mois, **surcharges):
+        """Surcharge des arguments d'un mois (ex. nb_journees=10) ; seul ce mois est recalcule."""
+        if mois not in self.surcharges:
+            raise ValueError(f"Mois invalide : {mois}")
+        self.surcharges[mois].update(surcharges)
+        return self._recalculer([mois])
+
+    def reinitialiser_mois(self, mois):
+        """Retire les surcharges d'un mois (retour au calendrier)."""
+        self.surcharges[mois] = {}
+        return self._recalculer([mois])
+
+    def modifier_hypotheses(self, params=None, **hypotheses):
+        """
+        Change des hypotheses communes (ou les parametres) : seuls les mois dont
+        les arguments changent effectivement sont recalcules.
+        """
+        if params is not None and params != self.params:
+            self.params = params
+            self._arguments.clear()
+        self._verifier_hypotheses(hypotheses)
+        self.hypotheses.update(hypotheses)
+        return self._recalculer(MOIS)
+
+    def _recalculer(self, mois_a_verifier):
+        """Recalcule les mois dont les arguments ont change ; retourne leur liste."""
+        modifies = []
+        for mois in mois_a_verifier:
+            args = self.arguments_mois(mois)
+            if self._arguments.get(mois) == args:
+                continue
+            self.resultats[mois] = self._calcul(params=self.params, **args)
+            self._arguments[mois] = args
+            self.nb_calculs += 1
+            modifies.append(mois)
+        if modifies:
+            self._cumuler(min(modifies))
+        return modifies
+
+    def _cumuler(self, depuis):
+        """Met a jour les cumuls des mois `depuis`..12 a partir du cumul du mois precedent."""
+        cumul = dict(self.cumuls[depuis - 1]) if depuis > 1 else dict.fromkeys(CUMULS, 0.0)
+        for mois in range(depuis, 13):
+            for cle in CUMULS:
+                cumul[cle] += self.resultats[mois][cle]
+            self.cumuls[mois] = dict(cumul)
+
+    def totaux(self):
+        """Cumuls sur l'annee (cumuls du mois de decembre)."""
+        return dict(self.cumuls[12])
+
+    def lignes(self):
+        """Une ligne par mois (jours, montants du mois et cumuls), pour affichage ou export."""
+        lignes = []
+        for mois in MOIS:
+            r = self.resultats[mois]
+            ligne = {
+                "mois": mois,
+                "libelle": MOIS_LABELS[mois],
+                "jours_ouvres": self._arguments[mois]["nb_jours_ouvres"],
+                "jours_travailles": self._arguments[mois]["days_worked_month"],
+                "surcharge": bool(self.surcharges[mois]),
+            }
+            ligne.update({cle: r[cle] for cle in CUMULS})
+            ligne.update({"cumul_" + cle: self.cumuls[mois][cle] for cle in CUMULS})
+            lignes.append(ligne)
+        return lignes
@@ -0,0 +1,183 @@
+"""
+Registre versionne des baremes de paie (cotisations, reduction generale,
+FNAL, titres restaurant, teletravail, IK, IGD, jours ouvres).
+
+Chaque fichier baremes/<nom>.json decrit un jeu de taux date (`valide_du`).
+Les fichiers sont valides et compiles une seule fois au chargement ; le
+moteur selectionne ensuite le bareme applicable a une periode de paie, ce
+qui permet de servir plusieurs annees depuis un meme processus.
+"""
+import bisect
+import datetime
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+REPERTOIRE_BAREMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baremes")
+
+BASES_COTISATIONS = ("TOTALITE", "TRANCHE_A", "TRANCHE_B", "CSG")
+FORMULES_REDUCTION = {
+    "rgdu": ("tmin", "tdelta_fnal_10", "tdelta_fnal_50", "exposant", "seuil_smic"),
+    "fillon": ("t_fnal_10", "t_fnal_50", "seuil_smic"),
+}
+
+
+@dataclass(frozen=True, eq=False)
+class Bareme:
+    """
+    Jeu de taux compile et immuable (compare par identite, utilisable comme cle de cache).
+    Les cles numeriques (mois, CV) sont des int ; `cotisations` garde l'ordre du fichier.
+    """
+    nom: str
+    valide_du: datetime.date
+    source: str
+    pmss: float
+    smic_mensuel: float
+    fnal_taux_inf_50: float
+    fnal_taux_sup_50: float
+    reduction_generale: dict
+    tr_valeur_faciale: float
+    tr_part_patronale_max: float
+    teletravail_taux_jour: float
+    teletravail_max_jours: int
+    jours_ouvres: dict
+    ik_voiture: dict
+    ik_moto: dict
+    igd: dict
+    cotisations: dict
+
+    def __repr__(self):
+        return f"Bareme({self.nom!r}, valide_du={self.valide_du.isoformat()})"
+
+
+def _erreur(origine, message):
+    return ValueError(f"Bareme invalide ({origine}) : {message}")
+
+
+def _taux(origine, cle, valeur):
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)) or not 0 <= valeur <= 1:
+        raise _erreur(origine, f"{cle} doit etre un taux entre 0 et 1 (recu {valeur!r})")
+    return float(valeur)
+
+
+def _montant(origine, cle, valeur):
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)) or valeur < 0:
+        raise _erreur(origine, f"{cle} doit etre un nombre positif (recu {valeur!r})")
+    return float(valeur)
+
+
+def _section(origine, donnees, cle):
+    valeur = donnees.get(cle)
+    if not isinstance(valeur, dict) or not valeur:
+        raise _erreur(origine, f"section '{cle}' manquante ou vide")
+    return valeur
+
+
+def compiler_bareme(donnees, origine="<dict>"):
+    """Valide un bareme brut (dict issu du JSON) et le compile en Bareme."""
+    try:
+        valide_du = datetime.date.fromisoformat(donnees["valide_du"])
+    except (KeyError, TypeError, ValueError):
+        raise _erreur(origine, "valide_du absent ou pas au format AAAA-MM-JJ") from None
+
+    cotisations = {}
+    for nom, ligne in _section(origine, donnees, "cotisations").items():
+        if not isinstance(ligne, dict) or ligne.get("base") not in BASES_COTISATIONS:
+            raise _erreur(origine, f"cotisation '{nom}' : base parmi {BASES_COTISATIONS} requise")
+        cotisations[nom] = {"pat": _taux(origine, f"{nom}.pat", ligne.get("pat")),
+                            "sal": _taux(origine, f"{nom}.sal", ligne.get("sal")),
+                            "base": ligne["base"]}
+
+    reduction = dict(_section(origine, donnees, "reduction_generale"))
+    formule = reduction.get("formule")
+    if formule not in FORMULES_REDUCTION:
+        raise _erreur(origine, f"reduction_generale.formule parmi {sorted(FORMULES_REDUCTION)} requise")
+    for cle in FORMULES_REDUCTION[formule]:
+        reduction[cle] = _montant(origine, f"reduction_generale.{cle}", reduction.get(cle))
+
+    jours_ouvres = {int(mois): jours for mois, jours in _section(origine, donnees, "jours_ouvres").items()}
+    if sorted(jours_ouvres) != list(range(1, 13)) or not all(
+            isinstance(j, int) and 0 < j <= 23 for j in jours_ouvres.values()):
+        raise _erreur(origine, "jours_ouvres doit donner un nombre de jours (1-23) pour les mois 1 a 12")
+
+    fnal = _section(origine, donnees, "fnal")
+    tr = _section(origine, donnees, "titres_restaurant")
+    teletravail = _section(origine, donnees, "teletravail")
+    return Bareme(
+        nom=str(donnees.get("nom", valide_du.year)),
+        valide_du=valide_du,
+        source=donnees.get("source", ""),
+        pmss=_montant(origine, "pmss", donnees.get("pmss")),
+        smic_mensuel=_montant(origine, "smic_mensuel", donnees.get("smic_mensuel")),
+        fnal_taux_inf_50=_taux(origine, "fnal.taux_inf_50", fnal.get("taux_inf_50")),
+        fnal_taux_sup_50=_taux(origine, "fnal.taux_sup_50", fnal.get("taux_sup_50")),
+        reduction_generale=reduction,
+        tr_valeur_faciale=_montant(origine, "titres_restaurant.valeur_faciale", tr.get("valeur_faciale")),
+        tr_part_patronale_max=_montant(origine, "titres_restaurant.part_patronale_max",
+                                       tr.get("part_patronale_max")),
+        teletravail_taux_jour=_montant(origine, "teletravail.taux_jour", teletravail.get("taux_jour")),
+        teletravail_max_jours=int(_montant(origine, "teletravail.max_jours", teletravail.get("max_jours"))),
+        jours_ouvres=jours_ouvres,
+        ik_voiture={int(cv): tranches for cv, tranches in _section(origine, donnees, "ik_voiture").items()},
+        ik_moto={int(cv): tranches for cv, tranches in _section(origine, donnees, "ik_moto").items()},
+        igd=_section(origine, donnees, "igd"),
+        cotisations=cotisations,
+    )
+
+
+@lru_cache(maxsize=256)
+def date_periode(periode):
+    """
+    Premier jour de la periode de paie : date/datetime, annee (2025),
+    "AAAA", "AAAA-MM", "AAAA-MM-JJ" ou tuple (annee, mois).
+    """
+    if isinstance(periode, datetime.datetime):
+        return periode.date()
+    if isinstance(periode, datetime.date):
+        return periode
+    if isinstance(periode, tuple):
+        return datetime.date(int(periode[0]), int(periode[1]) if len(periode) > 1 else 1, 1)
+    if isinstance(periode, (int, float)) and not isinstance(periode, bool):
+        return datetime.date(int(periode), 1, 1)
+    if isinstance(periode, str):
+        morceaux = [int(m) for m in periode.split("-")]
+        return datetime.date(*(morceaux + [1, 1])[:3])
+    raise TypeError(f"Periode non reconnue : {periode!r}")
+
+
+class RegistreBaremes:
+    """Baremes tries par date de validite ; selection par periode en O(log n)."""
+
+    def __init__(self, baremes):
+        self.baremes = sorted(baremes, key=lambda b: b.valide_du)
+        self._debuts = [b.valide_du for b in self.baremes]
+        if len(set(self._debuts)) != len(self._debuts):
+            raise ValueError("Deux baremes ont la meme date de validite")
+        self._par_nom = {b.nom: b for b in self.baremes}
+
+    @classmethod
+    def charger(cls, repertoire=REPERTOIRE_BAREMES):
+        """Charge, valide et compile tous les fichiers *.json du repertoire."""
+        baremes = []
+        for fichier in sorted(os.listdir(repertoire)):
+            if fichier.endswith(".json"):
+                with open(os.path.join(repertoire, fichier), encoding="utf-8") as f:
+                    baremes.append(compiler_bareme(json.load(f), origine=fichier))
+        if not baremes:
+            raise ValueError(f"Aucun bareme dans {repertoire}")
+        return cls(baremes)
+
+    def pour_periode(self, periode):
+        """Bareme en vigueur au debut de la periode (le plus recent deja valide)."""
+        jour = date_periode(periode)
+        i = bisect.bisect_right(self._debuts, jour) - 1
+        if i < 0:
+            raise ValueError(f"Aucun bareme en vigueur au {jour.isoformat()}")
+        return self.baremes[i]
+
+    def __getitem__(self, nom):
+        return self._par_nom[nom]
+
+    def noms(self):
+        return list(self._par_nom)
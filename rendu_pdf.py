@@ -0,0 +1,474 @@
+"""
+Rendu PDF d'une simulation (HTML + WeasyPrint) et generation en lot.
+
+Module sans Streamlit : utilise par l'app (un PDF a la demande) et par la
+generation de fin de mois, qui repartit les PDF sur un pool de processus.
+Chaque processus est prechauffe une fois (WeasyPrint, polices, feuille de
+style, template, logo) puis enchaine les rendus.
+
+Les bibliotheques de rendu (WeasyPrint, matplotlib, Jinja) ne sont importees
+qu'au premier rendu : importer ce module ne coute rien au demarrage de l'app.
+
+Usage : python rendu_pdf.py consultants.xlsx propositions.zip [--processus 4]
+        python rendu_pdf.py consultants.xlsx propositions.pdf   (un seul PDF combine)
+"""
+import argparse
+import base64
+import io
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from multiprocessing import get_context
+
+import diagnostics
+from cache import CacheLRU
+from moteur import PARAMETRES_DEFAUT
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGO_PATH = os.path.join(_BASE_DIR, "logo_signe_plus.png")
+LOGO_BLEU_PATH = os.path.join(_BASE_DIR, "logo_signe_plus_bleu.png")
+TEMPLATE_PATH = os.path.join(_BASE_DIR, "template_pdf.html")
+FEUILLE_STYLE_PATH = os.path.join(_BASE_DIR, "template_pdf.css")
+MEMBRE_BU_DEFAUT = "Gwenaëlle CHARPENTIER"
+GRAPHIQUES_CACHE_TAILLE = 256
+IMAGES_CACHE_TAILLE = 512  # images decodees gardees par WeasyPrint (logo + graphiques)
+PHASES_PDF = ("template", "chart", "layout", "write")
+_CORPS_HTML = re.compile(r"<body[^>]*>(.*)</body>", re.DOTALL)  # pages du PDF combine
+
+# Graphiques deja dessines, par proportions arrondies (partages par les rendus du processus)
+_graphiques = CacheLRU(taille_max=GRAPHIQUES_CACHE_TAILLE)
+
+# Templates nommes -> fichier (dans _BASE_DIR). Une variante (ex. "cdd" :
+# "template_pdf_cdd.html", qui peut etendre template_pdf.html) se declare ici
+# et se choisit par l'argument `template` de create_pdf.
+TEMPLATES_PDF = {"defaut": os.path.basename(TEMPLATE_PATH)}
+# Developpement : recompile un template quand son fichier change (mtime)
+RECHARGER_TEMPLATES = os.environ.get("SIMULATEUR_RECHARGER_TEMPLATES", "") not in ("", "0")
+
+
+@lru_cache(maxsize=1)
+def pyplot():
+    """matplotlib.pyplot en backend Agg (sans affichage), importe au premier graphique."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def creer_environnement(repertoire=_BASE_DIR, recharger=RECHARGER_TEMPLATES):
+    """
+    Environnement Jinja : chaque template est compile une fois puis garde en
+    cache ; avec `recharger`, sa date de modification est verifiee a chaque
+    acces et il est recompile s'il a change.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    return Environment(loader=FileSystemLoader(repertoire), auto_reload=recharger, cache_size=50)
+
+
+@lru_cache(maxsize=1)
+def environnement_templates():
+    """Environnement partage par tous les rendus du processus."""
+    return creer_environnement()
+
+
+def template_pdf(nom="defaut"):
+    """Template compile `nom` (cle de TEMPLATES_PDF), depuis le cache du processus."""
+    if nom not in TEMPLATES_PDF:
+        raise ValueError(f"Template PDF inconnu : {nom!r} (parmi {sorted(TEMPLATES_PDF)})")
+    return environnement_templates().get_template(TEMPLATES_PDF[nom])
+
+
+@lru_cache(maxsize=1)
+def chemin_logo():
+    """Logo bleu, sinon logo standard, sinon aucun (resolu une fois par processus)."""
+    for chemin in (LOGO_BLEU_PATH, LOGO_PATH):
+        if os.path.exists(chemin):
+            return chemin
+    return ""
+
+
+def proportions_graphique(data):
+    """
+    Parts du donut en pourcentage, arrondies a la precision affichee (0,1 %) :
+    tuple de (couleur, pourcentage) des parts non nulles. C'est la cle du
+    cache des graphiques : deux simulations aux memes parts affichees
+    partagent le meme dessin.
+    """
+    frais_g = (data['management_fees'] + data['frais_intermediation']
+               + data.get('frais_partages', 0) + data.get('commission_apporteur', 0))
+    cotis = (data['cotis_total_pat'] + data['cotis_total_sal'] + data['forfait_social']
+             - data['reduction_rgdu'] + data['mutuelle_part_pat'] + data['mutuelle_part_sal']
+             + data['tr_part_pat'] + data['tr_part_sal'])
+    prov = data['provision_reserve_financiere'] if not data.get('reserve_reintegree', False) else 0
+
+    values = [data['net_payable'], frais_g, cotis, prov]
+    colors = ['#4A90D9', '#9E9E9E', '#E91E63', '#F48FB1']  # net, frais, cotisations, provision
+    filt = [(c, v) for c, v in zip(colors, values) if v > 0]
+    total = sum(v for _, v in filt)
+    return tuple((c, round(v / total * 100, 1)) for c, v in filt)
+
+
+def _dessiner_donut_svg(proportions):
+    """Dessine le donut des proportions en SVG, en memoire ; data URI pour le src de l'image."""
+    cf, pf = zip(*proportions)
+    etiquettes = iter(f"{p:.1f}%" for p in pf)
+
+    plt = pyplot()
+    fig = plt.figure(figsize=(2.5, 2.5))
+    try:
+        ax = fig.add_axes([0.1, 0.1, 0.8, 0.8])  # centré dans la figure
+        wedges, _, autotexts = ax.pie(pf, colors=cf, autopct=lambda _: next(etiquettes), startangle=90,
+                                       textprops={'fontsize': 8, 'weight': 'bold'},
+                                       pctdistance=0.72, wedgeprops={'linewidth': 1.5, 'edgecolor': 'white'})
+        for t in autotexts:
+            t.set_color('white')
+        ax.add_artist(plt.Circle((0, 0), 0.38, fc='white'))
+        buffer = io.BytesIO()
+        # Sans date et identifiants fixes : meme graphique -> meme SVG
+        with plt.rc_context({'svg.hashsalt': 'simulateur'}):
+            fig.savefig(buffer, format='svg', transparent=True, metadata={'Date': None})
+    finally:
+        plt.close(fig)
+    return "data:image/svg+xml;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _generer_chart_svg(data):
+    """
+    Donut chart du PDF en SVG (data URI, rendu vectoriel natif de WeasyPrint,
+    sans fichier temporaire). Servi depuis le cache des graphiques du
+    processus quand les memes proportions ont deja ete dessinees ; None si
+    rien a representer.
+    """
+    proportions = proportions_graphique(data)
+    if not proportions:
+        return None
+    return _graphiques.get_ou_calcule(proportions, lambda: _dessiner_donut_svg(proportions))
+
+
+def stats_graphiques():
+    """Compteurs du cache des graphiques (hits, misses, evictions...)."""
+    return _graphiques.stats()
+
+
+class RenduPDF:
+    """
+    Contexte WeasyPrint reutilisable : la feuille de style (template_pdf.css)
+    est analysee une fois, ses polices (fonts/ DejaVu) enregistrees dans une
+    FontConfiguration partagee et les images decodees (logo, graphiques)
+    gardees en cache. Un document ne paie plus que la mise en page de son
+    contenu. Partage entre les threads (sessions Streamlit) : un verrou
+    serialise les rendus, ni les images ni les polices ne sont sures en
+    acces concurrent.
+    """
+
+    def __init__(self, feuille_style=FEUILLE_STYLE_PATH):
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        self.polices = FontConfiguration()
+        self.feuille = CSS(filename=feuille_style, font_config=self.polices)
+        self.images = {}
+        self._verrou = threading.Lock()
+
+    def mettre_en_page(self, html_str):
+        """HTML -> document pagine (styles, polices et images deja charges)."""
+        from weasyprint import HTML
+
+        with self._verrou:
+            if len(self.images) > IMAGES_CACHE_TAILLE:
+                self.images.clear()
+            return HTML(string=html_str, base_url=_BASE_DIR).render(
+                stylesheets=[self.feuille], font_config=self.polices, cache=self.images)
+
+    def ecrire(self, document):
+        """Document pagine -> octets du PDF (polices du contexte : sous le meme verrou)."""
+        with self._verrou:
+            return document.write_pdf()
+
+
+@lru_cache(maxsize=1)
+def rendu_processus():
+    """RenduPDF partage par tous les rendus du processus (cree au premier appel)."""
+    return RenduPDF()
+
+
+def _html_pdf(data, name, membre_bu, frais_gestion, template, chronos):
+    """HTML d'une simulation ; ajoute ses durees "template" et "chart" a `chronos`."""
+    debut = time.perf_counter()
+
+    t_gest = frais_gestion if frais_gestion is not None else PARAMETRES_DEFAUT.frais_gestion
+    nb_tr = data.get('nb_titres_restaurant', 0)
+    label_res = data.get('label_reserve', 'Réserve financière')
+
+    # Lignes salaire
+    salary_lines = [
+        {"label": "Salaire de base", "value": f"{data['base_salary']:,.2f}€"},
+        {"label": "Prime d'apports d'affaires", "value": f"{data['prime_apport']:,.2f}€"},
+        {"label": "Complément de rémunération", "value": f"{data['complement_remuneration']:,.2f}€"},
+        {"label": "Complément apport d'affaires", "value": f"{data['complement_apport_affaires']:,.2f}€"},
+    ]
+    if data.get('reserve_reintegree', False):
+        salary_lines.append({"label": label_res.capitalize(), "value": f"{data['reserve_brute']:,.2f}€"})
+    salary_lines.append({"label": "Indemnités Congés Payés", "value": f"{data['indemnite_cp']:,.2f}€"})
+
+    # Lignes frais
+    frais_lines = []
+    if data.get('ik_amount', 0) > 0:
+        frais_lines.append({"label": "Indemnités Kilométriques", "value": f"{data['ik_amount']:,.2f}€"})
+    if data.get('igd_amount', 0) > 0:
+        frais_lines.append({"label": "Indemnités Grands Déplacements", "value": f"{data['igd_amount']:,.2f}€"})
+    if data.get('forfait_teletravail', 0) > 0:
+        frais_lines.append({"label": f"Forfait Télétravail ({data['jours_teletravail']}j × 2.70)", "value": f"{data['forfait_teletravail']:,.2f}€"})
+    if data.get('other_expenses', 0) > 0:
+        frais_lines.append({"label": "Autres Frais", "value": f"{data['other_expenses']:,.2f}€"})
+
+    # Reserve note
+    reserve_note = ""
+    if data.get('reserve_brute', 0) > 0 and not data.get('reserve_reintegree', False):
+        reserve_note = f"*La {label_res} : {data['reserve_brute']:,.2f}€ brut provisionnée tous les mois."
+
+    # Chart (SVG en memoire)
+    t_chart = time.perf_counter()
+    chart_src = _generer_chart_svg(data)
+    t_template = time.perf_counter()
+
+    html_str = template_pdf(template or "defaut").render(
+        logo_path=chemin_logo(),
+        tjm=f"{data.get('tjm', 0):.0f}",
+        days=f"{data.get('days_worked_month', 0):g}",
+        frais_gestion=f"{t_gest}",
+        tr_label="Oui" if nb_tr > 0 else "Non",
+        name=name,
+        salary_lines=salary_lines,
+        gross_salary=f"{data['gross_salary']:,.2f}€",
+        employee_charges=f"{data['employee_charges']:,.2f}€",
+        employer_charges=f"{data['employer_charges']:,.2f}€",
+        frais_lines=frais_lines,
+        chart_src=chart_src or "",
+        has_provision=data.get('provision_reserve_financiere', 0) > 0,
+        show_brut_reserve=True,
+        brut_avec_reserve=f"{data['gross_salary']:,.2f}€",
+        net_avant_impot=f"{data['net_before_tax']:,.2f}€",
+        net_payable=f"{data['net_payable']:,.2f}€",
+        total_frais=f"{data['total_frais_rembourses']:,.2f}€" if data.get('total_frais_rembourses', 0) > 0 else "",
+        provision_reserve=f"{data['provision_reserve_financiere']:,.2f}€" if data.get('provision_reserve_financiere', 0) > 0 else "",
+        reserve_note=reserve_note,
+        has_mutuelle=data.get('mutuelle_part_pat', 0) > 0,
+        membre_bu=membre_bu or MEMBRE_BU_DEFAUT,
+    )
+    fin = time.perf_counter()
+    chronos["template"] = chronos.get("template", 0.0) + (t_chart - debut) + (fin - t_template)
+    chronos["chart"] = chronos.get("chart", 0.0) + t_template - t_chart
+    diagnostics.enregistrer("pdf.template", (t_chart - debut) + (fin - t_template))
+    diagnostics.enregistrer("pdf.chart", t_template - t_chart)
+    return html_str
+
+
+def _mettre_en_page_et_ecrire(html_str, chronos):
+    """Mise en page et ecriture par le RenduPDF du processus (durees "layout" et "write")."""
+    rendu = rendu_processus()
+    debut = time.perf_counter()
+    document = rendu.mettre_en_page(html_str)
+    t_write = time.perf_counter()
+    pdf = rendu.ecrire(document)
+    chronos.update(layout=t_write - debut, write=time.perf_counter() - t_write)
+    diagnostics.enregistrer("pdf.layout", chronos["layout"])
+    diagnostics.enregistrer("pdf.write", chronos["write"])
+    return pdf
+
+
+def create_pdf(data, name, membre_bu="", frais_gestion=None, template=None, chronos=None):
+    """
+    Génère le PDF via HTML + WeasyPrint (frais de gestion par defaut :
+    PARAMETRES_DEFAUT ; template : nom dans TEMPLATES_PDF, "defaut" par defaut). Si
+    `chronos` (dict) est fourni, il recoit la duree en secondes de chaque
+    phase de PHASES_PDF.
+    """
+    chronos = {} if chronos is None else chronos
+    html_str = _html_pdf(data, name, membre_bu, frais_gestion, template, chronos)
+    return _mettre_en_page_et_ecrire(html_str, chronos)
+
+
+def create_pdf_combine(taches, chronos=None):
+    """
+    Un seul PDF, une page par tache ({"data", "name", "membre_bu",
+    "frais_gestion", "template"} : memes arguments que create_pdf) : plusieurs
+    consultants, ou plusieurs options de TJM pour un consultant. Les pages
+    sont mises en page en une passe : polices et images (logo, graphiques
+    identiques) ne sont embarquees qu'une fois dans le fichier.
+    """
+    chronos = {} if chronos is None else chronos
+    pages = []
+    for tache in taches:
+        html_str = _html_pdf(tache["data"], tache["name"], tache.get("membre_bu", ""),
+                             tache.get("frais_gestion"), tache.get("template"), chronos)
+        pages.append(_CORPS_HTML.search(html_str).group(1))
+    if not pages:
+        raise ValueError("Aucune simulation a mettre dans le PDF combine")
+    html_str = "<!DOCTYPE html>\n<html lang=\"fr\">\n<head>\n<meta charset=\"UTF-8\">\n</head>\n<body>\n"
+    html_str += "\n".join(pages) + "\n</body>\n</html>\n"
+    return _mettre_en_page_et_ecrire(html_str, chronos)
+
+
+def create_pdf_chronometre(data, name, membre_bu="", frais_gestion=None):
+    """create_pdf qui retourne aussi ses durees par phase : (pdf, chronos)."""
+    chronos = {}
+    return create_pdf(data, name, membre_bu, frais_gestion, chronos=chronos), chronos
+
+
+# --- Generation en lot (pool de processus) ---
+def prechauffer():
+    """
+    Initialisation d'un processus de rendu : charge WeasyPrint et matplotlib,
+    compile les templates, cree le RenduPDF (feuille de style, polices) et
+    fait un premier rendu a blanc avec le logo (decode une fois, chargement
+    des polices par Pango/fontconfig) pour que le premier PDF utile ne paie
+    pas ces couts.
+    """
+    for nom in TEMPLATES_PDF:
+        template_pdf(nom)
+    rendu = rendu_processus()
+    logo = chemin_logo()
+    rendu.ecrire(rendu.mettre_en_page(f"<img src='file://{logo}'>" if logo else "<p>.</p>"))
+    plt = pyplot()
+    plt.close(plt.figure())
+
+
+def nom_fichier_pdf(name):
+    """Nom de fichier du PDF d'un consultant (meme convention que l'app)."""
+    morceaux = [m for m in re.split(r"\s+", name.strip()) if m]
+    base = "_".join(reversed(morceaux)) if morceaux else "consultant"
+    return re.sub(r'[\\/:*?"<>|]', "-", base) + "_SimulationPortageSigne+.pdf"
+
+
+def _rendre(rendu, numero, tache):
+    debut = time.perf_counter()
+    pdf = rendu(tache["data"], tache["name"], tache.get("membre_bu", ""), tache.get("frais_gestion"))
+    chronos = {}
+    if isinstance(pdf, tuple):  # rendu chronometre : (pdf, durees par phase)
+        pdf, chronos = pdf
+    return numero, pdf, dict(chronos, total=time.perf_counter() - debut)
+
+
+def generer_pdfs(taches, destination, processus=None, progression=None, rendu=create_pdf_chronometre,
+                 initialisation=prechauffer):
+    """
+    Rend un PDF par tache ({"data", "name", "membre_bu", "frais_gestion",
+    "fichier" optionnel}) sur `processus` processus (os.cpu_count() par
+    defaut, 1 = dans le processus courant). `destination` : dossier (un
+    fichier par consultant) ou chemin .zip (une archive). `progression(fait,
+    total)` est appelee a chaque PDF termine. `rendu` retourne le PDF, ou
+    (pdf, durees par phase). Retourne {"pdf": n, "duree": secondes, "rendu":
+    cumul des durees de rendu, "phases": cumul par phase, "documents":
+    durees de chaque PDF ({"fichier", "total", phases...}, ordre des
+    taches)}.
+    """
+    taches = list(taches)
+    noms = []
+    for tache in taches:
+        nom = tache.get("fichier") or nom_fichier_pdf(tache["name"])
+        racine, ext = os.path.splitext(nom)
+        suffixe = 2
+        while nom in noms:
+            nom = f"{racine}_{suffixe}{ext}"
+            suffixe += 1
+        noms.append(nom)
+
+    archive = None
+    if destination.lower().endswith(".zip"):
+        archive = zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(destination, exist_ok=True)
+
+    documents = [None] * len(taches)
+
+    def ecrire(numero, pdf, chronos):
+        documents[numero] = dict(chronos, fichier=noms[numero])
+        if archive is not None:
+            archive.writestr(noms[numero], pdf)
+        else:
+            with open(os.path.join(destination, noms[numero]), "wb") as f:
+                f.write(pdf)
+
+    debut = time.perf_counter()
+    processus = processus or os.cpu_count() or 1
+    try:
+        if processus == 1:
+            if initialisation is not None:
+                initialisation()
+            resultats = (_rendre(rendu, i, t) for i, t in enumerate(taches))
+            for fait, (numero, pdf, chronos) in enumerate(resultats, start=1):
+                ecrire(numero, pdf, chronos)
+                if progression:
+                    progression(fait, len(taches))
+        else:
+            # spawn : processus neufs (pas de fork d'un serveur multi-thread), prechauffes une fois
+            with ProcessPoolExecutor(max_workers=processus, mp_context=get_context("spawn"),
+                                     initializer=initialisation) as pool:
+                futures = [pool.submit(_rendre, rendu, i, t) for i, t in enumerate(taches)]
+                for fait, future in enumerate(as_completed(futures), start=1):
+                    ecrire(*future.result())
+                    if progression:
+                        progression(fait, len(taches))
+    finally:
+        if archive is not None:
+            archive.close()
+    if processus != 1:  # rendus faits dans les processus du pool : mesures reportees ici
+        for document in documents:
+            for phase in PHASES_PDF:
+                if phase in document:
+                    diagnostics.enregistrer(f"pdf.{phase}", document[phase])
+    phases = {phase: sum(d.get(phase, 0.0) for d in documents) for phase in PHASES_PDF}
+    return {"pdf": len(taches), "duree": time.perf_counter() - debut,
+            "rendu": sum(d["total"] for d in documents), "phases": phases, "documents": documents}
+
+
+def taches_portefeuille(source, membre_bu="", params=None, annee=2026):
+    """Une tache de rendu par ligne valide d'un fichier portefeuille (CSV/XLSX)."""
+    from moteur import calculate_salary
+    from portefeuille import arguments_ligne, lire_lignes
+
+    frais_gestion = (params or PARAMETRES_DEFAUT).frais_gestion
+    for numero, ligne in lire_lignes(source):
+        try:
+            arguments = arguments_ligne(ligne, annee)
+        except ValueError:
+            continue
+        name = str(ligne.get("nom") or f"Consultant ligne {numero}")
+        yield {"data": calculate_salary(**arguments, params=params), "name": name,
+               "membre_bu": membre_bu, "frais_gestion": frais_gestion}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generation des PDF d'un portefeuille de consultants.")
+    parser.add_argument("entree", help="fichier CSV ou XLSX, une ligne par consultant")
+    parser.add_argument("destination", help="dossier de sortie, archive .zip ou PDF combine .pdf")
+    parser.add_argument("--processus", type=int, default=None, help="processus de rendu (defaut : nb de coeurs)")
+    parser.add_argument("--membre-bu", default="", help="signataire des propositions")
+    args = parser.parse_args(argv)
+
+    if args.destination.lower().endswith(".pdf"):
+        debut = time.perf_counter()
+        taches = list(taches_portefeuille(args.entree, args.membre_bu))
+        with open(args.destination, "wb") as f:
+            f.write(create_pdf_combine(taches))
+        print(f"{len(taches)} pages en {time.perf_counter() - debut:.1f} s -> {args.destination}")
+        return 0
+
+    def afficher(fait, total):
+        print(f"\r{fait}/{total} PDF", end="", flush=True)
+
+    stats = generer_pdfs(taches_portefeuille(args.entree, args.membre_bu), args.destination,
+                         processus=args.processus, progression=afficher)
+    print(f"\n{stats['pdf']} PDF en {stats['duree']:.1f} s -> {args.destination}")
+    print("Rendu par phase : " + ", ".join(f"{phase} {duree:.1f} s" for phase, duree in stats["phases"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+Calcul inverse : TJM (ou nombre de jours) necessaire pour atteindre un net
+cible, toutes les autres entrees etant fixees.
+
+Le net est une fonction croissante, quasi affine par morceaux, du TJM et des
+jours : une recherche par secante encadree (regula falsi avec repli par
+bisection) sur la grille du centime trouve la valeur en quelques simulations.
+"""
+import math
+
+from moteur import calculate_salary_memo
+
+# Variable resolue -> (pas de la grille, point de depart par defaut)
+VARIABLES_RESOLUBLES = {
+    "tjm": (0.01, 500.0),
+    "days_worked_month": (0.01, 19.0),
+}
+CHAMPS_CIBLE = ("net_payable", "net_before_tax")
+MAX_EVALUATIONS = 40
+
+
+def resoudre_objectif(cible, variable="tjm", champ="net_payable", calcul=calculate_salary_memo,
+                      max_evaluations=MAX_EVALUATIONS, **arguments):
+    """
+    Plus petite valeur de `variable` (au pas de la grille, le centime) dont
+    le `champ` simule atteint `cible`. `arguments` : autres arguments nommes
+    de calculate_salary (la valeur de `variable`, si donnee, sert de depart).
+    Retourne {"valeur", "resultat", "ecart", "evaluations"} ; ValueError si la
+    cible est inatteignable.
+    """
+    if variable not in VARIABLES_RESOLUBLES:
+        raise ValueError(f"Variable non resoluble : {variable} (parmi {sorted(VARIABLES_RESOLUBLES)})")
+    if champ not in CHAMPS_CIBLE:
+        raise ValueError(f"Champ cible invalide : {champ} (parmi {CHAMPS_CIBLE})")
+    pas, depart = VARIABLES_RESOLUBLES[variable]
+    resultats = {}  # indice de grille -> resultat de la simulation
+
+    def ecart(k):
+        if k not in resultats:
+            if len(resultats) >= max_evaluations:
+                raise ValueError(f"Objectif {champ} = {cible:.2f} non atteint en {max_evaluations} simulations")
+            resultats[k] = calcul(**{**arguments, variable: round(k * pas, 2)})
+        return resultats[k][champ] - cible
+
+    # Encadrement : ecart(bas) < 0 <= ecart(haut)
+    bas = haut = None
+    cote_precedent = None
+    k = max(0, round((arguments.get(variable) or depart) / pas))
+    points = []
+    while True:
+        e = ecart(k)
+        points.append((k, e))
+        if e >= 0:
+            haut, cote = k, "haut"
+        else:
+            bas, cote = k, "bas"
+        if haut == 0 or (bas is not None and haut is not None and haut - bas <= 1):
+            break
+
+        if bas is not None and haut is not None:
+            # Regula falsi ; bisection si la meme borne bouge deux fois de suite
+            if cote == cote_precedent:
+                suivant = (bas + haut) // 2
+            else:
+                e_bas, e_haut = ecart(bas), ecart(haut)
+                suivant = bas + (-e_bas) * (haut - bas) / (e_haut - e_bas)
+                # Arrondi vers l'interieur pour resserrer la borne la plus proche
+                suivant = math.ceil(suivant) if cote == "bas" else math.floor(suivant)
+            suivant = min(max(suivant, bas + 1), haut - 1)
+        else:
+            # Pas encore encadre : secante sur les deux derniers points, sinon
+            # proportionnalite au premier point ; croissance bornee. Un palier
+            # (net plancher, complement nul) vers le bas mene directement a 0.
+            if len(points) >= 2 and points[-1][1] != points[-2][1]:
+                (k1, e1), (k2, e2) = points[-2], points[-1]
+                suivant = k2 - e2 * (k2 - k1) / (e2 - e1)
+            elif len(points) >= 2 and bas is None:
+                suivant = 0
+            else:
+                valeur = resultats[k][champ]
+                suivant = k * cible / valeur if valeur > 0 and k > 0 else 2 * k + 1
+            if haut is None:
+                suivant = min(math.ceil(suivant), 4 * k + 100)
+                suivant = max(suivant, k + 1)
+            else:
+                suivant = max(math.floor(suivant), 0)
+                suivant = min(suivant, k - 1)
+        cote_precedent = cote
+        k = suivant
+
+    resultat = resultats[haut]
+    return {
+        "valeur": round(haut * pas, 2),
+        "resultat": resultat,
+        "ecart": round(resultat[champ] - cible, 2),
+        "evaluations": len(resultats),
+    }
+
+
+def tjm_pour_net(cible, champ="net_payable", **arguments):
+    """TJM minimal (au centime) pour atteindre le net cible."""
+    return resoudre_objectif(cible, "tjm", champ, **arguments)
+
+
+def jours_pour_net(cible, champ="net_payable", **arguments):
+    """Nombre de jours factures minimal (au centieme) pour atteindre le net cible."""
+    return resoudre_objectif(cible, "days_worked_month", champ, **arguments)
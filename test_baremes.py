@@ -0,0 +1,89 @@
+"""Tests du registre versionne des baremes (registre_baremes.py)."""
+import copy
+import datetime
+import json
+import os
+
+import pytest
+
+import moteur
+from moteur import REGISTRE_BAREMES, calculate_salary
+from moteur_batch import calculate_salary_batch
+from registre_baremes import REPERTOIRE_BAREMES, RegistreBaremes, compiler_bareme, date_periode
+
+
+def _donnees_2026():
+    with open(os.path.join(REPERTOIRE_BAREMES, "2026.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_alias_2026_depuis_le_fichier():
+    """Les constantes historiques du moteur viennent du bareme 2026 compile."""
+    b = REGISTRE_BAREMES["2026"]
+    assert moteur.COTISATIONS_2026 is b.cotisations
+    assert moteur.JOURS_OUVRES_2026[5] == 18
+    assert moteur.BAREME_IK_VOITURE_2026[5]["jusqua_5000"] == 0.636
+    defaut = moteur.parametres_pour_bareme(b)
+    assert (b.pmss, b.smic_mensuel) == (defaut.pmss, defaut.smic_mensuel)
+
+
+@pytest.mark.parametrize("periode, nom", [
+    ("2025-12", "2025"), ((2025, 1), "2025"), (2025, "2025"),
+    ("2026-01", "2026"), (datetime.date(2026, 3, 15), "2026"), ("2031", "2026"),
+])
+def test_selection_par_periode(periode, nom):
+    assert REGISTRE_BAREMES.pour_periode(periode).nom == nom
+
+
+def test_periode_sans_bareme():
+    with pytest.raises(ValueError):
+        REGISTRE_BAREMES.pour_periode("2024-12")
+    with pytest.raises(TypeError):
+        date_periode(["2025"])
+
+
+@pytest.mark.parametrize("modification, message", [
+    (lambda d: d["cotisations"]["maladie"].update(pat=7.0), "maladie.pat"),
+    (lambda d: d["cotisations"]["csa"].update(base="BRUT"), "csa"),
+    (lambda d: d.pop("fnal"), "fnal"),
+    (lambda d: d["jours_ouvres"].pop("12"), "jours_ouvres"),
+    (lambda d: d["reduction_generale"].update(formule="lodeom"), "formule"),
+    (lambda d: d.update(valide_du="01/01/2026"), "valide_du"),
+])
+def test_validation(modification, message):
+    """Un fichier incoherent est refuse au chargement, avec la cle fautive."""
+    donnees = copy.deepcopy(_donnees_2026())
+    modification(donnees)
+    with pytest.raises(ValueError, match=message):
+        compiler_bareme(donnees, origine="test.json")
+
+
+def test_dates_en_double():
+    b = compiler_bareme(_donnees_2026())
+    with pytest.raises(ValueError):
+        RegistreBaremes([b, compiler_bareme(_donnees_2026())])
+
+
+def test_simulation_2025():
+    """Periode 2025 : PMSS/SMIC 2025 et reduction generale ex-Fillon (sous 1,6 SMIC)."""
+    r25 = calculate_salary(500, 19, 5.0, 0, 0, 0, True, True, nb_journees=19, periode="2025-03")
+    r26 = calculate_salary(500, 19, 5.0, 0, 0, 0, True, True, nb_journees=19, periode="2026-03")
+    assert (r25["bareme"], r26["bareme"]) == ("2025", "2026")
+    assert r25["tranche_a"] == 3925.0
+    assert r26 == calculate_salary(500, 19, 5.0, 0, 0, 0, True, True, nb_journees=19)
+
+    smic_2025 = REGISTRE_BAREMES["2025"].smic_mensuel
+    bas = calculate_salary(160, 20, 5.0, 0, 0, 0, True, True, periode="2025-03")
+    coefficient = 0.3194 / 0.6 * (1.6 * smic_2025 / bas["gross_salary"] - 1)
+    assert bas["reduction_rgdu"] == pytest.approx(bas["gross_salary"] * round(coefficient, 4))
+
+
+def test_batch_par_periode():
+    """Le moteur vectorise selectionne le meme bareme que le scalaire."""
+    tjm = [160, 300, 500, 900]
+    batch = calculate_salary_batch(tjm, 20, use_reserve=False, periode="2025-06")
+    for i, t in enumerate(tjm):
+        s = calculate_salary(t, 20, 5.0, 0, 0, 0, False, True, periode="2025-06")
+        assert batch["net_payable"][i] == pytest.approx(s["net_payable"], abs=0.005)
+        assert batch["reduction_rgdu"][i] == pytest.approx(s["reduction_rgdu"], abs=0.005)
+    assert set(batch["bareme"]) == {"2025"}
@@ -0,0 +1,32 @@
+"""Tests des benchmarks (bench.py) : mesures produites et detection des regressions."""
+import json
+
+import bench
+
+
+def test_comparaison_a_la_reference():
+    """Durees plus longues, debits plus faibles ou iterations en plus : regressions ; le reste passe."""
+    reference = {"scalaire.cdi.us": 100.0, "batch.simulations_par_s": 1000.0, "iterations.cdi": 3,
+                 "pdf.layout.ms": 50.0}
+    mesures = {"scalaire.cdi.us": 120.0, "batch.simulations_par_s": 700.0, "iterations.cdi": 4,
+               "geocodage.sans_cache.ms": 9.0}
+    regressions = {m: ecart for m, _, _, ecart in bench.comparer(mesures, reference, tolerance=0.25)}
+    assert set(regressions) == {"batch.simulations_par_s", "iterations.cdi"}
+    assert bench.comparer(dict(mesures, **{"scalaire.cdi.us": 130.0}), reference, 0.25)[0][0] == "scalaire.cdi.us"
+    assert bench.comparer({"iterations.cdi": 2, "batch.simulations_par_s": 5000.0}, reference) == []
+
+
+def test_mesures_et_reference(tmp_path, monkeypatch):
+    """Le moteur est mesure sur chaque cas ; le JSON enregistre sert de reference au passage suivant."""
+    mesures = bench.bench_scalaire(appels=2)
+    assert {f"scalaire.{cas}.us" for cas in bench.CAS_SCALAIRES} <= set(mesures)
+    assert all(mesures[f"iterations.{cas}"] >= 1 for cas in bench.CAS_SCALAIRES)
+
+    monkeypatch.setattr(bench, "mesurer", lambda rapide=False: dict(mesures))
+    reference = tmp_path / "reference.json"
+    assert bench.main(["--reference", str(reference), "--enregistrer-reference"]) == 0
+    assert json.loads(reference.read_text())["mesures"] == mesures
+    assert bench.main(["--reference", str(reference)]) == 0
+
+    monkeypatch.setattr(bench, "mesurer", lambda rapide=False: dict(mesures, **{"iterations.cdi_sous_pmss": 99}))
+    assert bench.main(["--reference", str(reference), "--json", str(tmp_path / "resultats.json")]) == 1
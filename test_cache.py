@@ -0,0 +1,91 @@
+"""Tests du cache LRU/TTL (cache.py) et de la memoisation des simulations."""
+import pytest
+
+import moteur
+from cache import CacheLRU
+from moteur import ParametresCalcul, calculate_salary, calculate_salary_memo, cle_simulation
+
+
+class _Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_lru_eviction_et_compteurs():
+    """Au-dela de la taille max, l'entree la moins recemment lue est evincee."""
+    cache = CacheLRU(taille_max=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" devient la plus recente
+    cache.set("c", 3)
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "taille": 2, "taille_max": 2}
+
+
+def test_ttl_expiration():
+    """Une entree plus vieille que le TTL est recalculee."""
+    horloge = _Horloge()
+    cache = CacheLRU(taille_max=8, ttl=10, horloge=horloge)
+    appels = []
+    calcul = lambda: appels.append(1) or len(appels)
+    assert cache.get_ou_calcule("k", calcul) == 1
+    horloge.t = 10
+    assert cache.get_ou_calcule("k", calcul) == 1
+    horloge.t = 10.5
+    assert cache.get_ou_calcule("k", calcul) == 2
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_cle_normalisee():
+    """Positionnels/nommes, int/float et params omis ou None donnent la meme cle."""
+    cle = cle_simulation(500, 19, 5.0, 0, 0, 0, True, True)
+    assert cle == cle_simulation(500.0, 19, 5, 0.0, 0, 0, use_reserve=True, use_mutuelle=True, params=None)
+    assert cle[1] is None  # resolu par calculate_salary selon la periode
+    assert cle != cle_simulation(500, 19, 5.0, 0, 0, 0, True, True,
+                                 params=ParametresCalcul(frais_gestion=8.0))
+    with pytest.raises(TypeError):
+        cle_simulation(500, 19, 5.0, 0, 0, 0, True, True, inconnu=1)
+
+
+def test_memo_identique_et_copie():
+    """Le resultat memoise est celui du calcul, et le modifier ne touche pas le cache."""
+    moteur._simulations.vider()
+    r = calculate_salary_memo(640, 18, 5.0, 0, 0, 0, False, True, type_contrat="CDD")
+    assert r == calculate_salary(640, 18, 5.0, 0, 0, 0, False, True, type_contrat="CDD")
+    r["net_payable"] = 0
+    r2 = calculate_salary_memo(640.0, 18, 5.0, 0, 0, 0, False, True, type_contrat="CDD")
+    assert r2["net_payable"] > 0
+    assert moteur.stats_simulations()["hits"] == 1
+    assert moteur.stats_simulations()["misses"] == 1
+
+
+def test_memo_arguments_d_origine():
+    """Le calcul recoit les arguments d'origine (entiers affiches tels quels) ; le detail n'est pas partage."""
+    moteur._simulations.vider()
+    r = calculate_salary_memo(500, 19, 5.0, 0, 0, 0, True, True, nb_titres_restaurant=12, jours_teletravail=5)
+    assert r["tjm"] == 500 and isinstance(r["nb_titres_restaurant"], int)
+    assert isinstance(r["jours_teletravail"], int)
+    r["cotis_details"][0]["montant_pat"] = -1
+    r["cotis_details"].clear()
+    r2 = calculate_salary_memo(500, 19, 5.0, 0, 0, 0, True, True, nb_titres_restaurant=12, jours_teletravail=5)
+    assert r2["cotis_details"] and r2["cotis_details"][0]["montant_pat"] > 0
+    assert moteur.stats_simulations()["hits"] == 1
+
+
+def test_memo_bareme_de_la_periode():
+    """Memoise ou non, une periode 2025 prend le PMSS 2025 ; des params explicites non modifies aussi."""
+    arguments = (550, 19, 5.0, 0, 0, 0, True, True)
+    direct = calculate_salary(*arguments, periode=2025)
+    assert direct["tranche_a"] == 3925.0
+    for params in (None, ParametresCalcul(), ParametresCalcul(frais_gestion=5.0)):
+        moteur._simulations.vider()
+        memo = calculate_salary_memo(*arguments, params=params, periode=2025)
+        assert memo["tranche_a"] == 3925.0 and memo["net_before_tax"] == direct["net_before_tax"]
+    # Un PMSS saisi explicitement reste prioritaire, meme egal a celui d'une autre annee
+    assert calculate_salary_memo(*arguments, params=ParametresCalcul(pmss=4100.0), periode=2025)["tranche_a"] == 4100.0
+    assert calculate_salary_memo(*arguments, params=ParametresCalcul(pmss=4005.0), periode=2025)["tranche_a"] == 4005.0
+    assert moteur.parametres_periode(ParametresCalcul(smic_mensuel=1823.03), moteur.REGISTRE_BAREMES["2025"]).smic_mensuel == 1823.03
@@ -0,0 +1,52 @@
+"""Tests de la comparaison de scenarios (comparaison.py)."""
+import pytest
+
+import comparaison
+from comparaison import CHAMPS_COMPARAISON, OPTIONS_COMPARAISON, comparer_scenarios
+from moteur import calculate_salary
+
+ARGS = dict(tjm=550.0, days_worked_month=19.0, days_worked_week=5.0, ik_amount=0.0, igd_amount=0.0,
+            other_expenses=0.0, use_reserve=True, use_mutuelle=True, nb_journees=19, periode=(2026, 3))
+
+
+def test_toutes_les_combinaisons_identiques_au_moteur():
+    """Chaque combinaison vaut calculate_salary avec ses options ; la reference en premier."""
+    scenarios = comparer_scenarios(list(OPTIONS_COMPARAISON), **ARGS)
+    assert len(scenarios) == 2 ** len(OPTIONS_COMPARAISON)
+    assert scenarios[0]["options"] == {"reserve": True, "contrat": "CDI", "mutuelle": True,
+                                       "provision_cp": False, "teletravail": 0}
+    assert all(e == 0 for e in scenarios[0]["ecarts"].values())
+    for scenario in scenarios:
+        args = dict(ARGS)
+        for option, valeur in scenario["options"].items():
+            args[OPTIONS_COMPARAISON[option][0]] = valeur
+        attendu = calculate_salary(**args)
+        for champ in CHAMPS_COMPARAISON:
+            assert scenario["resultat"][champ] == attendu[champ]
+            assert scenario["ecarts"][champ] == round(attendu[champ] - scenarios[0]["resultat"][champ], 2)
+
+
+def test_libelles_et_teletravail():
+    """Le teletravail de la reference est compare a sans ; options inconnues refusees."""
+    scenarios = comparer_scenarios(["teletravail", "mutuelle"], **dict(ARGS, jours_teletravail=5))
+    assert [s["libelle"] for s in scenarios] == [
+        "Teletravail : 5 j, Mutuelle : oui", "Teletravail : 5 j, Mutuelle : non",
+        "Teletravail : non, Mutuelle : oui", "Teletravail : non, Mutuelle : non"]
+    assert scenarios[1]["ecarts"]["net_payable"] > 0  # sans mutuelle : pas de part salariale
+    assert comparer_scenarios([], **ARGS)[0]["libelle"] == "Reference"
+    with pytest.raises(ValueError):
+        comparer_scenarios(["velo"], **ARGS)
+
+
+def test_comparaison_memorisee(monkeypatch):
+    """Un appel identique est servi depuis le cache, sans moteur ; le resultat rendu est une copie."""
+    comparaison._scenarios.vider()
+    appels = []
+    moteur_batch = comparaison.calculate_salary_batch
+    monkeypatch.setattr(comparaison, "calculate_salary_batch", lambda **a: appels.append(a) or moteur_batch(**a))
+    premier = comparer_scenarios(["reserve", "mutuelle"], **ARGS)
+    premier[0]["resultat"]["net_payable"] = 0.0
+    second = comparer_scenarios(["reserve", "mutuelle"], **ARGS)
+    assert len(appels) == 1 and second[0]["resultat"]["net_payable"] > 0
+    comparer_scenarios(["reserve", "mutuelle"], **dict(ARGS, tjm=600.0))
+    assert len(appels) == 2
@@ -0,0 +1,44 @@
+"""Tests du corpus de non-regression tire des classeurs Excel (corpus_excel.py)."""
+import copy
+
+import corpus_excel
+
+ECART_INSTANTANE = 6  # centimes
+
+
+def test_corpus_a_jour_des_classeurs():
+    """L'extraction relue depuis les classeurs donne les memes cas de reference que le corpus livre."""
+    livre = corpus_excel.charger_corpus()
+    extrait = corpus_excel.extraire()
+    assert [(c["id"], c["arguments"], c["excel"]) for c in extrait["references"]] == \
+        [(c["id"], c["arguments"], c["excel"]) for c in livre["references"]]
+    silae = extrait["references"][0]
+    assert silae["arguments"]["tjm"] == 500 and silae["params"] == {"frais_gestion": 5.0}
+    assert silae["excel"]["gross_salary"] == 600494 and silae["doublons"] == ["RETOUR SIMUL V4.xlsx|V1|L12"]
+
+
+def test_rejeu_sans_ecart_au_moteur():
+    """Des milliers de cas rejoues : le moteur vectorise donne exactement les centimes du calcul scalaire."""
+    corpus = corpus_excel.charger_corpus()
+    rapport = corpus_excel.rejouer(corpus)
+    scalaire = corpus_excel.rejouer(corpus, scalaire=True)
+    assert rapport["cas"] > 3000 and rapport["moteur"] == scalaire["moteur"]
+    # Instantane pris a l'extraction avec le solveur de Newton, a quelques centimes du point fixe d'origine
+    assert corpus_excel.rejouer(corpus, tolerance=ECART_INSTANTANE)["moteur"] == []
+    # Le bulletin Silae de reference est retrouve a quelques centimes pres (charges patronales : 1,04 EUR)
+    silae = [e for e in rapport["excel"] if e[0].endswith("OBSERVATIONS SIMULATEUR|L12")]
+    assert max(abs(obtenu - attendu) for _, _, attendu, obtenu in silae) <= 104
+
+
+def test_rejeu_scalaire_et_ecart_detecte():
+    """Le solveur scalaire donne les memes centimes ; un centime de difference est signale."""
+    corpus = corpus_excel.charger_corpus()
+    corpus["variantes"] = corpus["variantes"][:1]
+    ecarts = corpus_excel.rejouer(corpus, scalaire=True)["moteur"]
+    assert ecarts == corpus_excel.rejouer(corpus)["moteur"]
+
+    modifie = copy.deepcopy(corpus)
+    modifie["references"][0]["moteur"]["net_before_tax"] += 1
+    modifie["variantes"][0]["moteur"]["cout_global"][7] -= 2
+    nouveaux = [e for e in corpus_excel.rejouer(modifie)["moteur"] if e[:2] not in {e[:2] for e in ecarts}]
+    assert [(e[1], e[3] - e[2]) for e in nouveaux] == [("net_before_tax", -1), ("cout_global", 2)]
@@ -0,0 +1,80 @@
+"""Tests de l'instrumentation optionnelle (diagnostics.py)."""
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import diagnostics
+from moteur import calculate_salary
+from moteur_batch import calculate_salary_batch
+
+ARGUMENTS = dict(tjm=550, days_worked_month=19, days_worked_week=5.0, ik_amount=0, igd_amount=0,
+                 other_expenses=0, use_reserve=True, use_mutuelle=True)
+
+
+@pytest.fixture
+def actif():
+    diagnostics.reinitialiser()
+    diagnostics.activer()
+    yield
+    diagnostics.activer(False)
+    diagnostics.reinitialiser()
+
+
+def test_inactif_ne_mesure_rien():
+    """Desactivee (par defaut), l'instrumentation n'enregistre rien."""
+    diagnostics.reinitialiser()
+    assert not diagnostics.est_actif()
+    calculate_salary(**ARGUMENTS)
+    with diagnostics.chrono("test.bloc"):
+        pass
+    assert diagnostics.resume() == {"durees": {}, "compteurs": {}}
+
+
+def test_phases_du_moteur(actif):
+    """Simulation, convergence, cotisations et iterations sont mesurees, scalaire et vectorise."""
+    resultat = calculate_salary(**ARGUMENTS)
+    calculate_salary_batch(np.array([300.0, 550.0, 900.0]), 19)
+    mesures = diagnostics.resume()
+    for phase in ("moteur.simulation", "moteur.convergence", "moteur.cotisations", "moteur.rgdu",
+                  "batch.simulation", "batch.cotisations"):
+        assert mesures["durees"][phase]["appels"] >= 1
+    assert mesures["durees"]["moteur.simulation"]["appels"] == 1
+    assert mesures["compteurs"]["moteur.iterations"] == {
+        "n": 1, "total": resultat["iterations"], "moyenne": resultat["iterations"], "max": resultat["iterations"]}
+    assert mesures["compteurs"]["batch.lignes"]["total"] == 3
+
+
+def test_resume_json_et_reinitialisation(actif, tmp_path):
+    """Le resume s'ajoute en une ligne JSON au fichier ; reinitialiser efface les mesures."""
+    diagnostics.enregistrer("test.phase", 0.002)
+    diagnostics.enregistrer("test.phase", 0.004)
+    diagnostics.compter("test.compteur", 3)
+    chemin = tmp_path / "mesures.jsonl"
+    diagnostics.ecrire_resume(str(chemin))
+    diagnostics.ecrire_resume(str(chemin))
+    lignes = chemin.read_text(encoding="utf-8").splitlines()
+    assert len(lignes) == 2
+    ligne = json.loads(lignes[0])
+    assert ligne["evenement"] == "diagnostics" and ligne["pid"] == os.getpid()
+    assert ligne["durees"]["test.phase"] == pytest.approx(
+        {"appels": 2, "total_ms": 6.0, "moyenne_ms": 3.0, "max_ms": 4.0})
+    assert ligne["compteurs"]["test.compteur"] == {"n": 1, "total": 3, "moyenne": 3.0, "max": 3}
+    diagnostics.reinitialiser()
+    assert diagnostics.resume() == {"durees": {}, "compteurs": {}}
+
+
+def test_variable_environnement(tmp_path):
+    """SIMULATEUR_DIAGNOSTICS=<fichier> : une execution sans interface y ecrit son resume en sortant."""
+    chemin = tmp_path / "diagnostics.jsonl"
+    environnement = dict(os.environ, SIMULATEUR_DIAGNOSTICS=str(chemin))
+    code = ("from moteur import calculate_salary\n"
+            f"calculate_salary(**{ARGUMENTS!r})\n")
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                   env=environnement, check=True)
+    ligne = json.loads(chemin.read_text(encoding="utf-8"))
+    assert ligne["durees"]["moteur.simulation"]["appels"] == 1
+    assert ligne["compteurs"]["moteur.iterations"]["n"] == 1
@@ -0,0 +1,223 @@
+"""Tests du geocodage et des trajets (geolocalisation.py), hors ligne contre un serveur local."""
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from geolocalisation import CacheGeo, ServiceGeo, distances_portefeuille, haversine_km
+
+
+class ServeurFactice(BaseHTTPRequestHandler):
+    """
+    Imite api-adresse (/search/ : "lat lon" lus dans la saisie, sinon Paris)
+    et OSRM (/route/ et /table/ : vol d'oiseau en metres, 1 min par km) ;
+    garde les chemins recus.
+    """
+
+    recus = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.recus.append(self.path)
+        if url.path == "/search/":
+            q = parse_qs(url.query)["q"][0]
+            nombres = [float(n) for n in re.findall(r"-?\d+\.\d+", q)]
+            lat, lon = nombres[:2] if len(nombres) >= 2 else (48.85, 2.35)
+            features = [] if "introuvable" in q else [
+                {"properties": {"label": q.title(), "score": 0.9}, "geometry": {"coordinates": [lon, lat]}}]
+            corps = {"features": features}
+        elif url.path.startswith("/table/v1/driving/"):
+            points = [tuple(map(float, c.split(","))) for c in url.path.rsplit("/", 1)[1].split(";")]
+            params = parse_qs(url.query)
+            sources = [points[int(i)] for i in params["sources"][0].split(";")]
+            destinations = [points[int(i)] for i in params["destinations"][0].split(";")]
+            distances = [[haversine_km(s[1], s[0], d[1], d[0]) * 1000 for d in destinations] for s in sources]
+            corps = {"code": "Ok", "distances": distances,
+                     "durations": [[m * 60 / 1000 for m in ligne] for ligne in distances]}
+        elif url.path.startswith("/route/v1/driving/"):
+            corps = {"routes": [{"distance": 12345.0, "duration": 1500.0}]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        donnees = json.dumps(corps).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(donnees)))
+        self.end_headers()
+        self.wfile.write(donnees)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serveur():
+    ServeurFactice.recus = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ServeurFactice)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def _service(serveur, tmp_path, delai_debounce=0.2):
+    return ServiceGeo(url_geocodage=f"{serveur}/search/", url_routage=serveur,
+                      chemin_cache=str(tmp_path / "geo.sqlite"), delai_debounce=delai_debounce)
+
+
+def test_geocodage_et_trajet_en_cache_persistant(serveur, tmp_path):
+    """Une adresse ou un trajet deja demande est servi par SQLite, meme apres redemarrage."""
+    service = _service(serveur, tmp_path)
+    suggestions = service.geocoder("10 rue de la Paix Paris")
+    assert suggestions == [{"label": "10 Rue De La Paix Paris", "lon": 2.35, "lat": 48.85, "score": 0.9}]
+    assert service.geocoder("10  RUE de la paix paris ") == suggestions
+    assert service.geocoder("adresse introuvable") is None and service.geocoder("Pa") is None
+    assert service.trajet(48.85, 2.35, 48.9, 2.4) == {"distance_km": 12.3, "duree_min": 25.0}
+    assert service.requetes == 3
+    service.fermer()
+
+    relance = _service(serveur, tmp_path)
+    assert relance.geocoder("10 rue de la paix paris") == suggestions
+    assert relance.trajet(48.85, 2.35, 48.9, 2.4)["distance_km"] == 12.3
+    assert relance.requetes == 0 and len(ServeurFactice.recus) == 3
+    relance.fermer()
+
+
+def test_autocompletion_debouncee(serveur, tmp_path):
+    """Une saisie remplacee avant la fin du delai est abandonnee sans requete."""
+    service = _service(serveur, tmp_path)
+    with ThreadPoolExecutor(2) as pool:
+        premiere = pool.submit(service.geocoder, "10 rue de la", champ="domicile")
+        time.sleep(0.05)
+        seconde = pool.submit(service.geocoder, "10 rue de la Paix", champ="domicile")
+        assert premiere.result() is None
+        assert seconde.result()[0]["label"] == "10 Rue De La Paix"
+    assert len(ServeurFactice.recus) == 1
+    service.fermer()
+
+
+def test_autocompletion_par_session_sans_attente(serveur, tmp_path):
+    """Debounce par (session, champ) : deux sessions ne s'annulent pas, et l'appelant n'attend pas le geocodeur."""
+    service = _service(serveur, tmp_path)
+    debut = time.perf_counter()
+    assert service.suggerer("10 rue de la", "domicile", session="a") == (None, True)
+    assert service.suggerer("12 avenue Foch", "domicile", session="b") == (None, True)
+    assert service.suggerer("10 rue de la Paix", "domicile", session="a") == (None, True)
+    assert time.perf_counter() - debut < service.delai_debounce
+    reponses = {}
+    for _ in range(50):
+        reponses = {session: service.suggerer(saisie, "domicile", session=session)
+                    for session, saisie in (("a", "10 rue de la Paix"), ("b", "12 avenue Foch"))}
+        if not any(en_cours for _, en_cours in reponses.values()):
+            break
+        time.sleep(0.05)
+    assert reponses["a"][0][0]["label"] == "10 Rue De La Paix"
+    assert reponses["b"][0][0]["label"] == "12 Avenue Foch"
+    assert sorted(r for r in ServeurFactice.recus if r.startswith("/search/")) == [
+        "/search/?q=10+rue+de+la+Paix&limit=5", "/search/?q=12+avenue+Foch&limit=5"]
+    # Meme champ, autre session, en mode bloquant : pas d'annulation croisee non plus
+    with ThreadPoolExecutor(2) as pool:
+        a = pool.submit(service.geocoder, "3 place Bellecour", champ="domicile", session="a")
+        b = pool.submit(service.geocoder, "4 quai Voltaire", champ="domicile", session="b")
+        assert a.result() is not None and b.result() is not None
+    assert service.suggerer("Pa", "domicile", session="a") == (None, False)
+    service.fermer()
+
+
+def test_geocodage_en_parallele_et_service_indisponible(serveur, tmp_path):
+    """Plusieurs adresses en une fois (doublons fusionnes) ; echec reseau : None, rien en cache."""
+    service = _service(serveur, tmp_path)
+    resultats = service.geocoder_plusieurs(["1 avenue A", "2 avenue B", "1 avenue A"])
+    assert list(resultats) == ["1 avenue A", "2 avenue B"] and service.requetes == 2
+    service.fermer()
+
+    hors_ligne = ServiceGeo(url_geocodage="http://127.0.0.1:9/search/", url_routage="http://127.0.0.1:9",
+                            chemin_cache=str(tmp_path / "vide.sqlite"))
+    assert hors_ligne.geocoder("3 avenue C") is None and hors_ligne.trajet(1, 2, 3, 4) is None
+    assert CacheGeo(str(tmp_path / "vide.sqlite")).compter("adresses") == 0
+    hors_ligne.fermer()
+
+
+def test_distances_en_lot(serveur, tmp_path):
+    """Adresses geocodees une fois, une matrice OSRM pour tous les couples, puis le cache."""
+    service = _service(serveur, tmp_path)
+    lyon, paris, lille = "Lyon 45.76 4.84", "Paris 48.86 2.35", "Lille 50.63 3.06"
+    paires = [(lyon, paris), (lille, paris), (lyon, paris), (lyon, "adresse introuvable"), (lille, lyon)]
+    distances = service.distances(paires)
+    assert [d["source"] for d in distances] == ["osrm", "osrm", "osrm", "", "osrm"]
+    assert distances[0]["distance_km"] == round(haversine_km(45.76, 4.84, 48.86, 2.35), 1)
+    assert "introuvable" in distances[3]["erreur"] and distances[3]["distance_km"] is None
+    tables = [r for r in ServeurFactice.recus if r.startswith("/table/")]
+    assert len(tables) == 1 and service.requetes == 5  # 4 adresses + 1 matrice
+
+    encore = service.distances(paires[:2])
+    assert [d["source"] for d in encore] == ["cache", "cache"] and service.requetes == 5
+    service.fermer()
+
+
+def test_cache_sqlite_hors_de_la_boucle(serveur, tmp_path, monkeypatch):
+    """Les acces SQLite ne bloquent pas la boucle partagee ; un lot de trajets est lu en une requete."""
+    acces = []
+
+    def espion(nom, methode):
+        def appel(self, *args):
+            acces.append((nom, threading.current_thread().name))
+            return methode(self, *args)
+        return appel
+
+    for nom in ("lire", "lire_plusieurs", "ecrire", "ecrire_plusieurs"):
+        monkeypatch.setattr(CacheGeo, nom, espion(nom, getattr(CacheGeo, nom)))
+    service = _service(serveur, tmp_path)
+    paires = [("Lyon 45.76 4.84", "Paris 48.86 2.35"), ("Lille 50.63 3.06", "Paris 48.86 2.35")]
+    service.distances(paires)
+    assert [d["source"] for d in service.distances(paires)] == ["cache", "cache"]
+    assert service.trajet(48.85, 2.35, 48.9, 2.4)["distance_km"] == 12.3
+    assert acces and all(thread != "service-geo" for _, thread in acces)
+    noms = [n for n, _ in acces]
+    # un lot lu par appel de distances, une ecriture groupee des trajets OSRM (ecrire y delegue aussi)
+    assert noms.count("lire_plusieurs") == 2 and noms.count("ecrire_plusieurs") - noms.count("ecrire") == 1
+    service.fermer()
+
+
+def test_lecture_groupee_et_expiration(tmp_path):
+    """lire_plusieurs rend les cles presentes et non expirees, au-dela d'un lot de parametres."""
+    instant = [1000.0]
+    cache = CacheGeo(str(tmp_path / "geo.sqlite"), duree=60, horloge=lambda: instant[0])
+    cache.ecrire_plusieurs("trajets", {f"k{i}": {"distance_km": i} for i in range(1200)})
+    instant[0] += 30
+    cache.ecrire("trajets", "recent", {"distance_km": -1})
+    instant[0] += 40
+    lus = cache.lire_plusieurs("trajets", [f"k{i}" for i in range(1200)] + ["recent", "absent"])
+    assert lus == {"recent": {"distance_km": -1}}
+    instant[0] -= 40
+    assert len(cache.lire_plusieurs("trajets", [f"k{i}" for i in range(1200)])) == 1200
+
+
+def test_distances_sans_routage(serveur, tmp_path):
+    """Routage indisponible : estimation a vol d'oiseau, non mise en cache."""
+    service = ServiceGeo(url_geocodage=f"{serveur}/search/", url_routage="http://127.0.0.1:9",
+                         chemin_cache=str(tmp_path / "geo.sqlite"))
+    (trajet,) = service.distances([("Lyon 45.76 4.84", "Paris 48.86 2.35")])
+    assert trajet["source"] == "haversine"
+    assert trajet["distance_km"] == pytest.approx(haversine_km(45.76, 4.84, 48.86, 2.35) * 1.3, abs=0.1)
+    assert service.cache.compter("trajets") == 0
+    service.fermer()
+
+
+def test_distances_portefeuille(serveur, tmp_path):
+    """Fichier portefeuille : km aller-retour et km du mois par consultant."""
+    entree = tmp_path / "consultants.csv"
+    entree.write_text("Nom;Adresse domicile;Adresse mission;Jours\n"
+                      "Alice;Lyon 45.76 4.84;Paris 48.86 2.35;18\n"
+                      "Bruno;;Paris 48.86 2.35;10\n", encoding="utf-8")
+    service = _service(serveur, tmp_path)
+    alice, bruno = distances_portefeuille(str(entree), service)
+    assert alice["nom"] == "Alice" and alice["km_aller_retour"] == round(alice["distance_km"] * 2, 1)
+    assert alice["km_mois"] == round(alice["km_aller_retour"] * 18, 1)
+    assert bruno["km_mois"] is None and bruno["erreur"]
+    service.fermer()
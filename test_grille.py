@@ -0,0 +1,58 @@
+"""Tests de la grille de sensibilite TJM x jours (grille.py)."""
+import pytest
+
+import grille
+from grille import CHAMPS_GRILLE, axe, calculer_grille, grille_en_table
+from moteur import calculate_salary
+
+ARGS = dict(days_worked_week=5.0, ik_amount=0, igd_amount=0, other_expenses=0,
+            use_reserve=True, use_mutuelle=True)
+
+
+@pytest.mark.parametrize("type_contrat", ["CDI", "CDD"])
+def test_grille_identique_au_calcul_scalaire(type_contrat):
+    """Chaque cellule vaut calculate_salary(tjm, jours, nb_journees=jours)."""
+    args = dict(ARGS, type_contrat=type_contrat, use_reserve=type_contrat == "CDI")
+    g = calculer_grille(axe(300, 1200, 150), axe(1, 22, 3), **args)
+    assert g["net_payable"].shape == (7, 8)
+    for i, tjm in enumerate(g["tjm"]):
+        for j, jours in enumerate(g["jours"]):
+            r = calculate_salary(float(tjm), float(jours), nb_journees=int(jours), **args)
+            for champ in CHAMPS_GRILLE:
+                assert g[champ][i, j] == r[champ]
+
+
+def test_lignes_reprises_du_cache():
+    """Decaler la plage de TJM ne simule que les nouvelles lignes."""
+    grille._lignes.vider()
+    jours = axe(1, 22, 1)
+    g = calculer_grille(axe(300, 1200, 10), jours, **ARGS)
+    assert g["lignes_calculees"] == 91
+    g2 = calculer_grille(axe(400, 1300, 10), jours, **ARGS)
+    assert g2["lignes_calculees"] == 10
+    assert (g2["net_payable"][:81] == g["net_payable"][10:]).all()
+    assert calculer_grille(axe(400, 1300, 10), jours, **dict(ARGS, ik_amount=50))["lignes_calculees"] == 91
+
+
+def test_jours_au_dela_des_jours_ouvres():
+    """Plus de jours factures que de jours ouvres : CA sur tous les jours, salaire de base d'un mois complet."""
+    g = calculer_grille([500], [21, 23], **dict(ARGS, nb_jours_ouvres=21))
+    for j, jours in enumerate((21, 23)):
+        r = calculate_salary(500.0, float(jours), nb_journees=21, nb_jours_ouvres=21, **ARGS)
+        for champ in CHAMPS_GRILLE:
+            assert g[champ][0, j] == r[champ]
+    defaut = calculer_grille([500], [23], **ARGS)
+    assert defaut["net_payable"][0, 0] == calculate_salary(500.0, 23.0, nb_journees=22, **ARGS)["net_payable"]
+
+
+def test_table_et_validation():
+    """Table a plat (une ligne par cellule) ; axes invalides ou imposes : ValueError."""
+    g = calculer_grille([500, 600], [10, 20], **ARGS)
+    table = grille_en_table(g)
+    assert list(table["tjm"]) == [500, 500, 600, 600]
+    assert list(table["jours"]) == [10, 20, 10, 20]
+    assert table["net_payable"][3] == g["net_payable"][1, 1]
+    with pytest.raises(ValueError):
+        axe(10, 5, 1)
+    with pytest.raises(ValueError):
+        calculer_grille([500], [10], tjm=500, **ARGS)
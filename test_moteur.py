@@ -0,0 +1,137 @@
+"""Tests du moteur de calcul (moteur.py) - sans Streamlit."""
+import dataclasses
+import itertools
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from comparaison import comparer_scenarios
+from moteur import PARAMETRES_DEFAUT, ParametresCalcul, calculate_salary, calculer_cotisations
+from moteur_batch import calculate_salary_batch
+
+
+def _cdi_500x19(**kwargs):
+    return calculate_salary(500, 19, 5.0, 0, 0, 0, True, True,
+                            nb_journees=19, nb_jours_ouvres=22, **kwargs)
+
+
+def test_import_sans_ui():
+    """Le moteur s'importe sans charger streamlit ni les bibliotheques de rendu."""
+    code = ("import sys, moteur; "
+            "print(','.join(m for m in ('streamlit', 'plotly', 'matplotlib', 'weasyprint', 'pandas') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_cdi_reserve_provisionnee():
+    """CDI 500 x 19j, reserve provisionnee, mutuelle : valeurs de reference."""
+    r = _cdi_500x19()
+    assert r["gross_salary"] == pytest.approx(6040.50, abs=0.01)
+    assert r["employer_charges"] == pytest.approx(2661.27, abs=0.01)
+    assert r["employee_charges"] == pytest.approx(1299.98, abs=0.01)
+    assert r["net_payable"] == pytest.approx(4740.52, abs=0.01)
+    assert r["provision_reserve_financiere"] == pytest.approx(323.23, abs=0.01)
+
+
+def test_cdd_precarite_reintegree():
+    """CDD 400 x 15j, indemnite de precarite dans le brut."""
+    r = calculate_salary(400, 15, 5.0, 0, 0, 0, False, True, type_contrat="CDD",
+                         nb_journees=15, nb_jours_ouvres=22)
+    assert r["label_reserve"] == "Indemnite de precarite"
+    assert r["reserve_brute"] == pytest.approx(304.24, abs=0.01)
+    assert r["gross_salary"] == pytest.approx(3681.33, abs=0.01)
+    assert r["net_payable"] == pytest.approx(2869.47, abs=0.01)
+    assert r["provision_reserve_financiere"] == 0
+
+
+def test_parametres_explicites():
+    """Les parametres passes explicitement remplacent les valeurs par defaut."""
+    assert _cdi_500x19()["management_fees"] == pytest.approx(475.0)
+    r = _cdi_500x19(params=ParametresCalcul(frais_gestion=8.0))
+    assert r["management_fees"] == pytest.approx(760.0)
+    assert r["net_payable"] < _cdi_500x19()["net_payable"]
+
+
+def test_parametres_immuables():
+    """ParametresCalcul est immuable et se convertit depuis/vers les cles cfg_*."""
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        PARAMETRES_DEFAUT.pmss = 5000.0
+    session = PARAMETRES_DEFAUT.en_session()
+    assert session["cfg_pmss"] is None
+    assert ParametresCalcul.depuis_session(session) == PARAMETRES_DEFAUT
+    session["cfg_pmss"] = 4005
+    assert ParametresCalcul.depuis_session(session).pmss == 4005.0
+
+
+@pytest.mark.parametrize("brut", [1500.0, 4005.0, 6040.5, 13364.52])
+def test_cotisations_detail_a_la_demande(brut):
+    """Le detail n'est construit que sur demande ; les totaux cumulent les lignes arrondies."""
+    assert calculer_cotisations(brut, 4005.0, 0.0064, 0.001, 80.0)["details"] is None
+    c = calculer_cotisations(brut, 4005.0, 0.0064, 0.001, 80.0, details=True)
+    assert c["total_pat"] == pytest.approx(sum(d["montant_pat"] for d in c["details"]), abs=1e-9)
+    assert c["total_sal"] == pytest.approx(sum(d["montant_sal"] for d in c["details"]), abs=1e-9)
+    assert ("retraite_t2" in [d["nom"] for d in c["details"]]) == (brut > 4005.0)
+
+
+def test_batch_identique_au_scalaire():
+    """calculate_salary_batch reproduit calculate_salary au centime sur une grille de cas."""
+    cas = list(itertools.product([0, 300, 500, 710, 1200], [5, 15, 19, 22], ["CDI", "CDD"],
+                                 [True, False], [False, True], [0, 12]))
+    tjm, jours, contrat, reserve, prov_cp, tr = (list(c) for c in zip(*cas))
+    batch = calculate_salary_batch(tjm, jours, other_expenses=50.0, use_reserve=reserve,
+                                   nb_titres_restaurant=tr, type_contrat=contrat,
+                                   provision_cp=prov_cp, nb_journees=jours)
+    for i, (t, j, c, r, p, n) in enumerate(cas):
+        s = calculate_salary(t, j, 5.0, 0, 0, 50.0, r, True, nb_titres_restaurant=n,
+                             type_contrat=c, provision_cp=p, nb_journees=j)
+        for cle in ("gross_salary", "employer_charges", "net_payable", "cout_global",
+                    "provision_reserve_financiere", "provision_cp_amount"):
+            assert batch[cle][i] == pytest.approx(s[cle], abs=0.005), (cle, cas[i])
+        assert batch["iterations"][i] == s["iterations"], cas[i]
+
+
+@pytest.mark.parametrize("reserve", [True, False])
+@pytest.mark.parametrize("contrat", ["CDI", "CDD"])
+def test_resolution_pool_en_peu_d_iterations(contrat, reserve):
+    """Le solveur equilibre pool + charges = budget au centime en quelques evaluations."""
+    for tjm in (100, 150, 200, 300, 500, 710, 1000, 1500):
+        r = calculate_salary(tjm, 20, 5.0, 0, 0, 0, reserve, True, type_contrat=contrat,
+                             nb_journees=20, nb_jours_ouvres=22)
+        assert 1 <= r["iterations"] <= 6, (tjm, r["iterations"])
+        assert r["complement_remuneration"] > 0 or tjm <= 200
+
+
+@pytest.mark.parametrize("contrat, tjm, jours, reserve, attendu", [
+    ("CDI", 150, 19, True, (2368.07, 597.06, 1834.06, 0, 2965.13)),
+    ("CDI", 710, 12, True, (5472.06, 2417.71, 4289.28, 204.23, 7889.77)),
+    ("CDI", 1200, 19, False, (15112.09, 6547.93, 11942.00, 0, 21660.02)),
+    ("CDD", 710, 12, True, (4769.13, 2050.27, 3731.25, 1274.60, 6819.40)),
+    ("CDD", 710, 19, False, (8331.79, 3726.28, 6559.45, 0, 12058.07)),
+])
+def test_resolution_pool_parite_historique(contrat, tjm, jours, reserve, attendu):
+    """Memes centimes que le point fixe d'origine (scalaire et batch), y compris sur les sauts d'arrondi."""
+    cles = ("gross_salary", "employer_charges", "net_payable", "provision_reserve_financiere", "cout_global")
+    r = calculate_salary(tjm, jours, 5.0, 0, 0, 0, reserve, True, type_contrat=contrat, provision_cp=True,
+                         nb_journees=jours, nb_jours_ouvres=22)
+    batch = calculate_salary_batch(tjm, jours, 5.0, 0, 0, 0, reserve, True, type_contrat=contrat,
+                                   provision_cp=True, nb_journees=jours, nb_jours_ouvres=22)
+    assert tuple(round(r[cle], 2) for cle in cles) == attendu
+    assert tuple(round(float(batch[cle][0]), 2) for cle in cles) == attendu
+
+
+def test_batch_sans_budget_flottant():
+    """Aucune ligne avec un budget positif (TJM nul) : ni le batch ni la comparaison n'echouent."""
+    batch = calculate_salary_batch(np.array([0.0]), 19)
+    assert list(batch["pool_silae"]) == [0.0]
+    assert batch["net_payable"][0] == pytest.approx(_sans_budget()["net_payable"], abs=0.01)
+    scenarios = comparer_scenarios(["mutuelle"], tjm=0, days_worked_month=19, days_worked_week=5.0, ik_amount=0,
+                                   igd_amount=0, other_expenses=0, use_reserve=True, use_mutuelle=True)
+    assert len(scenarios) == 2 and scenarios[0]["resultat"]["net_payable"] == pytest.approx(
+        _sans_budget()["net_payable"], abs=0.01)
+
+
+def _sans_budget():
+    return calculate_salary(0, 19, 5.0, 0, 0, 0, True, True)
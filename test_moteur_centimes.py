@@ -0,0 +1,77 @@
+"""Tests de l'arithmetique en centimes entiers (moteur_centimes.py)."""
+import numpy as np
+import pytest
+
+import corpus_excel
+from moteur import calculate_salary
+from moteur_batch import calculate_salary_batch
+from moteur_centimes import diviser, produit, taux_exact
+
+ARGUMENTS = dict(days_worked_month=19, days_worked_week=5.0, ik_amount=0, igd_amount=0,
+                 other_expenses=0, use_reserve=True, use_mutuelle=True)
+MONTANTS = ("gross_salary", "employer_charges", "employee_charges", "net_before_tax", "cout_global")
+
+
+def test_arrondi_demi_au_dessus():
+    """Arrondi de paie : demi-centime au-dessus (en valeur absolue), taux decimaux exacts."""
+    assert [diviser(n, 2) for n in (1, 3, -1, -3, 4)] == [1, 2, -1, -2, 2]
+    assert taux_exact(0.0215) == (43, 2000)
+    assert produit(200, taux_exact(0.0215)) == 4  # 4,3 centimes ; 200 x 0.0215 en float donne 4.3000000000000003
+    assert produit(100, (5, 1000)) == 1  # 0,5 centime -> 1 (round() en float donnerait 0)
+
+
+@pytest.mark.parametrize("cas", [dict(tjm=200), dict(tjm=450), dict(tjm=900), dict(tjm=550, use_reserve=False),
+                                 dict(tjm=550, provision_cp=True),
+                                 dict(tjm=450, type_contrat="CDD", use_reserve=False)])
+def test_centimes_proche_du_flottant(cas):
+    """Montants au centime entier, a quelques centimes du calcul en flottant ; totaux = somme des lignes."""
+    flottant = calculate_salary(**dict(ARGUMENTS, **cas))
+    exact = calculate_salary(**dict(ARGUMENTS, **cas), arithmetique="centimes")
+    for cle in MONTANTS:
+        assert exact[cle] == pytest.approx(flottant[cle], abs=0.03), cle
+        assert round(exact[cle] * 100) == pytest.approx(exact[cle] * 100, abs=1e-6), cle
+    lignes = exact["cotis_details"]
+    assert round(sum(l["montant_pat"] for l in lignes) * 100) == round(exact["cotis_total_pat"] * 100)
+    assert round(sum(l["montant_sal"] for l in lignes) * 100) == round(exact["cotis_total_sal"] * 100)
+
+
+def test_arithmetique_inconnue():
+    with pytest.raises(ValueError, match="Arithmetique inconnue"):
+        calculate_salary(tjm=500, **ARGUMENTS, arithmetique="decimal")
+    with pytest.raises(ValueError, match="Arithmetique inconnue"):
+        calculate_salary_batch([500.0], 19, arithmetique="decimal")
+
+
+def test_batch_centimes_identique_au_scalaire():
+    """Le moteur vectorise en centimes donne exactement les centimes du calcul scalaire sur tout le corpus."""
+    corpus = corpus_excel.charger_corpus()
+    vectorise = corpus_excel.rejouer(corpus, arithmetique="centimes")
+    scalaire = corpus_excel.rejouer(corpus, scalaire=True, arithmetique="centimes")
+    assert vectorise["moteur"] == scalaire["moteur"] and vectorise["excel"] == scalaire["excel"]
+    # Ecarts au moteur flottant enregistre : quelques centimes au plus
+    assert max(abs(obtenu - attendu) for _, _, attendu, obtenu in vectorise["moteur"]) <= 10
+
+
+def test_batch_sans_budget():
+    """Aucune ligne avec un budget positif : pas d'erreur, le minimum conventionnel reste verse."""
+    flottant, exact = (calculate_salary_batch(np.array([0.0, 0.0]), 19, arithmetique=arithmetique)
+                       for arithmetique in ("flottant", "centimes"))
+    assert list(exact["pool_silae"]) == [0.0, 0.0]
+    assert exact["gross_salary"] == pytest.approx(flottant["gross_salary"], abs=0.01)
+
+
+def test_batch_centimes_saisies_non_decimales():
+    """Jours et pourcentages sans ecriture decimale finie (55/3...) : memes centimes que le scalaire, sans debordement."""
+    colonnes = dict(tjm=[550.0, 550.0, 1000 / 3, 550.0], days_worked_month=[55 / 3, 20 / 3, 19.0, 19.0],
+                    days_worked_week=[13 / 3, 5.0, 5.0, 5.0], frais_intermediation_pct=[10 / 3, 0.0, 2.0, 0.0],
+                    frais_partages_pct=[0.0, 0.0, 0.0, 7 / 3], nb_titres_restaurant=[0.0, 31 / 3, 0.0, 0.0],
+                    nb_journees=[0.0, 7 / 3, 0.0, 0.0], nb_jours_ouvres=[22.0, 61 / 3, 22.0, 22.0],
+                    type_contrat=["CDI", "CDD", "CDD", "CDI"], use_reserve=[True, False, True, False])
+    batch = calculate_salary_batch(**{nom: np.array(v) for nom, v in colonnes.items()}, provision_cp=True,
+                                   arithmetique="centimes")
+    assert list(batch["turnover"][:2]) == [10083.33, 3666.67]
+    for i in range(4):
+        ligne = {nom: v[i] for nom, v in colonnes.items()}
+        scalaire = calculate_salary(**dict(ARGUMENTS, **ligne), provision_cp=True, arithmetique="centimes")
+        for cle in MONTANTS + ("turnover", "base_salary", "reserve_brute", "provision_cp_amount", "net_payable"):
+            assert batch[cle][i] == scalaire[cle], (i, cle)
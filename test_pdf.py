@@ -4,34 +4,7 @@ import os, sys
 # S'assurer qu'on est dans le bon dossier
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from fpdf import FPDF
-import tempfile
-
-# Charger les fonctions PDF depuis app.py
-code = open('app.py').read()
-
-# Extraire les constantes et fonctions PDF
-idx_logo = code.index('# --- Chemin logo ---')
-idx_ui = code.index('# --- UI Streamlit ---')
-pdf_code = code[idx_logo:idx_ui]
-
-# Mock streamlit
-class _SS:
-    cfg_frais_gestion = 5.0
-    cfg_taux_reserve = 10.0
-class _St:
-    session_state = _SS()
-st = _St()
-
-# Exécuter le code PDF
-g = dict(globals())
-g['st'] = st
-exec(pdf_code, g)
-
-create_pdf = g['create_pdf']
+from rendu_pdf import create_pdf
 
 # ============================================================
 # CAS DE TEST
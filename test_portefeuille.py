@@ -0,0 +1,95 @@
+"""Tests de la simulation de portefeuille CSV/XLSX (portefeuille.py)."""
+import csv
+import io
+
+import pytest
+
+from moteur import BAREME_2026, ParametresCalcul, calculate_salary
+from portefeuille import COLONNES_SORTIE, arguments_ligne, lire_lignes, simuler_portefeuille
+
+CSV_CONSULTANTS = (
+    "Nom;TJM;Jours;Contrat;Mois;IK km;Titres restaurant;Reserve reintegree\n"
+    "Alice;550,5;19;CDI;3;400;12;non\n"
+    "Bruno;720;15;cdd;6;;0;oui\n"
+    "\n"
+    "Erreur;abc;10;CDI;1;;;\n"
+)
+
+
+def _entree(contenu=CSV_CONSULTANTS, nom="consultants.csv"):
+    flux = io.BytesIO(contenu.encode("utf-8"))
+    flux.name = nom
+    return flux
+
+
+def _lire_csv(octets):
+    return list(csv.DictReader(io.StringIO(octets.decode("utf-8-sig")), delimiter=";"))
+
+
+def test_arguments_ligne():
+    """Une ligne donne les arguments du moteur (IK au bareme, jours ouvres du mois)."""
+    lignes = dict(lire_lignes(_entree()))
+    args = arguments_ligne(lignes[2])
+    assert args["tjm"] == 550.5 and args["days_worked_month"] == 19 and args["nb_journees"] == 19
+    assert args["ik_amount"] == pytest.approx(400 * BAREME_2026.ik_voiture[5]["jusqua_5000"])
+    assert args["nb_jours_ouvres"] == BAREME_2026.jours_ouvres[3] and args["periode"] == (2026, 3)
+    assert args["use_reserve"] is True
+    assert arguments_ligne(lignes[3])["type_contrat"] == "CDD"
+    with pytest.raises(ValueError):
+        arguments_ligne(lignes[5])
+
+
+def test_portefeuille_csv_identique_au_moteur():
+    """Chaque ligne valide vaut calculate_salary ; les lignes invalides sont reportees."""
+    sortie = io.BytesIO()
+    compteurs = simuler_portefeuille(_entree(), sortie, format_sortie="csv")
+    assert compteurs == {"lignes": 3, "erreurs": 1}
+    lignes = _lire_csv(sortie.getvalue())
+    assert list(lignes[0]) == list(COLONNES_SORTIE)
+    attendu = calculate_salary(**arguments_ligne(dict(lire_lignes(_entree()))[2]))
+    assert float(lignes[0]["net_payable"].replace(",", ".")) == round(attendu["net_payable"], 2)
+    assert lignes[1]["contrat"] == "CDD" and lignes[1]["erreur"] == ""
+    assert lignes[2]["ligne"] == "5" and "tjm" in lignes[2]["erreur"]
+
+
+def test_portefeuille_parametres_de_session_et_annee():
+    """Parametres de session (PMSS/SMIC non modifies) et annee 2025 : bareme 2025, comme le moteur."""
+    sortie = io.BytesIO()
+    simuler_portefeuille(_entree(), sortie, format_sortie="csv", params=ParametresCalcul(), annee=2025)
+    alice = _lire_csv(sortie.getvalue())[0]
+    arguments = arguments_ligne(dict(lire_lignes(_entree()))[2], 2025)
+    attendu = calculate_salary(**arguments)
+    assert attendu["bareme"] == "2025" and attendu["tranche_a"] == 3925.0  # PMSS 2025
+    assert float(alice["net_payable"].replace(",", ".")) == round(attendu["net_payable"], 2)
+
+
+def test_portefeuille_xlsx_aller_retour(tmp_path):
+    """Un XLSX (ecriture seule) se relit en entree (lecture seule) avec les memes resultats."""
+    resultats_xlsx = tmp_path / "resultats.xlsx"
+    simuler_portefeuille(_entree(), str(resultats_xlsx))
+    from openpyxl import load_workbook
+    feuille = load_workbook(resultats_xlsx, read_only=True).active
+    entetes, alice = [tuple(r) for r in feuille.iter_rows(min_row=1, max_row=2, values_only=True)]
+    assert entetes == COLONNES_SORTIE and alice[1] == "Alice"
+
+    # Le fichier de resultats contient tjm/jours/contrat : il peut etre resimule
+    sortie = io.BytesIO()
+    assert simuler_portefeuille(str(resultats_xlsx), sortie, format_sortie="csv")["erreurs"] == 1
+
+
+def test_portefeuille_parquet():
+    """Sortie Parquet par lots (pyarrow optionnel)."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    sortie = io.BytesIO()
+    simuler_portefeuille(_entree(), sortie, format_sortie="parquet")
+    table = pq.read_table(io.BytesIO(sortie.getvalue()))
+    assert table.column_names == list(COLONNES_SORTIE)
+    assert table.num_rows == 3
+
+
+def test_format_inconnu():
+    """Format de fichier non supporte : ValueError."""
+    with pytest.raises(ValueError):
+        simuler_portefeuille(_entree(), io.BytesIO(), format_sortie="json")
+    with pytest.raises(ValueError):
+        list(lire_lignes(_entree(nom="consultants.txt")))
@@ -0,0 +1,76 @@
+"""Tests de la projection annuelle (projection.py)."""
+import pytest
+
+from moteur import REGISTRE_BAREMES, ParametresCalcul, calculate_salary
+from projection import CUMULS, ProjectionAnnuelle
+
+
+def _projection(**hypotheses):
+    return ProjectionAnnuelle(550, calcul=calculate_salary, **hypotheses)
+
+
+def test_douze_mois_calcules_une_fois():
+    """La construction simule chaque mois une fois, avec ses jours ouvres."""
+    p = _projection()
+    assert p.nb_calculs == 12
+    for ligne in p.lignes():
+        assert ligne["jours_ouvres"] == REGISTRE_BAREMES["2026"].jours_ouvres[ligne["mois"]]
+        assert ligne["jours_travailles"] == ligne["jours_ouvres"]
+    assert p.resultats[2]["turnover"] == pytest.approx(550 * p.jours_ouvres(2))
+
+
+def test_modifier_un_mois_ne_recalcule_que_ce_mois():
+    """Surcharger un mois ne resimule que lui ; les cumuls suivent a partir de ce mois."""
+    p = _projection()
+    avant = {mois: dict(c) for mois, c in p.cumuls.items()}
+    net_aout = p.resultats[8]["net_payable"]
+    assert p.modifier_mois(8, nb_journees=10) == [8]
+    assert p.nb_calculs == 13
+    assert p.resultats[8]["turnover"] == pytest.approx(5500)
+    for mois in range(1, 8):
+        assert p.cumuls[mois] == avant[mois]
+    ecart = p.resultats[8]["net_payable"] - net_aout
+    for mois in range(8, 13):
+        assert p.cumuls[mois]["net_payable"] == pytest.approx(avant[mois]["net_payable"] + ecart)
+
+    assert p.reinitialiser_mois(8) == [8]
+    assert p.cumuls[12]["net_payable"] == pytest.approx(avant[12]["net_payable"])
+
+
+def test_hypotheses_inchangees_sans_recalcul():
+    """Reappliquer les memes hypotheses ne declenche aucun calcul ; les changer recalcule tout."""
+    p = _projection(use_reserve=False)
+    assert p.modifier_hypotheses(tjm=550, use_reserve=False) == []
+    assert p.nb_calculs == 12
+    assert p.modifier_hypotheses(ik_amount=120) == list(range(1, 13))
+    assert p.nb_calculs == 24
+
+
+def test_totaux_egaux_a_la_somme_des_mois():
+    """Les cumuls de decembre sont la somme des 12 mois."""
+    p = _projection(type_contrat="CDD")
+    p.modifier_mois(3, nb_journees=5)
+    totaux = p.totaux()
+    for cle in CUMULS:
+        assert totaux[cle] == pytest.approx(sum(r[cle] for r in p.resultats.values()))
+
+
+def test_arguments_du_mois_refuses_en_hypothese():
+    """Les arguments propres au mois passent par modifier_mois."""
+    with pytest.raises(ValueError):
+        _projection(nb_journees=10)
+    with pytest.raises(ValueError):
+        _projection().modifier_mois(13, nb_journees=10)
+
+
+def test_projection_2025_utilise_son_bareme():
+    """Une projection 2025 (calcul memoise par defaut) prend les jours ouvres, le PMSS et le SMIC 2025."""
+    bareme = REGISTRE_BAREMES["2025"]
+    for params in (None, ParametresCalcul()):
+        p = ProjectionAnnuelle(550, annee=2025, params=params)
+        assert p.lignes()[9]["jours_ouvres"] == bareme.jours_ouvres[10]
+        assert {r["bareme"] for r in p.resultats.values()} == {"2025"}
+        assert {r["tranche_a"] for r in p.resultats.values()} == {bareme.pmss}
+        attendu = calculate_salary(**p.arguments_mois(10))
+        assert attendu["tranche_a"] == bareme.pmss
+        assert p.resultats[10]["net_payable"] == attendu["net_payable"]
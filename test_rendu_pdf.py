@@ -0,0 +1,230 @@
+"""Tests du rendu PDF (rendu_pdf.py) : templates et generation en lot."""
+import logging
+import os
+import re
+import zipfile
+
+import pytest
+
+import rendu_pdf
+from moteur import calculate_salary
+from rendu_pdf import generer_pdfs, nom_fichier_pdf
+
+RESULTATS = calculate_salary(550, 19, 5.0, 0, 0, 0, True, True)
+
+
+def rendu_factice(data, name, membre_bu, frais_gestion):
+    """Rendu de substitution (importable par les processus du pool)."""
+    return f"%PDF {name} {data['net_payable']:.2f} {membre_bu} {frais_gestion}".encode()
+
+
+def _taches(n):
+    return [{"data": RESULTATS, "name": f"Jean DUPONT{i}", "membre_bu": "BU", "frais_gestion": 8.0}
+            for i in range(n)]
+
+
+def test_nom_fichier_pdf():
+    """Nom puis prenom, comme le bouton de l'app ; caracteres interdits remplaces."""
+    assert nom_fichier_pdf("Jean DUPONT") == "DUPONT_Jean_SimulationPortageSigne+.pdf"
+    assert nom_fichier_pdf("A/B") == "A-B_SimulationPortageSigne+.pdf"
+
+
+def test_lot_dans_un_dossier(tmp_path):
+    """Un fichier par consultant, progression appelee a chaque PDF ; doublons suffixes."""
+    avancement = []
+    taches = _taches(3) + [{"data": RESULTATS, "name": "Jean DUPONT0"}]
+    stats = generer_pdfs(taches, str(tmp_path), processus=1, rendu=rendu_factice, initialisation=None,
+                         progression=lambda fait, total: avancement.append((fait, total)))
+    assert stats["pdf"] == 4
+    assert avancement == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    fichiers = sorted(os.listdir(tmp_path))
+    assert "DUPONT0_Jean_SimulationPortageSigne+_2.pdf" in fichiers and len(fichiers) == 4
+    contenu = (tmp_path / "DUPONT1_Jean_SimulationPortageSigne+.pdf").read_bytes()
+    assert contenu == rendu_factice(RESULTATS, "Jean DUPONT1", "BU", 8.0)
+
+
+def test_lot_pool_de_processus_en_zip(tmp_path):
+    """Le pool de processus produit une archive avec un PDF par consultant, dans l'ordre des taches."""
+    archive = tmp_path / "propositions.zip"
+    stats = generer_pdfs(_taches(5), str(archive), processus=2, rendu=rendu_factice, initialisation=None)
+    assert stats["pdf"] == 5
+    with zipfile.ZipFile(archive) as z:
+        noms = z.namelist()
+        assert sorted(noms) == sorted(nom_fichier_pdf(f"Jean DUPONT{i}") for i in range(5))
+        assert z.read(nom_fichier_pdf("Jean DUPONT3")) == rendu_factice(RESULTATS, "Jean DUPONT3", "BU", 8.0)
+
+
+def test_template_compile_une_fois():
+    """Le template est compile une fois par processus puis servi depuis le cache."""
+    assert rendu_pdf.template_pdf() is rendu_pdf.template_pdf("defaut")
+    with pytest.raises(ValueError):
+        rendu_pdf.template_pdf("inconnu")
+
+
+def test_template_recharge_si_modifie(tmp_path):
+    """En developpement, un fichier modifie (mtime) est recompile ; sinon le cache est garde."""
+    fichier = tmp_path / "modele.html"
+    fichier.write_text("v1 {{ name }}", encoding="utf-8")
+    dev = rendu_pdf.creer_environnement(str(tmp_path), recharger=True)
+    prod = rendu_pdf.creer_environnement(str(tmp_path), recharger=False)
+    assert dev.get_template("modele.html") is dev.get_template("modele.html")
+    prod.get_template("modele.html")
+
+    fichier.write_text("v2 {{ name }}", encoding="utf-8")
+    mtime = os.stat(fichier).st_mtime + 10
+    os.utime(fichier, (mtime, mtime))
+    assert dev.get_template("modele.html").render(name="A") == "v2 A"
+    assert prod.get_template("modele.html").render(name="A") == "v1 A"
+
+
+def test_graphique_svg_en_memoire():
+    """Le donut est un SVG en data URI, identique d'un rendu a l'autre ; None si tout est nul."""
+    import base64
+
+    src = rendu_pdf._generer_chart_svg(RESULTATS)
+    assert src.startswith("data:image/svg+xml;base64,")
+    assert base64.b64decode(src.split(",", 1)[1]).lstrip().startswith(b"<?xml")
+    assert src == rendu_pdf._generer_chart_svg(RESULTATS)
+    vide = {cle: 0 for cle in RESULTATS if isinstance(RESULTATS[cle], (int, float))}
+    assert rendu_pdf._generer_chart_svg(vide) is None
+
+
+def test_graphique_cache_par_proportions():
+    """Des montants aux memes parts affichees reutilisent le dessin deja fait."""
+    rendu_pdf._graphiques.vider()
+    double = {cle: v * 2 if isinstance(v, float) else v for cle, v in RESULTATS.items()}
+    assert rendu_pdf.proportions_graphique(double) == rendu_pdf.proportions_graphique(RESULTATS)
+    assert sum(p for _, p in rendu_pdf.proportions_graphique(RESULTATS)) == pytest.approx(100, abs=0.2)
+
+    src = rendu_pdf._generer_chart_svg(RESULTATS)
+    assert rendu_pdf._generer_chart_svg(double) is src
+    assert rendu_pdf.stats_graphiques()["misses"] == 1
+    assert rendu_pdf.stats_graphiques()["hits"] == 1
+    autre = rendu_pdf._generer_chart_svg(calculate_salary(900, 19, 5.0, 0, 0, 0, True, True))
+    assert autre != src and rendu_pdf.stats_graphiques()["misses"] == 2
+
+
+class RenduEnregistre:
+    """RenduPDF de substitution : garde le HTML mis en page, sans WeasyPrint."""
+
+    def __init__(self):
+        self.html = []
+
+    def mettre_en_page(self, html_str):
+        self.html.append(html_str)
+        return html_str
+
+    def ecrire(self, document):
+        return b"%PDF " + document[-20:].encode()
+
+
+def test_chronos_par_phase(monkeypatch):
+    """create_pdf mesure chaque phase ; le rendu partage recoit un HTML sans styles en ligne."""
+    rendu = RenduEnregistre()
+    monkeypatch.setattr(rendu_pdf, "rendu_processus", lambda: rendu)
+    pdf, chronos = rendu_pdf.create_pdf_chronometre(RESULTATS, "Jean DUPONT", "BU", 8.0)
+    assert pdf.startswith(b"%PDF") and len(rendu.html) == 1
+    assert set(chronos) == set(rendu_pdf.PHASES_PDF) and all(d >= 0 for d in chronos.values())
+    assert "<style" not in rendu.html[0] and "Jean DUPONT" in rendu.html[0]
+
+
+def test_template_nomme(monkeypatch):
+    """create_pdf rend le template nomme par `template` (declare dans TEMPLATES_PDF), "defaut" sinon."""
+    rendu = RenduEnregistre()
+    monkeypatch.setattr(rendu_pdf, "rendu_processus", lambda: rendu)
+    monkeypatch.setitem(rendu_pdf.TEMPLATES_PDF, "variante", "template_pdf.html")
+    rendu_pdf.create_pdf(RESULTATS, "Jean DUPONT", "BU", 8.0, template="variante")
+    rendu_pdf.create_pdf(RESULTATS, "Jean DUPONT", "BU", 8.0)
+    assert rendu.html[0] == rendu.html[1]
+    with pytest.raises(ValueError, match="Template PDF inconnu"):
+        rendu_pdf.create_pdf(dict(RESULTATS, type_contrat="CDD"), "Jean DUPONT", template="cdd")
+
+
+def test_feuille_de_style_et_polices():
+    """La feuille de style externe embarque les polices DejaVu fournies dans fonts/."""
+    with open(rendu_pdf.FEUILLE_STYLE_PATH, encoding="utf-8") as f:
+        css = f.read()
+    polices = re.findall(r"url\((fonts/[^)]+)\)", css)
+    assert len(polices) == 3
+    for police in polices:
+        assert os.path.exists(os.path.join(os.path.dirname(rendu_pdf.FEUILLE_STYLE_PATH), police))
+    assert "'DejaVu Sans', sans-serif" in css
+
+
+def test_lot_chronos_par_document(tmp_path, monkeypatch):
+    """Le lot publie les durees par phase de chaque PDF et leur cumul."""
+    monkeypatch.setattr(rendu_pdf, "rendu_processus", RenduEnregistre)
+    stats = generer_pdfs(_taches(3), str(tmp_path), processus=1, initialisation=None)
+    assert [d["fichier"] for d in stats["documents"]] == [nom_fichier_pdf(f"Jean DUPONT{i}") for i in range(3)]
+    assert set(stats["phases"]) == set(rendu_pdf.PHASES_PDF)
+    assert stats["phases"]["layout"] == pytest.approx(sum(d["layout"] for d in stats["documents"]))
+    assert stats["rendu"] >= sum(stats["phases"].values())
+
+
+def test_pdf_combine_une_passe(monkeypatch):
+    """Le PDF combine met toutes les pages en page en une seule passe, dans l'ordre des taches."""
+    rendu = RenduEnregistre()
+    monkeypatch.setattr(rendu_pdf, "rendu_processus", lambda: rendu)
+    options = [calculate_salary(tjm, 19, 5.0, 0, 0, 0, True, True) for tjm in (450, 550, 650)]
+    chronos = {}
+    rendu_pdf.create_pdf_combine([{"data": d, "name": "Jean DUPONT"} for d in options], chronos=chronos)
+    assert len(rendu.html) == 1 and set(chronos) == set(rendu_pdf.PHASES_PDF)
+    html = rendu.html[0]
+    assert html.count("<body>") == 1 and html.count('<div class="page">') == 3
+    positions = [html.index(f"{d['net_payable']:,.2f}€") for d in options]
+    assert positions == sorted(positions)
+    with pytest.raises(ValueError):
+        rendu_pdf.create_pdf_combine([])
+
+
+@pytest.fixture
+def weasyprint():
+    """WeasyPrint reel ; le test est saute si la bibliotheque ou ses dependances systeme (Pango) manquent."""
+    try:
+        import weasyprint
+    except (ImportError, OSError) as erreur:
+        pytest.skip(f"WeasyPrint indisponible : {erreur}")
+    return weasyprint
+
+
+def test_rendu_weasyprint_reel(weasyprint, caplog, monkeypatch):
+    """
+    Vrai rendu : graphique SVG en data URI et logo charges, polices de la
+    feuille de style trouvees, une page par simulation dans le PDF combine.
+    """
+    caplog.set_level(logging.DEBUG, logger="weasyprint")
+    rendu_pdf.rendu_processus.cache_clear()
+    rendu = rendu_pdf.rendu_processus()
+    documents = []
+    mettre_en_page = rendu.mettre_en_page
+    monkeypatch.setattr(rendu, "mettre_en_page", lambda html_str: documents.append(mettre_en_page(html_str))
+                        or documents[-1])
+
+    assert rendu_pdf.create_pdf(RESULTATS, "Jean DUPONT", "BU", 8.0).startswith(b"%PDF")
+    graphiques = [url for url in rendu.images if url.startswith("data:image/svg+xml;base64,")]
+    assert len(graphiques) == 1 and all(image is not None for image in rendu.images.values())
+    options = [calculate_salary(tjm, 19, 5.0, 0, 0, 0, True, True) for tjm in (450, 550, 650)]
+    combine = rendu_pdf.create_pdf_combine([{"data": d, "name": "Jean DUPONT"} for d in options])
+    assert combine.startswith(b"%PDF") and [len(d.pages) for d in documents] == [1, 3]
+    assert not [r.getMessage() for r in caplog.records if "Failed to load" in r.getMessage()]
+    rendu_pdf.rendu_processus.cache_clear()
+
+
+def test_rendu_partage_entre_threads(weasyprint, monkeypatch):
+    """Sessions concurrentes sur le RenduPDF du processus, cache d'images vide a chaque rendu : PDF complets."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(rendu_pdf, "IMAGES_CACHE_TAILLE", 0)
+    rendu_pdf.rendu_processus.cache_clear()
+    options = [calculate_salary(tjm, 19, 5.0, 0, 0, 0, True, True) for tjm in range(400, 800, 50)]
+    with ThreadPoolExecutor(4) as pool:
+        pdfs = list(pool.map(lambda d: rendu_pdf.create_pdf(d, "Jean DUPONT", "BU", 8.0), options))
+    assert all(pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF") for pdf in pdfs)
+    rendu_pdf.rendu_processus.cache_clear()
+
+
+def test_demarrage_sans_bibliotheques_de_rendu():
+    """Importer les modules de l'app ne charge ni WeasyPrint, ni matplotlib, ni Jinja (premier PDF seulement)."""
+    from bench_demarrage import modules_de_rendu_charges
+
+    assert modules_de_rendu_charges() == []
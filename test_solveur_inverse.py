@@ -0,0 +1,49 @@
+"""Tests du calcul inverse net cible -> TJM / jours (solveur_inverse.py)."""
+import pytest
+
+from moteur import calculate_salary
+from solveur_inverse import jours_pour_net, resoudre_objectif, tjm_pour_net
+
+ARGS = dict(days_worked_month=19, days_worked_week=5.0, ik_amount=0, igd_amount=0,
+            other_expenses=0, use_reserve=True, use_mutuelle=True)
+
+
+def _minimal_au_centime(objectif, variable, champ, cible, args):
+    """La valeur atteint la cible et le centime en dessous ne l'atteint pas."""
+    valeur = objectif["valeur"]
+    assert objectif["resultat"][champ] >= cible
+    assert calculate_salary(**{**args, variable: round(valeur - 0.01, 2)})[champ] < cible
+
+
+@pytest.mark.parametrize("type_contrat", ["CDI", "CDD"])
+@pytest.mark.parametrize("champ", ["net_payable", "net_before_tax"])
+def test_tjm_pour_net_au_centime(type_contrat, champ):
+    """Le TJM trouve est le plus petit (au centime) qui donne le net cible, en peu de simulations."""
+    args = dict(ARGS, type_contrat=type_contrat, ik_amount=150)
+    objectif = tjm_pour_net(4000, champ, calcul=calculate_salary, **args)
+    _minimal_au_centime(objectif, "tjm", champ, 4000, args)
+    assert objectif["evaluations"] <= 8
+    assert 0 <= objectif["ecart"] < 1
+
+
+def test_jours_pour_net():
+    """Meme resolution sur le nombre de jours factures, TJM fixe."""
+    args = dict(ARGS, tjm=620, use_reserve=False)
+    objectif = jours_pour_net(5200, calcul=calculate_salary, **args)
+    _minimal_au_centime(objectif, "days_worked_month", "net_payable", 5200, args)
+    assert objectif["resultat"]["turnover"] == pytest.approx(620 * objectif["valeur"])
+
+
+def test_cible_sous_le_plancher():
+    """Un net deja atteint sans complement (salaire de base) donne 0."""
+    assert tjm_pour_net(1000, calcul=calculate_salary, **ARGS)["valeur"] == 0
+
+
+def test_entrees_invalides():
+    """Variable ou champ non prevus : ValueError ; cible inatteignable : ValueError."""
+    with pytest.raises(ValueError):
+        resoudre_objectif(4000, "ik_amount", **ARGS)
+    with pytest.raises(ValueError):
+        resoudre_objectif(4000, "tjm", "gross_salary", **ARGS)
+    with pytest.raises(ValueError):
+        jours_pour_net(4000, calcul=calculate_salary, **dict(ARGS, tjm=0))